@@ -1,5 +1,16 @@
+import argparse
 import json
+import os
 import random
+import sys
+from datetime import date, timedelta
+
+# Usage:
+#   python generate_full_database.py                       -> the ~40-item demo catalogue (JSON, for Algolia)
+#   python generate_full_database.py --items 2000000 --suppliers 5000 --out catalogue.ndjson
+#   python generate_full_database.py --items 2000000 --out catalogue.parquet
+#   python generate_full_database.py --items 0 --db ../sitemate_app/load_test.db --projects 2000
+# Same --seed, same data. Records are streamed to disk, never held in one list.
 
 # --- 1. CONFIGURATION & IMAGES (Color-Coded) ---
 # We use Placehold.co because it NEVER fails.
@@ -17,97 +28,345 @@ IMG_ELEC = "https://placehold.co/600x400/f1c40f/000000/png?text=ELECTRICAL+CABLE
 # These coordinates map to real markets in Ibadan.
 suppliers = [
     {
-        "name": "AdMub Sands (Iwo Road)", 
-        "location": "Iwo Road, Ibadan", 
+        "name": "AdMub Sands (Iwo Road)",
+        "location": "Iwo Road, Ibadan",
         "_geoloc": {"lat": 7.4019, "lng": 3.9173}
     },
     {
-        "name": "Bodija Builders Mart", 
-        "location": "Bodija, Ibadan", 
+        "name": "Bodija Builders Mart",
+        "location": "Bodija, Ibadan",
         "_geoloc": {"lat": 7.4228, "lng": 3.8960}
     },
     {
-        "name": "Oyo Concrete Works", 
-        "location": "Challenge, Ibadan", 
+        "name": "Oyo Concrete Works",
+        "location": "Challenge, Ibadan",
         "_geoloc": {"lat": 7.3468, "lng": 3.8789}
     },
     {
-        "name": "Titanium Steel Depot", 
-        "location": "Ring Road, Ibadan", 
+        "name": "Titanium Steel Depot",
+        "location": "Ring Road, Ibadan",
         "_geoloc": {"lat": 7.3585, "lng": 3.8596}
     }
 ]
 
-materials = []
-
-# Helper function to create items easily
-def add_item(category, name, price, unit, image, description):
-    # Pick a random supplier for variety
-    sup = random.choice(suppliers)
-    materials.append({
-        "objectID": f"{category[:3]}_{random.randint(10000, 99999)}",
-        "name": name,
-        "category": category,
-        "price": price,
-        "unit": unit,
-        "supplier": sup["name"],
-        "location": sup["location"],
-        "_geoloc": sup["_geoloc"],  # Crucial for "Nearest Location" feature
-        "image_url": image,
-        "description": description
-    })
-
-# --- 3. POPULATE DATA (Merging all your requests) ---
-
-# === A. BASICS (Concrete & Shell) ===
-# Cement
-brands = ["Dangote 3X 42.5R", "Elephant Supaset", "Lafarge 42.5N"]
-for brand in brands:
-    add_item("Cement", f"Cement - {brand} (50kg)", random.randint(9500, 10500), "Bag", IMG_CEMENT, "Portland limestone cement.")
-
-# Aggregates
-add_item("Aggregates", "Sharp Sand (20 tons)", random.randint(120000, 140000), "Truck", IMG_SAND, "River sharp sand for concreting.")
-add_item("Aggregates", "Granite 3/4 inch (30 tons)", random.randint(600000, 680000), "Truck", IMG_GRANITE, "Clean granite stone.")
-add_item("Aggregates", "Plaster Sand (20 tons)", random.randint(100000, 120000), "Truck", IMG_SAND, "Soft sand for plastering.")
-
-# Blocks
-add_item("Blocks", "9-inch Vibrated Block", 650, "Block", IMG_BLOCKS, "Load bearing hollow block.")
-add_item("Blocks", "6-inch Vibrated Block", 500, "Block", IMG_BLOCKS, "Partition wall block.")
-
-# === B. STRUCTURAL STEEL ===
-sizes = [8, 10, 12, 16, 20, 25]
-for s in sizes:
-    add_item("Steel", f"{s}mm Iron Rod (TMT)", 4500 + (s*600), "Length (12m)", IMG_STEEL, f"High Yield TMT Reinforcement Bar Y{s}.")
-
-# === C. ROOFING & CEILING ===
-add_item("Roofing", "Stone Coated Tiles (Bond)", 4200, "sqm", IMG_ROOF, "Premium stone coated roofing tile.")
-add_item("Roofing", "Long Span Aluminium (0.55mm)", 3800, "Meter", IMG_ROOF, "Standard aluminium roofing sheet.")
-add_item("Roofing", "POP Cement (40kg)", 8500, "Bag", IMG_FINISH, "Plaster of Paris for ceiling casting.")
-add_item("Roofing", "PVC Ceiling Strip", 1500, "Bundle", IMG_ROOF, "PVC Ceiling panels.")
-
-# === D. FINISHING (Tiles) ===
-add_item("Finishing", "Vitrified Floor Tile (60x60)", 4500, "sqm", IMG_FINISH, "Polished vitrified tiles.")
-add_item("Finishing", "Ceramic Wall Tile (30x60)", 3500, "sqm", IMG_FINISH, "Glazed wall tiles.")
-add_item("Finishing", "Royal Marble Tile", 15000, "sqm", IMG_FINISH, "High-end marble finish.")
-
-# === E. PLUMBING (PVC, PPR, CPVC) ===
-add_item("Plumbing", "4-inch PVC Waste Pipe", 4500, "Length (4m)", IMG_PLUMB, "Drainage/Sewage pipe.")
-add_item("Plumbing", "20mm PPR Pipe (Supply)", 3500, "Length (4m)", IMG_PLUMB, "Hot/Cold water supply.")
-add_item("Plumbing", "3/4 inch CPVC Pipe", 2800, "Length", IMG_PLUMB, "Hot water supply pipe.")
-add_item("Plumbing", "PVC Elbow 4-inch", 500, "Piece", IMG_PLUMB, "Fittings.")
-add_item("Plumbing", "Pressure Pump (1.5HP)", 85000, "Piece", IMG_PLUMB, "Water pump.")
-
-# === F. ELECTRICAL ===
-add_item("Electrical", "2.5mm Single Core Cable", 18500, "Coil (100m)", IMG_ELEC, "Socket circuit wire (Pure Copper).")
-add_item("Electrical", "1.5mm Single Core Cable", 12500, "Coil (100m)", IMG_ELEC, "Lighting circuit wire.")
-add_item("Electrical", "4.0mm Single Core Cable", 29000, "Coil (100m)", IMG_ELEC, "A/C circuit wire.")
-add_item("Electrical", "20mm PVC Conduit", 900, "Length", IMG_ELEC, "Wiring protection pipe.")
-add_item("Electrical", "13A Double Socket", 2800, "Piece", IMG_ELEC, "Wall outlet.")
-
-# --- 4. EXPORT ---
-filename = 'unified_construction_database.json'
-with open(filename, 'w') as f:
-    json.dump(materials, f, indent=2)
-
-print(f"SUCCESS: Generated {len(materials)} records in '{filename}'.")
-print("INSTRUCTION: Go to Algolia -> Manage Index -> CLEAR INDEX -> Then UPLOAD this file.")
\ No newline at end of file
+# Building-material markets for synthetic suppliers: (area, city, lat, lng, spread in km, weight, price factor)
+MARKET_HUBS = [
+    ("Lekki", "Lagos", 6.4698, 3.5852, 8, 14, 1.10),
+    ("Ikeja", "Lagos", 6.6018, 3.3515, 6, 12, 1.08),
+    ("Orile-Coker", "Lagos", 6.4833, 3.3500, 4, 10, 1.05),
+    ("Iwo Road", "Ibadan", 7.4019, 3.9173, 5, 8, 1.00),
+    ("Bodija", "Ibadan", 7.4228, 3.8960, 4, 6, 1.00),
+    ("Wuse", "Abuja", 9.0765, 7.3986, 6, 10, 1.15),
+    ("Kubwa", "Abuja", 9.1550, 7.3220, 6, 6, 1.12),
+    ("Ogbete", "Enugu", 6.4420, 7.4910, 5, 6, 1.06),
+    ("Kano City", "Kano", 12.0022, 8.5920, 8, 8, 1.04),
+    ("Trans-Amadi", "Port Harcourt", 4.8156, 7.0498, 6, 8, 1.12),
+    ("Benin City", "Edo", 6.3350, 5.6037, 6, 5, 1.03),
+    ("Abeokuta", "Ogun", 7.1475, 3.3619, 5, 4, 0.98),
+    ("Ilorin", "Kwara", 8.4966, 4.5426, 5, 3, 0.97),
+]
+SURNAMES = ["Adebayo", "Okafor", "Musa", "Eze", "Bello", "Ibrahim", "Olawale", "Nwosu", "Danjuma", "Akinola",
+            "Okonkwo", "Yusuf", "Adeyemi", "Chukwu", "Lawal", "Obi", "Abubakar", "Oyelaran", "Ekwueme", "Salami"]
+TRADES = {
+    "Builders Mart": ["Cement", "Blocks", "Aggregates", "Roofing", "Finishing"],
+    "Building Materials": ["Cement", "Blocks", "Steel", "Roofing", "Plumbing", "Electrical"],
+    "Cement Depot": ["Cement", "Blocks"],
+    "Sand & Granite": ["Aggregates"],
+    "Steel Depot": ["Steel"],
+    "Tiles & Sanitary": ["Finishing", "Plumbing"],
+    "Electricals": ["Electrical"],
+    "Hardware": ["Plumbing", "Electrical", "Roofing"],
+}
+
+# --- 3. PRODUCT TEMPLATES ---
+# (category, name, price or (low, high), unit, image, description)
+PRODUCTS = []
+for brand in ["Dangote 3X 42.5R", "Elephant Supaset", "Lafarge 42.5N"]:
+    PRODUCTS.append(("Cement", f"Cement - {brand} (50kg)", (9500, 10500), "Bag", IMG_CEMENT, "Portland limestone cement."))
+PRODUCTS += [
+    ("Aggregates", "Sharp Sand (20 tons)", (120000, 140000), "Truck", IMG_SAND, "River sharp sand for concreting."),
+    ("Aggregates", "Granite 3/4 inch (30 tons)", (600000, 680000), "Truck", IMG_GRANITE, "Clean granite stone."),
+    ("Aggregates", "Plaster Sand (20 tons)", (100000, 120000), "Truck", IMG_SAND, "Soft sand for plastering."),
+    ("Blocks", "9-inch Vibrated Block", 650, "Block", IMG_BLOCKS, "Load bearing hollow block."),
+    ("Blocks", "6-inch Vibrated Block", 500, "Block", IMG_BLOCKS, "Partition wall block."),
+]
+for s in [8, 10, 12, 16, 20, 25]:
+    PRODUCTS.append(("Steel", f"{s}mm Iron Rod (TMT)", 4500 + (s*600), "Length (12m)", IMG_STEEL, f"High Yield TMT Reinforcement Bar Y{s}."))
+PRODUCTS += [
+    ("Roofing", "Stone Coated Tiles (Bond)", 4200, "sqm", IMG_ROOF, "Premium stone coated roofing tile."),
+    ("Roofing", "Long Span Aluminium (0.55mm)", 3800, "Meter", IMG_ROOF, "Standard aluminium roofing sheet."),
+    ("Roofing", "POP Cement (40kg)", 8500, "Bag", IMG_FINISH, "Plaster of Paris for ceiling casting."),
+    ("Roofing", "PVC Ceiling Strip", 1500, "Bundle", IMG_ROOF, "PVC Ceiling panels."),
+    ("Finishing", "Vitrified Floor Tile (60x60)", 4500, "sqm", IMG_FINISH, "Polished vitrified tiles."),
+    ("Finishing", "Ceramic Wall Tile (30x60)", 3500, "sqm", IMG_FINISH, "Glazed wall tiles."),
+    ("Finishing", "Royal Marble Tile", 15000, "sqm", IMG_FINISH, "High-end marble finish."),
+    ("Plumbing", "4-inch PVC Waste Pipe", 4500, "Length (4m)", IMG_PLUMB, "Drainage/Sewage pipe."),
+    ("Plumbing", "20mm PPR Pipe (Supply)", 3500, "Length (4m)", IMG_PLUMB, "Hot/Cold water supply."),
+    ("Plumbing", "3/4 inch CPVC Pipe", 2800, "Length", IMG_PLUMB, "Hot water supply pipe."),
+    ("Plumbing", "PVC Elbow 4-inch", 500, "Piece", IMG_PLUMB, "Fittings."),
+    ("Plumbing", "Pressure Pump (1.5HP)", 85000, "Piece", IMG_PLUMB, "Water pump."),
+    ("Electrical", "2.5mm Single Core Cable", 18500, "Coil (100m)", IMG_ELEC, "Socket circuit wire (Pure Copper)."),
+    ("Electrical", "1.5mm Single Core Cable", 12500, "Coil (100m)", IMG_ELEC, "Lighting circuit wire."),
+    ("Electrical", "4.0mm Single Core Cable", 29000, "Coil (100m)", IMG_ELEC, "A/C circuit wire."),
+    ("Electrical", "20mm PVC Conduit", 900, "Length", IMG_ELEC, "Wiring protection pipe."),
+    ("Electrical", "13A Double Socket", 2800, "Piece", IMG_ELEC, "Wall outlet."),
+]
+# Extra listings beyond the templates are sold under these trade brands
+VARIANT_BRANDS = ["BUA", "Ibeto", "Purechem", "Union", "Coleman", "Nigerchin", "Tower", "Goodwill", "Royal", "Prime"]
+
+# --- 4. SUPPLIERS ---
+
+def generate_suppliers(n, rng):
+    """The real Ibadan suppliers first, then synthetic ones scattered around MARKET_HUBS."""
+    pool = []
+    for sup in suppliers[:n]:
+        pool.append(dict(sup, categories=sorted({p[0] for p in PRODUCTS}), price_factor=1.0))
+    weights = [hub[5] for hub in MARKET_HUBS]
+    trades = list(TRADES)
+    for i in range(len(pool), n):
+        area, city, lat, lng, spread_km, _, factor = rng.choices(MARKET_HUBS, weights)[0]
+        trade = rng.choice(trades)
+        pool.append({
+            "name": f"{rng.choice(SURNAMES)} {trade} ({area}) #{i:05d}",
+            "location": f"{area}, {city}",
+            "_geoloc": {"lat": round(lat + rng.gauss(0, spread_km) / 111.2, 5),
+                        "lng": round(lng + rng.gauss(0, spread_km) / 111.2, 5)},
+            "categories": TRADES[trade],
+            "price_factor": factor,
+        })
+    return pool
+
+# --- 5. CATALOGUE ---
+
+def catalogue_records(n_items, pool, rng):
+    """
+    Yields n_items listings. The first pass over PRODUCTS is the demo catalogue;
+    later passes are the same products from other brands, priced by each supplier's market.
+    """
+    by_category = {}
+    for sup in pool:
+        for category in sup["categories"]:
+            by_category.setdefault(category, []).append(sup)
+    for i in range(n_items):
+        category, name, price, unit, image, description = PRODUCTS[i % len(PRODUCTS)]
+        variant = i // len(PRODUCTS)
+        sup = rng.choice(by_category.get(category) or pool)
+        price = rng.randint(*price) if isinstance(price, tuple) else price
+        if variant:
+            name = f"{name} - {rng.choice(VARIANT_BRANDS)}"
+            price = round(price * sup["price_factor"] * rng.uniform(0.9, 1.12))
+        yield {
+            "objectID": f"{category[:3]}_{i:08d}",
+            "name": name,
+            "category": category,
+            "price": price,
+            "unit": unit,
+            "supplier": sup["name"],
+            "location": sup["location"],
+            "_geoloc": sup["_geoloc"],  # Crucial for "Nearest Location" feature
+            "image_url": image,
+            "description": description
+        }
+
+# --- 6. WRITERS (all streaming) ---
+
+def write_json(path, records):
+    """A JSON array (what Algolia's upload expects), written one record at a time."""
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for rec in records:
+            f.write(",\n  " if n else "\n  ")
+            f.write(json.dumps(rec, indent=2).replace("\n", "\n  "))
+            n += 1
+        f.write("\n]" if n else "]")
+    return n
+
+def write_ndjson(path, records):
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            n += 1
+    return n
+
+def write_parquet(path, records, batch_size=100_000):
+    """Row groups of batch_size records; needs pyarrow (pip install pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet output needs pyarrow: pip install pyarrow (or use --out *.ndjson)")
+    schema = pa.schema([
+        ("objectID", pa.string()), ("name", pa.string()), ("category", pa.string()), ("price", pa.float64()),
+        ("unit", pa.string()), ("supplier", pa.string()), ("location", pa.string()),
+        ("_geoloc", pa.struct([("lat", pa.float64()), ("lng", pa.float64())])),
+        ("image_url", pa.string()), ("description", pa.string()),
+    ])
+    n = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        batch = []
+        for rec in records:
+            batch.append(rec)
+            if len(batch) == batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                n += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            n += len(batch)
+    return n
+
+WRITERS = {".json": write_json, ".ndjson": write_ndjson, ".jsonl": write_ndjson, ".parquet": write_parquet}
+
+# --- 7. APP DATABASE (projects, bids, expenses, inventory, diary) ---
+
+ESTATES = ["Greenfield", "Palm Grove", "Royal Gardens", "Harmony", "Cedar Court", "Unity", "Riverside", "Crown"]
+BUILDINGS = ["Duplex", "Bungalow", "Terrace Block", "Warehouse", "Office Complex", "Apartment Block"]
+# Inventory item names as the Site Manager's stock form writes them (with its units)
+STOCK_ITEMS = [("Cement", "Bags", 40), ("Sand (Tons)", "Tons", 20), ("Granite (Tons)", "Tons", 30),
+               ("Blocks (9 inch)", "Pcs", 800), ("Iron Rods (12mm)", "Tons", 2)]
+EXPENSE_CATEGORIES = ["Materials", "Labor", "Logistics", "Permits", "Misc"]
+WEATHER = ["☀️ Sunny", "🌥️ Cloudy", "🌧️ Rainy (Work Stopped)", "⛈️ Stormy"]
+WORK_DONE = ["Excavation and setting out", "Foundation concrete cast", "Blockwork to lintel level", "Column and beam reinforcement",
+             "Decking formwork", "Roof trusses installed", "Plastering internal walls", "First-fix plumbing and conduits"]
+
+def _boq(rng):
+    """A BOQ in DataFrame.to_json() layout, plus its planned total."""
+    rows = rng.sample(PRODUCTS, rng.randint(5, 12))
+    items, qtys, prices, totals = {}, {}, {}, {}
+    for k, (_, name, price, *_) in enumerate(rows):
+        unit_price = rng.randint(*price) if isinstance(price, tuple) else price
+        qty = round(rng.uniform(5, 500), 1)
+        items[str(k)], qtys[str(k)], prices[str(k)], totals[str(k)] = name, qty, unit_price, round(qty * unit_price, 2)
+    boq = {"Item": items, "Qty": qtys, "Unit Price": prices, "Total Cost": totals}
+    return json.dumps(boq), sum(totals.values())
+
+def _project_rows(i, pool, rng, args, locations):
+    """All rows for one project, keyed by table (kept per project so memory stays flat)."""
+    name = f"{rng.choice(ESTATES)} {rng.choice(BUILDINGS)} #{i:05d}"
+    location = rng.choice(locations)
+    start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 540))
+    days = max(args.diary_days, 30)
+    day = lambda: (start + timedelta(days=rng.randint(0, days - 1))).isoformat()
+    boq_json, planned = _boq(rng)
+    rows = {"project": (name, location, rng.choice(["Clay", "Sandy", "Laterite", "Rocky"]), boq_json,
+                        f"{start.isoformat()} {rng.randint(7, 18):02d}:00", planned)}
+
+    bidders = rng.sample(pool, min(args.bids_per_project, len(pool)))
+    awarded = rng.randrange(len(bidders)) if bidders and rng.random() < 0.4 else None
+    rows["bids"] = [(name, sup["name"], round(planned * rng.uniform(0.85, 1.15), 2), f"080{rng.randint(10000000, 99999999)}",
+                     "Accepted" if k == awarded else ("Pending" if awarded is None else "Rejected"), f"{day()} 12:00")
+                    for k, sup in enumerate(bidders)]
+
+    rows["expenses"] = sorted(((name, rng.choice(PRODUCTS)[1], float(rng.randint(5, 500) * 1000), rng.choice(EXPENSE_CATEGORIES),
+                                day(), "load-test") for _ in range(args.expenses_per_project)), key=lambda r: r[4])
+
+    # Stock movements replayed in date order so no balance ever goes negative
+    balances = {item: 0.0 for item, _, _ in STOCK_ITEMS}
+    logs = []
+    for d in sorted(day() for _ in range(args.inventory_logs_per_project)):
+        item, unit, lot = rng.choice(STOCK_ITEMS)
+        use = rng.random() < 0.55 and balances[item] > 0
+        qty = float(rng.randint(1, max(int(balances[item]), 1))) if use else float(rng.randint(1, 3) * lot)
+        balances[item] += -qty if use else qty
+        logs.append((name, item, -qty if use else qty, unit, "Stock OUT" if use else "Stock IN", d, f"{rng.randint(7, 18):02d}:{rng.randint(0, 59):02d}"))
+    rows["inventory_logs"] = logs
+    last = {log[1]: log[5] for log in logs}
+    rows["inventory"] = [(name, item, balances[item], unit, last[item]) for item, unit, _ in STOCK_ITEMS if item in last]
+
+    rows["diary"] = [(name, (start + timedelta(days=d)).isoformat(), rng.choice(WEATHER),
+                      json.dumps({"Mason": rng.randint(0, 8), "Laborer": rng.randint(2, 20), "Iron Bender": rng.randint(0, 6), "Carpenter": rng.randint(0, 5)}),
+                      rng.choice(WORK_DONE), rng.choice(["None", "None", "Late delivery", "Power outage", "Rain delay"]), "17:30")
+                     for d in sorted(rng.sample(range(days), min(args.diary_days, days)))]
+    return rows
+
+def populate_db(path, pool, rng, args):
+    """
+    Creates/extends an app database through db_manager's own schema (init_db),
+    then bulk-inserts per project (executemany on SQLite, COPY on PostgreSQL when
+    SITEMATE_DATABASE_URL is set), committing every --commit-every projects.
+    """
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "sitemate_app")))
+    import logic.db_manager as db
+    from logic.weather_engine import LOCATIONS
+
+    db.DB_FILE = os.path.abspath(path)
+    db.init_db()
+    backend = db._backend()
+    conn = db._connect()
+    c = conn.cursor()
+    counts = dict.fromkeys(["suppliers", "projects", "bids", "expenses", "inventory_logs", "site_diary"], 0)
+
+    backend.bulk_insert(conn, "suppliers", ["company_name", "location", "phone", "email", "materials", "rating", "timestamp", "lat", "lng"],
+                        [(sup["name"], sup["location"], f"080{rng.randint(10000000, 99999999)}", f"sales{k:05d}@supplier.example",
+                          json.dumps(sup["categories"]), round(rng.uniform(3.0, 5.0), 1), "2024-01-01",
+                          sup["_geoloc"]["lat"], sup["_geoloc"]["lng"]) for k, sup in enumerate(pool)])
+    db.index_supplier_materials(conn)  # supplier_materials rows for tender matching
+    counts["suppliers"] = len(pool)
+
+    locations = list(LOCATIONS)
+    for i in range(args.projects):
+        rows = _project_rows(i, pool, rng, args, locations)
+        c.execute('''INSERT INTO projects (name, location, soil, boq_json, timestamp, planned_total) VALUES (?, ?, ?, ?, ?, ?)
+                     ON CONFLICT (name) DO UPDATE SET location = excluded.location, soil = excluded.soil, boq_json = excluded.boq_json,
+                                                      timestamp = excluded.timestamp, planned_total = excluded.planned_total''', rows["project"])
+        backend.bulk_insert(conn, "bids", ["project_name", "supplier_name", "amount", "phone", "status", "timestamp"], rows["bids"])
+        backend.bulk_insert(conn, "expenses", ["project_name", "item_name", "amount", "category", "date", "note"], rows["expenses"])
+        backend.bulk_insert(conn, "inventory_logs", ["project_name", "item_name", "change_qty", "unit", "operation", "date", "timestamp"], rows["inventory_logs"])
+        c.executemany('''INSERT INTO inventory (project_name, item_name, quantity, unit, last_updated) VALUES (?, ?, ?, ?, ?)
+                         ON CONFLICT (project_name, item_name) DO UPDATE SET quantity = inventory.quantity + excluded.quantity, last_updated = excluded.last_updated''', rows["inventory"])
+        for item, _, _, _, _ in rows["inventory"]:
+            db._refresh_inventory_snapshots(c, rows["project"][0], item)
+        backend.bulk_insert(conn, "site_diary", ["project_name", "date", "weather", "labor_count", "work_done", "issues", "timestamp"], rows["diary"])
+        counts["projects"] += 1
+        counts["bids"] += len(rows["bids"])
+        counts["expenses"] += len(rows["expenses"])
+        counts["inventory_logs"] += len(rows["inventory_logs"])
+        counts["site_diary"] += len(rows["diary"])
+        if (i + 1) % args.commit_every == 0:
+            conn.commit()
+            print(f"  ... {i + 1:,}/{args.projects:,} projects")
+    conn.commit()
+    conn.close()
+    return counts, repr(backend)
+
+# --- 8. EXPORT ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Seeded synthetic data for SiteMate (demo catalogue by default, load-test scale on request).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--items", type=int, default=len(PRODUCTS), help="Catalogue listings (0 to skip the catalogue)")
+    parser.add_argument("--suppliers", type=int, default=len(suppliers), help="Supplier pool (the first 4 are the real Ibadan markets)")
+    parser.add_argument("--out", default="unified_construction_database.json", help="Catalogue file: .json, .ndjson/.jsonl or .parquet")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="Parquet row-group size")
+    parser.add_argument("--db", help="Also write projects, bids, expenses, inventory and diary rows into this SQLite database "
+                                           "(or into PostgreSQL when SITEMATE_DATABASE_URL is set)")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--bids-per-project", type=int, default=8)
+    parser.add_argument("--expenses-per-project", type=int, default=200)
+    parser.add_argument("--inventory-logs-per-project", type=int, default=300)
+    parser.add_argument("--diary-days", type=int, default=90)
+    parser.add_argument("--commit-every", type=int, default=50)
+    args = parser.parse_args()
+
+    # Independent streams: the catalogue doesn't change when the DB options do (and vice versa)
+    pool = generate_suppliers(args.suppliers, random.Random(args.seed))
+
+    if args.items:
+        ext = os.path.splitext(args.out)[1].lower()
+        if ext not in WRITERS:
+            sys.exit(f"Unsupported output '{args.out}' (use {', '.join(WRITERS)})")
+        records = catalogue_records(args.items, pool, random.Random(args.seed + 1))
+        writer = WRITERS[ext]
+        n = writer(args.out, records, args.batch_size) if writer is write_parquet else writer(args.out, records)
+        print(f"SUCCESS: Generated {n:,} records from {len(pool):,} suppliers in '{args.out}'.")
+        if ext == ".json":
+            print("INSTRUCTION: Go to Algolia -> Manage Index -> CLEAR INDEX -> Then UPLOAD this file.")
+
+    if args.db:
+        counts, target = populate_db(args.db, pool, random.Random(args.seed + 2), args)
+        print(f"SUCCESS: Wrote {', '.join(f'{v:,} {k}' for k, v in counts.items())} into {target}.")
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,25 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from logic.db_manager import (
-    get_all_projects, load_project_data, log_expense, get_project_expenses, 
+    get_all_projects, log_expense, get_project_expenses, 
     update_inventory, get_project_inventory, get_inventory_logs, 
-    log_site_photo, get_site_photos,
-    log_site_diary, get_site_diary
+    log_site_photo, log_site_diary, get_site_diary,
+    get_project_expenses_page, get_inventory_logs_page, get_site_diary_page, get_site_photos_page,
+    get_project_metrics, get_project_fingerprint, snapshot_as_of
 )
-# IMPORT THE NEW FUNCTION HERE
-from logic.report_generator import generate_expense_pdf, generate_inventory_pdf, generate_diary_pdf 
+from logic.bulk_ingest import ingest_expenses, ingest_inventory
+from logic.paging import fetch_page, page_controls
+from logic.bootstrap import bootstrap
+from logic.tracing import begin_request, end_request
+# PDFs are rendered lazily (on click) and cached by content hash
+from logic.report_service import report_download_button
+from logic.variance_engine import variance_report, burn_curves, get_mappings, set_mapping, UNPLANNED, UNPLANNED_LABEL
+from logic.evm_engine import project_evm, evm_curve, get_baseline, set_baseline, record_progress, parse_vision_progress
+from logic.vision_engine import analyze_site_progress
 
 st.set_page_config(page_title="Site Manager", page_icon="🚧", layout="wide")
+bootstrap()
+begin_request("page.site_manager")
 
 st.title("🚧 Site Execution Manager")
 st.caption("Track daily spending, inventory, logs, and site progress.")
@@ -30,27 +40,35 @@ if not projects:
 project_names = [p[0] for p in projects]
 selected_proj = st.selectbox("Select Active Site:", project_names)
 
-# Load Data
-loc, soil, plan_df = load_project_data(selected_proj)
-actual_df = get_project_expenses(selected_proj)
-inventory_df = get_project_inventory(selected_proj)
-history_df = get_inventory_logs(selected_proj)
-diary_df = get_site_diary(selected_proj) # Load Diary
+# Load Data (histories are paged below; the header and charts come from SQL aggregates)
+metrics = get_project_metrics(selected_proj)
+spend_by_cat = metrics["spend_by_category"]
+inventory_df = metrics["stock"]
+data_version = get_project_fingerprint(selected_proj)  # Cache key for the lazy PDF exports
+
+# Date filter shared by the Ledger / Store / Diary history tables
+with st.expander("🗓️ Filter history by date", expanded=False):
+    date_range = st.date_input("Date range", value=(), key="sm_date_range")
+start_date, end_date = (date_range + (None, None))[:2] if isinstance(date_range, tuple) else (date_range, date_range)
+filter_key = f"{selected_proj}_{start_date}_{end_date}"
 
 # 2. TOP METRICS
-planned_total = plan_df['Total Cost'].sum() if plan_df is not None else 0
-spent_total = actual_df['amount'].sum() if not actual_df.empty else 0
-remaining = planned_total - spent_total
+planned_total = metrics["planned"]
+spent_total = metrics["spent"]
+remaining = metrics["remaining"]
+runway = metrics["runway_weeks"]
 
-col1, col2, col3 = st.columns(3)
+col1, col2, col3, col4 = st.columns(4)
 col1.metric("💰 Planned Budget", f"₦{planned_total:,.0f}")
-col2.metric("💸 Actual Spent", f"₦{spent_total:,.0f}", delta=f"-{(spent_total/planned_total)*100:.1f}% used" if planned_total else "0%")
+col2.metric("💸 Actual Spent", f"₦{spent_total:,.0f}", delta=f"-{metrics['pct_used']:.1f}% used" if planned_total else "0%")
 col3.metric("📉 Remaining", f"₦{remaining:,.0f}", delta_color="normal" if remaining > 0 else "inverse")
+col4.metric("🔥 Weekly Burn", f"₦{metrics['burn_rate_weekly']:,.0f}", delta=f"~{runway:.0f} weeks left" if runway else None, delta_color="off")
+if snapshot_as_of(): st.caption(f"Figures as of {snapshot_as_of()}; new entries appear within a few seconds.")
 
 st.divider()
 
 # TABS FOR MANAGEMENT
-tab_finance, tab_inventory, tab_gallery, tab_diary = st.tabs(["💵 Ledger", "📦 Material Store", "📸 Gallery", "📅 Daily Diary"])
+tab_finance, tab_inventory, tab_variance, tab_evm, tab_gallery, tab_diary = st.tabs(["💵 Ledger", "📦 Material Store", "📐 BOQ Variance", "⏱️ Earned Value", "📸 Gallery", "📅 Daily Diary"])
 
 # --- TAB 1: FINANCIAL LEDGER ---
 with tab_finance:
@@ -70,21 +88,41 @@ with tab_finance:
                 else:
                     st.error("Error.")
         
-        if not actual_df.empty:
+        with st.expander("📤 Bulk Import (CSV / Excel)"):
+            st.caption("Columns: Item, Amount, Category, Date (optional), Note (optional)")
+            exp_file = st.file_uploader("Expense sheet", type=["csv", "xlsx"], key="bulk_expenses")
+            if exp_file and st.button("Import Expenses"):
+                count, errors = ingest_expenses(selected_proj, exp_file)
+                st.success(f"Imported {count} expense lines.")
+                if not errors.empty:
+                    st.warning(f"{errors['Row'].nunique()} rows skipped:")
+                    st.dataframe(errors, hide_index=True, use_container_width=True)
+                else:
+                    st.rerun()
+        
+        if not spend_by_cat.empty:
             st.divider()
             st.subheader("📄 Export Ledger")
-            pdf_bytes = generate_expense_pdf(selected_proj, planned_total, actual_df)
-            st.download_button("📥 Download Logbook (PDF)", pdf_bytes, f"{selected_proj}_Log.pdf", "application/pdf", type="primary", use_container_width=True)
+            report_download_button("📥 Download Logbook (PDF)", f"{selected_proj}_Log.pdf", "expense",
+                                   loader=lambda: (selected_proj, planned_total, get_project_expenses(selected_proj)), fingerprint=(selected_proj, planned_total, data_version),
+                                   widget_key="sm_expense", type="primary", use_container_width=True)
 
     with c2:
         st.subheader("📊 Financial Health")
-        if not actual_df.empty:
-            chart = alt.Chart(actual_df).mark_arc(innerRadius=50).encode(
+        if not spend_by_cat.empty:
+            chart = alt.Chart(spend_by_cat).mark_arc(innerRadius=50).encode(
                 theta=alt.Theta("amount", stack=True), color=alt.Color("category"), tooltip=["category", "amount"]
             ).properties(title="Spending Breakdown")
             st.altair_chart(chart, use_container_width=True)
+            if len(metrics["weekly_burn"]) > 1:
+                burn_chart = alt.Chart(metrics["weekly_burn"]).mark_bar(color="#e67e22").encode(
+                    x=alt.X("week", title="Week"), y=alt.Y("amount", title="Spent (₦)"), tooltip=["week", "amount"]
+                ).properties(title="Weekly Burn", height=200)
+                st.altair_chart(burn_chart, use_container_width=True)
             st.caption("Recent Transactions")
-            st.dataframe(actual_df[['date', 'item', 'category', 'amount']].sort_values('date', ascending=False), hide_index=True, use_container_width=True)
+            page_df, next_cursor = fetch_page(f"exp_{filter_key}", get_project_expenses_page, selected_proj, start_date=start_date, end_date=end_date)
+            st.dataframe(page_df[['date', 'item', 'category', 'amount']], hide_index=True, use_container_width=True)
+            page_controls(f"exp_{filter_key}", next_cursor)
         else:
             st.info("No expenses logged yet.")
 
@@ -108,6 +146,18 @@ with tab_inventory:
                     st.rerun()
                 else:
                     st.error(msg)
+        
+        with st.expander("📤 Bulk Import (CSV / Excel)"):
+            st.caption("Columns: Item, Quantity, Operation (IN/OUT), Unit (optional), Date (optional; not before an item's last stock entry)")
+            inv_file = st.file_uploader("Stock movement sheet", type=["csv", "xlsx"], key="bulk_inventory")
+            if inv_file and st.button("Import Stock Movements"):
+                count, errors = ingest_inventory(selected_proj, inv_file)
+                st.success(f"Imported {count} stock movements.")
+                if not errors.empty:
+                    st.warning(f"{errors['Row'].nunique()} rows skipped:")
+                    st.dataframe(errors, hide_index=True, use_container_width=True)
+                else:
+                    st.rerun()
 
     with ic2:
         st.markdown("#### 📋 Current Stock & History")
@@ -117,17 +167,100 @@ with tab_inventory:
             ).properties(height=300)
             st.altair_chart(inv_chart, use_container_width=True)
             
-            if not history_df.empty:
-                with st.expander("📜 View Transaction History (Log)", expanded=False):
-                    st.dataframe(history_df, hide_index=True, use_container_width=True)
+            with st.expander("📜 View Transaction History (Log)", expanded=False):
+                history_page, next_cursor = fetch_page(f"inv_{filter_key}", get_inventory_logs_page, selected_proj, start_date=start_date, end_date=end_date)
+                st.dataframe(history_page, hide_index=True, use_container_width=True)
+                page_controls(f"inv_{filter_key}", next_cursor)
             
             st.divider()
-            inv_pdf_bytes = generate_inventory_pdf(selected_proj, inventory_df, history_df)
-            st.download_button("📥 Download Inventory Report (PDF)", inv_pdf_bytes, f"{selected_proj}_Inventory.pdf", "application/pdf", type="primary", use_container_width=True)
+            report_download_button("📥 Download Inventory Report (PDF)", f"{selected_proj}_Inventory.pdf", "inventory",
+                                   loader=lambda: (selected_proj, get_project_inventory(selected_proj), get_inventory_logs(selected_proj)), fingerprint=(selected_proj, data_version),
+                                   widget_key="sm_inventory", type="primary", use_container_width=True)
         else:
             st.info("Inventory is empty.")
 
-# --- TAB 3: SITE GALLERY ---
+# --- TAB 3: BOQ VARIANCE ---
+with tab_variance:
+    st.subheader("📐 Planned vs. Actual Consumption")
+    variance = variance_report(selected_proj)
+    if variance.empty:
+        st.info("This project has no BOQ lines to compare against.")
+    else:
+        unplanned_spend = variance.loc[variance["Item"] == UNPLANNED_LABEL, "Spent"].sum()
+        v1, v2, v3 = st.columns(3)
+        v1.metric("📦 Items Over Plan", int((variance["Qty Variance"] > 0).sum()), help="Used quantity above the BOQ quantity")
+        v2.metric("📈 Projected Overrun", f"₦{variance['Projected Overrun'].clip(lower=0).sum():,.0f}")
+        v3.metric("❓ Spend Not in BOQ", f"₦{unplanned_spend:,.0f}")
+        st.dataframe(
+            variance, hide_index=True, use_container_width=True,
+            column_config={
+                "Used %": st.column_config.ProgressColumn("Used %", format="%.0f%%", min_value=0, max_value=150),
+                "Planned Cost": st.column_config.NumberColumn(format="₦%.0f"),
+                "Spent": st.column_config.NumberColumn(format="₦%.0f"),
+                "Cost Variance": st.column_config.NumberColumn(format="₦%.0f"),
+                "Projected Overrun": st.column_config.NumberColumn(format="₦%.0f"),
+                "Daily Burn": st.column_config.NumberColumn(format="%.2f"),
+            }
+        )
+
+        curves = burn_curves(selected_proj)
+        if not curves.empty:
+            picked = st.selectbox("Burn curve for:", sorted(curves["Item"].unique()), key="variance_curve_item")
+            curve = curves[curves["Item"] == picked]
+            used_line = alt.Chart(curve).mark_line(point=True, color="#e67e22").encode(
+                x=alt.X("Date:T"), y=alt.Y("Cumulative Used:Q", title="Cumulative Used"), tooltip=["Date:T", "Cumulative Used", "Used %"])
+            plan_rule = alt.Chart(curve.head(1)).mark_rule(color="red", strokeDash=[6, 4]).encode(y="Planned Qty:Q")
+            st.altair_chart((used_line + plan_rule).properties(title=f"{picked}: cumulative use vs. BOQ quantity", height=260), use_container_width=True)
+
+        with st.expander("🔗 Review name matching"):
+            mappings = get_mappings(selected_proj)
+            st.dataframe(mappings, hide_index=True, use_container_width=True)
+            if not mappings.empty:
+                with st.form("variance_mapping_form"):
+                    labels = [f"{r.Source}: {r.Name}" for r in mappings.itertuples()]
+                    pick = st.selectbox("Ledger / expense name", range(len(labels)), format_func=labels.__getitem__)
+                    targets = [t for t in variance["Item"] if t != UNPLANNED_LABEL] + [UNPLANNED_LABEL]
+                    target = st.selectbox("Counts against", targets)
+                    if st.form_submit_button("Save Match"):
+                        row = mappings.iloc[pick]
+                        set_mapping(selected_proj, row["Source"], row["Name"], UNPLANNED if target == UNPLANNED_LABEL else target)
+                        st.rerun()
+
+# --- TAB 4: EARNED VALUE ---
+with tab_evm:
+    st.subheader("⏱️ Schedule & Cost Performance")
+    baseline = get_baseline(selected_proj)
+    ev_row = project_evm(selected_proj)
+    if ev_row is None:
+        st.info("No baseline yet. Freeze the current BOQ and schedule to start tracking earned value.")
+    else:
+        e1, e2, e3, e4 = st.columns(4)
+        e1.metric("💹 CPI", f"{ev_row['CPI']:.2f}" if pd.notna(ev_row['CPI']) else "—", help="Earned value / actual cost (below 1 = over budget)")
+        e2.metric("📆 SPI", f"{ev_row['SPI']:.2f}" if pd.notna(ev_row['SPI']) else "—", help="Earned value / planned value (below 1 = behind schedule)")
+        e3.metric("🏁 Complete", f"{ev_row['% Complete']:.0f}%", delta=f"{ev_row['% Complete'] - ev_row['% Planned']:+.0f} pts vs plan")
+        e4.metric("🧮 Forecast at Completion", f"₦{ev_row['EAC']:,.0f}", delta=f"₦{ev_row['EAC'] - ev_row['BAC']:,.0f}", delta_color="inverse")
+        st.caption(f"Status: **{ev_row['Status']}** · PV ₦{ev_row['PV']:,.0f} · EV ₦{ev_row['EV']:,.0f} · AC ₦{ev_row['AC']:,.0f}")
+
+        curve = evm_curve(selected_proj).melt("Date", var_name="Measure", value_name="Value").dropna()
+        s_curve = alt.Chart(curve).mark_line().encode(
+            x=alt.X("Date:T"), y=alt.Y("Value:Q", title="Cumulative (₦)"),
+            color=alt.Color("Measure:N", scale=alt.Scale(domain=["PV", "EV", "AC"], range=["#95a5a6", "#27ae60", "#e74c3c"])),
+            tooltip=["Date:T", "Measure", alt.Tooltip("Value:Q", format=",.0f")])
+        st.altair_chart(s_curve.properties(title="Planned value vs. earned value vs. actual cost", height=280), use_container_width=True)
+        st.dataframe(baseline, hide_index=True, use_container_width=True,
+                     column_config={"Budget": st.column_config.NumberColumn(format="₦%.0f"),
+                                    "% Complete": st.column_config.ProgressColumn("% Complete", format="%.0f%%", min_value=0, max_value=100)})
+
+    with st.expander("📌 Re-baseline" if ev_row is not None else "📌 Set Baseline", expanded=ev_row is None):
+        with st.form("evm_baseline_form"):
+            baseline_start = st.date_input("Site work starts on")
+            if st.form_submit_button("📌 Freeze Schedule & Budget"):
+                if set_baseline(selected_proj, baseline_start):
+                    st.rerun()
+                else:
+                    st.error("This project has no BOQ to baseline.")
+
+# --- TAB 5: SITE GALLERY ---
 with tab_gallery:
     st.subheader("📸 Site Progress Evidence")
     with st.expander("Upload New Photo", expanded=False):
@@ -137,8 +270,16 @@ with tab_gallery:
             if log_site_photo(selected_proj, uploaded_file.getvalue(), photo_caption):
                 st.success("Photo Uploaded!")
                 st.rerun()
+        if uploaded_file and st.button("🔍 Estimate Progress (AI)"):
+            with st.spinner("Surveying the photo..."):
+                survey = analyze_site_progress(uploaded_file.getvalue())
+            st.markdown(survey)
+            estimate = parse_vision_progress(survey)
+            if estimate:
+                ok, msg = record_progress(selected_proj, estimate[1], phase=estimate[0], source="vision", note=photo_caption)
+                (st.success if ok else st.warning)(f"Earned value: {msg}")
 
-    photos = get_site_photos(selected_proj)
+    photos, next_cursor = fetch_page(f"photos_{selected_proj}", get_site_photos_page, selected_proj)
     if photos:
         cols = st.columns(3)
         for i, (path, cap, time) in enumerate(photos):
@@ -146,15 +287,29 @@ with tab_gallery:
                 if os.path.exists(path):
                     st.image(path, use_column_width=True) 
                     st.caption(f"**{time}**: {cap}")
+        page_controls(f"photos_{selected_proj}", next_cursor)
     else:
         st.info("No site photos yet.")
 
-# --- TAB 4: DAILY DIARY (UPDATED) ---
+# --- TAB 6: DAILY DIARY (UPDATED) ---
 with tab_diary:
     st.subheader("📅 Daily Site Report (DSR)")
     
     dc1, dc2 = st.columns([1, 2])
     with dc1:
+        # Stage progress feeds earned value (only once the project has a baseline). Outside the form
+        # so the slider starts at the chosen stage's current %, and opt-in so a plain diary entry never moves EV.
+        log_progress = False
+        if not baseline.empty:
+            log_progress = st.checkbox("📈 Update stage progress with this report", key=f"log_progress_{selected_proj}")
+            if log_progress:
+                phases = baseline["Phase"].tolist()
+                open_pos = [i for i, pct in enumerate(baseline["% Complete"]) if pct < 100]
+                stage = st.selectbox("Current Stage", phases, index=int(open_pos[0]) if len(open_pos) else len(phases) - 1,
+                                     key=f"stage_{selected_proj}")
+                stage_pct = st.slider("Stage % Complete", 0, 100, int(baseline["% Complete"].iloc[phases.index(stage)]),
+                                      key=f"stage_pct_{selected_proj}_{stage}")
+
         with st.form("diary_form"):
             st.markdown("**Today's Conditions**")
             weather = st.selectbox("Weather", ["☀️ Sunny", "🌥️ Cloudy", "🌧️ Rainy (Work Stopped)", "⛈️ Stormy"])
@@ -173,6 +328,8 @@ with tab_diary:
                 workers = {"Mason": mason, "Laborer": laborer, "Iron Bender": iron_bender, "Carpenter": carpenter}
                 success, msg = log_site_diary(selected_proj, weather, workers, work_done, issues)
                 if success:
+                    if log_progress:
+                        record_progress(selected_proj, stage_pct, phase=stage, source="diary", note=work_done)
                     st.success(msg)
                     st.rerun()
                 else:
@@ -182,10 +339,11 @@ with tab_diary:
         # --- NEW: CLEAN TABLE VIEW ---
         st.markdown("#### 📜 Site Diary History")
         
-        if not diary_df.empty:
+        diary_page, next_cursor = fetch_page(f"diary_{filter_key}", get_site_diary_page, selected_proj, start_date=start_date, end_date=end_date)
+        if not diary_page.empty:
             # Display as a clean, interactive table
             st.dataframe(
-                diary_df, 
+                diary_page, 
                 use_container_width=True, 
                 hide_index=True,
                 column_config={
@@ -196,17 +354,21 @@ with tab_diary:
                     "Issues": "Blockers"
                 }
             )
+            page_controls(f"diary_{filter_key}", next_cursor)
             
             # --- NEW: PDF DOWNLOAD BUTTON ---
             st.divider()
-            diary_pdf_bytes = generate_diary_pdf(selected_proj, diary_df)
-            st.download_button(
-                label="📥 Download Site Diary Log (PDF)", 
-                data=diary_pdf_bytes, 
-                file_name=f"{selected_proj}_Site_Diary.pdf", 
-                mime="application/pdf", 
+            report_download_button(
+                "📥 Download Site Diary Log (PDF)",
+                f"{selected_proj}_Site_Diary.pdf",
+                "diary",
+                loader=lambda: (selected_proj, get_site_diary(selected_proj)),
+                fingerprint=(selected_proj, data_version),
+                widget_key="sm_diary",
                 type="primary",
                 use_container_width=True
             )
         else:
-            st.info("No daily reports submitted yet. Use the form to submit today's log.")
\ No newline at end of file
+            st.info("No daily reports submitted yet. Use the form to submit today's log.")
+
+end_request()
@@ -1,20 +1,28 @@
 import streamlit as st
 import sys
 import os
+from datetime import datetime
 
 # Path fix to find 'logic' folder
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from logic.db_manager import register_supplier, init_db, get_all_supplier_names, get_open_tenders, submit_bid
+from logic.db_manager import register_supplier, get_all_supplier_names, get_open_tenders, submit_bid
+from logic.bid_engine import get_tender_close_times
+from logic.supplier_matching import get_notifications, mark_notifications_read
+from logic.event_feed import live_supplier_feed
+from logic.bootstrap import bootstrap, render_status_banner
+from logic.tracing import begin_request, end_request
 from logic.payment_gateway import initialize_payment # <--- Integrated Payment Logic
 
-init_db()
+bootstrap()
+begin_request("page.supplier_portal")
 
 st.set_page_config(page_title="Supplier Portal", page_icon="👷", layout="centered")
 
 st.image("https://cdn-icons-png.flaticon.com/512/2666/2666505.png", width=50)
 st.title("👷 Supplier Portal")
 st.caption("Register your business or bid on open construction projects.")
+render_status_banner()
 
 # TABS for separate functions
 tab1, tab2 = st.tabs(["📝 New Registration", "💰 Job Board (Live Tenders)"])
@@ -62,10 +70,26 @@ with tab2:
         with col_b:
             my_loc = st.selectbox("Filter Jobs by Location:", ["Lekki, Lagos", "Ibadan, Oyo", "Abuja, FCT"])
         
+        # New tenders and bid outcomes as they happen (polls on its own, the page doesn't rerun)
+        live_supplier_feed(me)
+        
+        # Tender alerts: new projects whose BOQ matches this supplier's stock list
+        unread = [a for a in get_notifications(me) if a['read_at'] is None]
+        if unread:
+            with st.expander(f"🔔 {len(unread)} new tender(s) match your stock", expanded=True):
+                for alert in unread:
+                    where = f"{alert['distance_km']:,.0f} km away" if alert['distance_km'] is not None else "distance unknown"
+                    st.write(f"**{alert['project_name']}** ({alert['location'] or 'Unknown site'}): you stock {alert['coverage'] * 100:.0f}% of the BOQ, {where}")
+                if st.button("✔️ Mark as Read"):
+                    mark_notifications_read(me)
+                    st.rerun()
+        
         st.divider()
         
         # 2. Find Jobs
-        jobs = get_open_tenders(my_loc)
+        close_times = get_tender_close_times()
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M")
+        jobs = [j for j in get_open_tenders(my_loc) if not (close_times.get(j['name'], (None,))[0] or "9999") <= now_str]
         
         if jobs:
             st.success(f"Found {len(jobs)} active projects in {my_loc}")
@@ -74,25 +98,31 @@ with tab2:
                 with st.expander(f"🏗️ {job['name']} (Est. Value: ₦{job['est_value']:,.0f})"):
                     st.write(f"**Date Posted:** {job['date']}")
                     st.write(f"**Materials Needed:** {job['items']} unique items (Cement, Sand, etc.)")
+                    closes, sealed = close_times.get(job['name'], (None, False))
+                    if closes: st.write(f"**Bidding Closes:** {closes}{' (sealed bids)' if sealed else ''}")
                     
                     # 3. Submit Bid Form
                     st.markdown("#### Submit Your Quote")
-                    c1, c2 = st.columns([2, 1])
+                    c1, c2, c3 = st.columns([2, 1, 1])
                     with c1:
                         bid_val = st.number_input(f"Total Bid Amount (₦)", min_value=0.0, step=1000.0, key=f"bid_{job['name']}")
                     with c2:
+                        lead_days = st.number_input("Delivery (days)", min_value=1, value=7, key=f"days_{job['name']}")
+                    with c3:
                         st.write("") # Spacer
                         st.write("") # Spacer
                         submit_btn = st.button(f"🚀 Submit Bid", key=f"btn_{job['name']}")
                     
                     if submit_btn:
                         if bid_val > 0:
-                            if submit_bid(job['name'], me, bid_val, "234..."):
+                            if submit_bid(job['name'], me, bid_val, "234...", delivery_days=int(lead_days)):
                                 st.toast(f"✅ Bid sent for {job['name']}!")
                                 st.success("Bid submitted! The engineer will contact you if accepted.")
                             else:
-                                st.error("Failed to submit bid.")
+                                st.error("Failed to submit bid: bidding has closed for this tender.")
                         else:
                             st.warning("Please enter a valid amount.")
         else:
-            st.info("No open projects found in this location right now. Check back later.")
\ No newline at end of file
+            st.info("No open projects found in this location right now. Check back later.")
+
+end_request()
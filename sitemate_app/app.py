@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 import time
+import datetime
 import os
 
 # --- 0. THEME AUTO-FIX (FORCES DARK MODE) ---
@@ -22,25 +23,35 @@ font="sans serif"
 st.set_page_config(page_title="SiteMate Pro", page_icon="🏗️", layout="wide", initial_sidebar_state="expanded")
 
 # --- 2. IMPORTS ---
-from streamlit_mic_recorder import mic_recorder
 from logic.transcriber import transcribe_audio
 from logic.oyenuga_logic import get_agent_response
 from logic.data_fetcher import get_live_price, get_suppliers_for_location
-from logic.report_generator import generate_pdf_report, generate_diary_pdf, generate_inventory_pdf, generate_expense_pdf
+from logic.report_service import report_download_button
 from logic.integrations import get_whatsapp_link, get_email_link
 from logic.labor_engine import calculate_labor_cost
 from logic.timeline_engine import calculate_project_timeline
+from logic.evm_engine import portfolio_risk
+from logic.bid_engine import rank_bids, set_tender, tender_status, get_tender_close_times, award_best, DEFAULT_WEIGHTS
+from logic.supplier_matching import match_project, notify_matching_suppliers, get_notifications, mark_notifications_read
+from logic.event_feed import live_bid_feed, live_supplier_feed
 from logic.db_manager import (
-    init_db, save_project, get_all_projects, load_project_data, delete_project, 
-    get_bids_for_project, register_supplier, get_open_tenders, submit_bid,
+    save_project, get_all_projects, load_project_data, delete_project, 
+    register_supplier, get_open_tenders, submit_bid,
     log_expense, get_project_expenses, update_inventory, get_project_inventory, 
     get_inventory_logs, log_site_diary, get_site_diary, 
-    get_all_supplier_names, update_bid_status, get_supplier_bids
+    get_all_supplier_names, update_bid_status,
+    get_project_expenses_page, get_inventory_logs_page, get_site_diary_page, get_supplier_bids_page,
+    get_project_metrics, get_project_fingerprint, snapshot_as_of
 )
+from logic.paging import fetch_page, page_controls
 from logic.weather_engine import get_site_weather
 from logic.expert_verifier import verify_project_budget 
 from logic.feasibility_engine import check_feasibility 
 from logic.auth import require_auth, logout 
+from logic.bootstrap import bootstrap, render_status_banner
+from logic.tracing import begin_request, annotate_request, end_request, span_summary, slowest_requests, trace_spans, recent_spans, export_jsonl, clear as clear_traces, MAX_SPANS
+from logic.query_cache import cache_stats, reset_stats
+from logic.read_replica import replica_stats, MAX_STALENESS
 
 # --- 3. CUSTOM STYLING (THE FINAL NUCLEAR FIX) ---
 CUSTOM_CSS = """
@@ -170,10 +181,12 @@ button[kind="secondary"] {
 """
 st.markdown(f'<style>{CUSTOM_CSS}</style>', unsafe_allow_html=True)
 
-init_db()
+bootstrap()  # Schema + background search health check, once per process
 
 # --- 4. AUTHENTICATION ---
 require_auth()
+begin_request("page.app", **{"enduser.role": st.session_state.get('role')})
+render_status_banner()
 
 # --- 5. SIDEBAR NAVIGATION ---
 with st.sidebar:
@@ -222,8 +235,10 @@ with st.sidebar:
     if "bid" in st.session_state.permissions: available_tabs.append("🛒 Marketplace")
     if "supply" in st.session_state.permissions: available_tabs.append("🚚 Supplier Portal")
     if "site" in st.session_state.permissions: available_tabs.append("🚧 Site Operations")
+    if st.session_state.get('role') == "Chief Engineer": available_tabs.append("📈 Performance")
     
     selected_nav = st.radio("Go to:", available_tabs, label_visibility="collapsed")
+    annotate_request(f"page.app {selected_nav}")
     
     st.divider()
     if st.button("🚪 Sign Out"): logout()
@@ -247,6 +262,7 @@ if selected_nav == "📐 Planning & AI":
             
         # Audio Input
         c1, c2 = st.columns([1, 6])
+        from streamlit_mic_recorder import mic_recorder  # Component only loads when the planner is open
         with c1: audio_data = mic_recorder(start_prompt="🎤 Record", stop_prompt="⏹️ Stop", key="recorder", use_container_width=True)
         
         if audio_data and audio_data['bytes']:
@@ -291,6 +307,8 @@ if selected_nav == "📐 Planning & AI":
                         if success:
                             st.session_state['current_project_name'] = save_name
                             st.success("Saved & Synced to Algolia!")
+                            notified = notify_matching_suppliers(save_name)
+                            if notified: st.caption(f"📣 Tender sent to {notified} matching supplier(s).")
                         else: st.error(msg)
 
     # --- TAB 2: ANALYSIS & SCENARIOS ---
@@ -385,6 +403,24 @@ if selected_nav == "📐 Planning & AI":
         else:
             st.info("No saved projects found.")
 
+        # Portfolio ranking from the running earned-value totals (baselined projects only)
+        risk = portfolio_risk()
+        if not risk.empty:
+            with st.expander(f"🚦 Portfolio Risk ({int((risk['Status'] == '🔴 At Risk').sum())} at risk of {len(risk)})", expanded=False):
+                st.dataframe(
+                    risk[["Project", "Status", "CPI", "SPI", "% Complete", "% Planned", "BAC", "EAC", "Risk"]],
+                    hide_index=True, use_container_width=True,
+                    column_config={
+                        "CPI": st.column_config.NumberColumn(format="%.2f"),
+                        "SPI": st.column_config.NumberColumn(format="%.2f"),
+                        "% Complete": st.column_config.NumberColumn(format="%.0f%%"),
+                        "% Planned": st.column_config.NumberColumn(format="%.0f%%"),
+                        "BAC": st.column_config.NumberColumn("Budget", format="₦%.0f"),
+                        "EAC": st.column_config.NumberColumn("Forecast", format="₦%.0f"),
+                        "Risk": st.column_config.NumberColumn(format="%.2f"),
+                    }
+                )
+
         st.divider()
 
         # 2. REPORT GENERATION
@@ -394,21 +430,18 @@ if selected_nav == "📐 Planning & AI":
             
             rpt_type = "Bank" if "Bank" in report_choice else "Standard"
             
-            pdf_bytes = generate_pdf_report(
+            report_download_button(
+                f"📥 Download {rpt_type} PDF",
+                f"SiteMate_{rpt_type}_Report.pdf",
+                "boq",
                 user_query="Project Estimation",
                 location=selected_loc,
                 soil_type="Standard",
                 ai_text="Generated via SiteMate Pro",
                 boq_dataframe=st.session_state['boq_df'],
-                report_type=rpt_type
-            )
-            
-            st.download_button(
-                label=f"📥 Download {rpt_type} PDF", 
-                data=pdf_bytes, 
-                file_name=f"SiteMate_{rpt_type}_Report.pdf", 
-                mime="application/pdf", 
-                type="primary", 
+                report_type=rpt_type,
+                widget_key=f"boq_{rpt_type}",
+                type="primary",
                 use_container_width=True
             )
         else:
@@ -424,45 +457,100 @@ elif selected_nav == "🛒 Marketplace":
         st.warning("⚠️ No Project Selected. Please go to 'Planning' and Load/Save a project first.")
     else:
         st.info(f"Viewing Bids for: **{current_proj}**")
-        _, _, proj_df = load_project_data(current_proj)
-        est_total = proj_df['Total Cost'].sum() if proj_df is not None else 0
-        bids = get_bids_for_project(current_proj)
+        live_bid_feed(current_proj)
+        tender = tender_status(current_proj)
+        
+        # Tender window: optional close time, sealed bids stay hidden until then
+        with st.expander(f"🗓️ Tender Settings ({'closes ' + tender['closes_at'] if tender['closes_at'] else 'open until awarded'}{', sealed' if tender['sealed'] else ''})"):
+            # Starts from the saved settings so re-saving (e.g. just toggling sealed) keeps the close time
+            saved_close = datetime.datetime.strptime(tender['closes_at'], "%Y-%m-%d %H:%M") if tender['closes_at'] else None
+            with st.form("tender_form"):
+                t1, t2, t3, t4 = st.columns(4)
+                close_date = t1.date_input("Closes on", value=saved_close.date() if saved_close else None)
+                close_time = t2.time_input("at", value=saved_close.time() if saved_close else datetime.time(17, 0))
+                no_close = t3.checkbox("Open until awarded", value=saved_close is None, help="Ignore the close date: bids stay open until one is accepted")
+                sealed = t4.checkbox("🔒 Sealed bids", value=tender['sealed'], help="Amounts stay hidden and no bid can be accepted before the close time")
+                if st.form_submit_button("💾 Save Tender Settings"):
+                    closes = None if no_close or close_date is None else datetime.datetime.combine(close_date, close_time)
+                    if set_tender(current_proj, closes, sealed):
+                        st.rerun()
+                    st.error("A sealed tender needs a close time, otherwise its bids would never open.")
+        
+        # Ranking weights (normalized by the engine)
+        with st.expander("⚖️ Ranking Weights"):
+            w = st.columns(4)
+            weights = {factor: w[i].slider(factor.title(), 0.0, 1.0, DEFAULT_WEIGHTS[factor], 0.05, key=f"w_{factor}")
+                       for i, factor in enumerate(DEFAULT_WEIGHTS)}
+        ranked = rank_bids(current_proj, weights)
         
         # --- SECTION 1: LIVE BIDS ---
         st.markdown("### 🔔 Active Bids")
-        if not bids: 
+        if ranked.empty: 
             st.info("Waiting for suppliers to bid...")
+        elif tender['is_hidden']:
+            st.info(f"🔒 {len(ranked)} sealed bid(s) received. Amounts and ranking open at {tender['closes_at']}.")
         else:
-            for bid in bids:
+            awarded = ranked[ranked['Status'] == 'Accepted']
+            if not awarded.empty:
+                st.success(f"🏆 Awarded to **{awarded['Supplier'].iloc[0]}** for ₦{awarded['Amount'].iloc[0]:,.0f}")
+                st.link_button("💳 Pay Now", "https://paystack.com", help="Payment Gateway")
+            elif st.button("🏆 Award to Top-Ranked Bid", type="primary"):
+                if award_best(current_proj, weights) is None:
+                    st.error("Could not award this tender (already awarded or still sealed).")
+                st.rerun()
+            
+            st.dataframe(
+                ranked, hide_index=True, use_container_width=True,
+                column_config={
+                    "Amount": st.column_config.NumberColumn(format="₦%.0f"),
+                    "vs Estimate %": st.column_config.NumberColumn(format="%+.1f%%"),
+                    "Score": st.column_config.ProgressColumn("Score", format="%.2f", min_value=0, max_value=1),
+                }
+            )
+            
+            # Accept / reject from the shortlist (accepting rejects every other pending bid)
+            pending = ranked[ranked['Status'] == 'Pending'].head(5)
+            for bid in pending.to_dict("records"):
                 with st.container(border=True):
                     c1, c2, c3 = st.columns([2, 2, 1])
                     with c1:
-                        st.markdown(f"### 🏭 {bid['supplier_name']}")
-                        if est_total > 0:
-                            diff = ((bid['amount'] - est_total) / est_total) * 100
-                            if abs(diff) <= 10: st.success(f"✅ Fair Price (Within {diff:.1f}% of AI Estimate)")
-                            elif diff > 10: st.warning(f"⚠️ High Bid (+{diff:.1f}%)")
-                            else: st.warning(f"📉 Suspiciously Low ({diff:.1f}%)")
+                        st.markdown(f"### #{bid['Rank']} 🏭 {bid['Supplier']}")
+                        if bid['Price Check']: st.caption(f"{bid['Price Check']} ({bid['vs Estimate %']:+.1f}% vs AI Estimate)")
                     with c2:
-                        st.metric("Bid Amount", f"₦{bid['amount']:,.0f}")
-                        st.caption(f"Status: **{bid['status']}**")
+                        st.metric("Bid Amount", f"₦{bid['Amount']:,.0f}")
+                        st.caption(f"Score **{bid['Score']:.2f}**")
                     with c3:
-                         if bid['status'] == 'Pending':
-                             if st.button("✅ Accept", key=f"acc_{bid['id']}"):
-                                 update_bid_status(bid['id'], "Accepted")
-                                 st.rerun()
-                             if st.button("❌ Reject", key=f"rej_{bid['id']}"):
-                                 update_bid_status(bid['id'], "Rejected")
-                                 st.rerun()
-                         elif bid['status'] == 'Accepted':
-                             st.success("Accepted!")
-                             st.link_button("💳 Pay Now", "https://paystack.com", help="Payment Gateway")
-                         elif bid['status'] == 'Rejected':
-                             st.error("Rejected")
+                        if st.button("✅ Accept", key=f"acc_{bid['Bid ID']}"):
+                            if not update_bid_status(bid['Bid ID'], "Accepted"):
+                                st.error("This tender has already been awarded.")
+                            st.rerun()
+                        if st.button("❌ Reject", key=f"rej_{bid['Bid ID']}"):
+                            update_bid_status(bid['Bid ID'], "Rejected")
+                            st.rerun()
+
+        st.divider()
+
+        # --- SECTION 2: MATCHED SUPPLIERS ---
+        st.markdown("### 🎯 Best-Matched Suppliers")
+        st.caption("Registered suppliers ranked by how much of this BOQ they stock (by value) and distance to site.")
+        matches = match_project(current_proj)
+        if matches.empty:
+            st.info("No registered supplier stocks the materials on this BOQ yet.")
+        else:
+            st.dataframe(
+                matches.drop(columns=["Supplier ID", "Email"]), hide_index=True, use_container_width=True,
+                column_config={
+                    "Coverage %": st.column_config.ProgressColumn("Coverage", format="%.0f%%", min_value=0, max_value=100),
+                    "Score": st.column_config.ProgressColumn("Score", format="%.2f", min_value=0, max_value=1),
+                }
+            )
+            if st.button("📣 Notify Matching Suppliers"):
+                notified = notify_matching_suppliers(current_proj)
+                st.toast(f"Tender sent to {notified} new matching supplier(s)." if notified else "Every matching supplier already has this tender.")
 
         st.divider()
 
-        # --- SECTION 2: STANDARD SUPPLIERS ---
+        # --- SECTION 3: STANDARD SUPPLIERS ---
         st.markdown("### 📚 Standard Suppliers Directory")
         st.caption("Contact registered suppliers directly if you don't want to wait for bids.")
         
@@ -479,7 +567,8 @@ elif selected_nav == "🛒 Marketplace":
                         c1, c2, c3 = st.columns([3, 1, 2])
                         with c1:
                             st.markdown(f"**{sup['name']}**")
-                            st.caption(f"⭐ {sup.get('rating', 'New')} | 📍 {selected_loc}")
+                            where = f"{sup['distance_km']} km from site" if 'distance_km' in sup else selected_loc
+                            st.caption(f"⭐ {sup.get('rating', 'New')} | 📍 {where}")
                             st.write(f"**Est. Quote:** ₦{supplier_total:,.0f}")
                         with c2:
                             st.link_button("📲 Chat", get_whatsapp_link(sup.get('phone', '000'), "Hello, I have a project..."))
@@ -503,11 +592,16 @@ elif selected_nav == "🚚 Supplier Portal":
         registered_suppliers = get_all_supplier_names()
         active_user = st.selectbox("Simulate As:", registered_suppliers)
     
-    s_tab1, s_tab2, s_tab3 = st.tabs(["💰 Job Board", "📂 My Bids (Status)", "📝 New Registration"])
+    alerts = get_notifications(active_user) if active_user else []
+    unread = sum(1 for a in alerts if a['read_at'] is None)
+    s_tab1, s_tab2, s_tab3, s_tab4 = st.tabs(["💰 Job Board", "📂 My Bids (Status)", "📝 New Registration", f"🔔 Tender Alerts ({unread})" if unread else "🔔 Tender Alerts"])
     
     with s_tab1:
         st.markdown(f"### 🔍 Live Tenders (Viewing as: {active_user})")
-        tenders = get_open_tenders(selected_loc)
+        if active_user: live_supplier_feed(active_user)
+        close_times = get_tender_close_times()
+        now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        tenders = [t for t in get_open_tenders(selected_loc) if not (close_times.get(t['name'], (None,))[0] or "9999") <= now_str]
         
         if not tenders:
             st.info(f"No active tenders found in {selected_loc}.")
@@ -515,18 +609,21 @@ elif selected_nav == "🚚 Supplier Portal":
             for job in tenders:
                 with st.expander(f"📢 {job['name']} ({job['items']} Items Needed)"):
                     st.write(f"**Est. Value:** ₦{job['est_value']:,.0f}")
-                    c1, c2 = st.columns([2,1])
+                    closes, sealed = close_times.get(job['name'], (None, False))
+                    if closes: st.caption(f"⏰ Closes {closes}{' · 🔒 sealed bids' if sealed else ''}")
+                    c1, c2, c3 = st.columns([2, 1, 1])
                     with c1: bid_amt = st.number_input("Your Bid (₦)", min_value=100000.0, step=10000.0, key=f"bid_{job['name']}")
-                    with c2:
+                    with c2: lead_days = st.number_input("Delivery (days)", min_value=1, value=7, key=f"days_{job['name']}")
+                    with c3:
                         st.write("") 
                         if st.button("🚀 Submit Bid", key=f"sub_{job['name']}"):
-                            if submit_bid(job['name'], active_user, bid_amt, "08012345678"):
+                            if submit_bid(job['name'], active_user, bid_amt, "08012345678", delivery_days=int(lead_days)):
                                 st.success(f"Bid Sent as '{active_user}'!")
-                            else: st.error("Error submitting bid.")
+                            else: st.error("Bidding has closed for this tender.")
 
     with s_tab2:
         st.markdown(f"### 📂 Bid History for {active_user}")
-        my_bids = get_supplier_bids(active_user)
+        my_bids, next_cursor = fetch_page(f"my_bids_{active_user}", get_supplier_bids_page, active_user)
         
         if not my_bids:
             st.info("You haven't submitted any bids yet.")
@@ -542,6 +639,7 @@ elif selected_nav == "🚚 Supplier Portal":
                         st.caption(f"Bid Amount: ₦{bid['amount']:,.0f} | Date: {bid['timestamp']}")
                     with c2:
                         st.markdown(f":{color}[**{status}**]")
+            page_controls(f"my_bids_{active_user}", next_cursor)
 
     with s_tab3:
         st.markdown("### 📝 Register Business")
@@ -557,6 +655,24 @@ elif selected_nav == "🚚 Supplier Portal":
                     st.success(f"Registered {r_name}!")
                     st.rerun()
 
+    with s_tab4:
+        st.markdown(f"### 🔔 New Tenders Matching {active_user}'s Stock")
+        if not alerts:
+            st.info("No tender alerts yet. New projects that need what you stock will show up here.")
+        else:
+            for alert in alerts:
+                with st.container(border=True):
+                    c1, c2 = st.columns([3, 1])
+                    with c1:
+                        st.markdown(f"{'🆕 ' if alert['read_at'] is None else ''}**{alert['project_name']}** · {alert['location'] or 'Unknown site'}")
+                        where = f"{alert['distance_km']:,.0f} km from your base" if alert['distance_km'] is not None else "distance unknown"
+                        st.caption(f"You stock {alert['coverage'] * 100:.0f}% of the BOQ by value | {where} | {alert['created_at']}")
+                    with c2:
+                        if alert['est_value']: st.metric("Est. Value", f"₦{alert['est_value']:,.0f}")
+            if unread and st.button("✔️ Mark All as Read"):
+                mark_notifications_read(active_user)
+                st.rerun()
+
 # ==========================================
 # 🚧 TAB 4: SITE OPERATIONS (The "Site Manager" View)
 # ==========================================
@@ -574,10 +690,11 @@ elif selected_nav == "🚧 Site Operations":
     else:
         st.success(f"Managing Site: **{current_proj}**")
         
-        df_exp = get_project_expenses(current_proj)
-        inventory_df = get_project_inventory(current_proj)
-        history_df = get_inventory_logs(current_proj)
-        diary_df = get_site_diary(current_proj)
+        # Histories are paged; full frames are only loaded when a PDF is prepared
+        metrics = get_project_metrics(current_proj)
+        spend_by_cat = metrics["spend_by_category"]
+        inventory_df = metrics["stock"]
+        data_version = get_project_fingerprint(current_proj)
 
         op_tab1, op_tab2, op_tab3 = st.tabs(["💸 Expense Log", "📦 Inventory Control", "📅 Daily Diary (DSR)"])
         
@@ -598,11 +715,14 @@ elif selected_nav == "🚧 Site Operations":
             
             with c2:
                 st.markdown("#### Financial Overview")
-                if not df_exp.empty:
-                    st.dataframe(df_exp, use_container_width=True)
-                    st.metric("Total Spent", f"₦{df_exp['amount'].sum():,.0f}")
-                    pdf_bytes = generate_expense_pdf(current_proj, 0, df_exp)
-                    st.download_button("📥 Download Ledger PDF", pdf_bytes, "expense_log.pdf", "application/pdf")
+                if not spend_by_cat.empty:
+                    exp_page, next_cursor = fetch_page(f"ops_exp_{current_proj}", get_project_expenses_page, current_proj)
+                    st.dataframe(exp_page, use_container_width=True)
+                    page_controls(f"ops_exp_{current_proj}", next_cursor)
+                    st.metric("Total Spent", f"₦{metrics['spent']:,.0f}", delta=f"₦{metrics['burn_rate_weekly']:,.0f} / week", delta_color="off")
+                    if snapshot_as_of(): st.caption(f"Totals as of {snapshot_as_of()} (new entries show within {MAX_STALENESS:g}s).")
+                    report_download_button("📥 Download Ledger PDF", "expense_log.pdf", "expense",
+                                           loader=lambda: (current_proj, 0, get_project_expenses(current_proj)), fingerprint=(current_proj, data_version), widget_key="ops_expense")
                 else:
                     st.info("No expenses logged yet.")
 
@@ -634,10 +754,12 @@ elif selected_nav == "🚧 Site Operations":
                     st.altair_chart(inv_chart, use_container_width=True)
                     
                     with st.expander("📜 Transaction History"):
-                        st.dataframe(history_df, use_container_width=True)
+                        history_page, next_cursor = fetch_page(f"ops_inv_{current_proj}", get_inventory_logs_page, current_proj)
+                        st.dataframe(history_page, use_container_width=True)
+                        page_controls(f"ops_inv_{current_proj}", next_cursor)
                     
-                    inv_pdf = generate_inventory_pdf(current_proj, inventory_df, history_df)
-                    st.download_button("📥 Download Inventory Report", inv_pdf, "inventory.pdf", "application/pdf")
+                    report_download_button("📥 Download Inventory Report", "inventory.pdf", "inventory",
+                                           loader=lambda: (current_proj, get_project_inventory(current_proj), get_inventory_logs(current_proj)), fingerprint=(current_proj, data_version), widget_key="ops_inventory")
                 else:
                     st.info("Inventory is empty. Add stock to see charts.")
 
@@ -665,9 +787,10 @@ elif selected_nav == "🚧 Site Operations":
 
             with dc2:
                 st.markdown("#### 📜 Site Diary History")
-                if not diary_df.empty:
+                diary_page, next_cursor = fetch_page(f"ops_diary_{current_proj}", get_site_diary_page, current_proj)
+                if not diary_page.empty:
                     st.dataframe(
-                        diary_df, 
+                        diary_page, 
                         use_container_width=True, 
                         hide_index=True,
                         column_config={
@@ -678,7 +801,72 @@ elif selected_nav == "🚧 Site Operations":
                             "Issues": "Blockers"
                         }
                     )
-                    pdf = generate_diary_pdf(current_proj, diary_df)
-                    st.download_button("📥 Download DSR Report (PDF)", pdf, "site_report.pdf", "application/pdf")
+                    page_controls(f"ops_diary_{current_proj}", next_cursor)
+                    report_download_button("📥 Download DSR Report (PDF)", "site_report.pdf", "diary",
+                                           loader=lambda: (current_proj, get_site_diary(current_proj)), fingerprint=(current_proj, data_version), widget_key="ops_diary")
                 else:
-                    st.info("No daily reports submitted yet.")
\ No newline at end of file
+                    st.info("No daily reports submitted yet.")
+
+# ==========================================
+# 📈 TAB 5: PERFORMANCE (Chief Engineer only)
+# ==========================================
+elif selected_nav == "📈 Performance":
+    st.title("📈 Performance")
+    st.caption("Where page renders, database queries, API calls, reports and engine runs spend their time (this server process, most recent spans).")
+
+    spans_now = recent_spans()
+    summary = span_summary()
+    slowest = slowest_requests(10)
+    cache = cache_stats()
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Spans Buffered", f"{len(spans_now):,} / {MAX_SPANS:,}")
+    m2.metric("Requests Traced", f"{sum(1 for s in spans_now if s['kind'] == 'request'):,}")
+    m3.metric("Failed Spans", int(summary['errors'].sum()) if not summary.empty else 0)
+    cache_calls = int(cache['calls'].sum()) if not cache.empty else 0
+    m4.metric("Query Cache Hit Ratio", f"{cache['hits'].sum() / cache_calls:.0%}" if cache_calls else "—")
+
+    perf_tab1, perf_tab2, perf_tab3 = st.tabs(["⏱️ Spans (p50 / p95)", "🐢 Slowest Requests", "🗄️ Query Cache"])
+    with perf_tab1:
+        kinds = sorted(summary['kind'].unique()) if not summary.empty else []
+        picked = st.multiselect("Span kinds", kinds, default=kinds)
+        st.dataframe(
+            summary[summary['kind'].isin(picked)], use_container_width=True, hide_index=True,
+            column_config={
+                "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+                "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                "max_ms": st.column_config.NumberColumn("Max (ms)", format="%.1f"),
+                "total_ms": st.column_config.NumberColumn("Total (ms)", format="%.0f"),
+                "avg_bytes": st.column_config.NumberColumn("Avg Bytes", format="%.0f"),
+                "avg_rows": st.column_config.NumberColumn("Avg Rows", format="%.0f"),
+            }
+        )
+    with perf_tab2:
+        if slowest.empty:
+            st.info("No completed page renders recorded yet.")
+        else:
+            st.dataframe(slowest.drop(columns="trace_id"), use_container_width=True, hide_index=True)
+            labels = {row.trace_id: f"{row.request} · {row.duration_ms:,.0f} ms at {row.started}" for row in slowest.itertuples()}
+            picked_trace = st.selectbox("Breakdown", list(labels), format_func=labels.get)
+            st.dataframe(trace_spans(picked_trace), use_container_width=True, hide_index=True)
+    with perf_tab3:
+        st.caption(f"{cache.attrs.get('shared_entries', 0)} entries in the shared tier.")
+        st.dataframe(cache, use_container_width=True, hide_index=True)
+        st.markdown("##### 🪞 Dashboard Read Snapshot")
+        replicas = replica_stats()
+        if replicas:
+            st.caption(f"Job board and KPI reads are served from a copy refreshed at most every {MAX_STALENESS:g}s after a write.")
+            st.dataframe(pd.DataFrame(replicas), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Off: dashboard reads go to the primary database (PostgreSQL, or SITEMATE_REPLICA_STALENESS=0).")
+
+    st.divider()
+    c1, c2 = st.columns(2)
+    c1.download_button("📥 Export Spans (JSONL)", export_jsonl(), file_name=f"sitemate_spans_{time.strftime('%Y%m%d_%H%M')}.jsonl",
+                       mime="application/x-ndjson", use_container_width=True)
+    if c2.button("🧹 Clear Trace Buffer & Cache Stats", use_container_width=True):
+        clear_traces()
+        reset_stats()
+        st.rerun()
+
+end_request()
@@ -0,0 +1,121 @@
+### (Portfolio reports: pandas per project vs. one SQL query per report. Seeds a synthetic
+### portfolio with Dataset/generate_full_database.py, then builds spend by category, cement used
+### vs. BOQ and supplier win rates three ways: loading each project's DataFrames through
+### db_manager, logic.analytics on DuckDB (cold = including the columnar copy), and
+### logic.analytics on SQLite directly. Checks that all three agree.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_analytics.py                         # 10,000 projects
+###   python benchmarks/bench_analytics.py --projects 2000 --rows-per-project 100
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logic.analytics as analytics
+import logic.db_manager as db
+
+GENERATOR_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "Dataset", "generate_full_database.py"))
+
+def _load_generator():
+    spec = importlib.util.spec_from_file_location("generate_full_database", GENERATOR_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def seed(path, args):
+    gen = _load_generator()
+    seeded = argparse.Namespace(projects=args.projects, bids_per_project=6, expenses_per_project=args.rows_per_project,
+                                inventory_logs_per_project=args.rows_per_project, diary_days=0, commit_every=1000)
+    start = time.perf_counter()
+    counts, _ = gen.populate_db(path, gen.generate_suppliers(2000, random.Random(7)), random.Random(8), seeded)
+    print(f"Seeded {counts['projects']:,} projects, {counts['expenses']:,} expenses, {counts['inventory_logs']:,} stock moves, "
+          f"{counts['bids']:,} bids in {time.perf_counter() - start:.1f}s")
+
+def pandas_per_project():
+    """What a portfolio report costs today: every project's BOQ, ledger, stock log and bids loaded one by one."""
+    spend, cement, bids = [], [], []
+    for name, _ in db.get_all_projects.uncached():
+        location, _, boq = db.load_project_data.uncached(name)
+        expenses = db.get_project_expenses.uncached(name)
+        logs = db.get_inventory_logs.uncached(name)
+        planned = boq["Total Cost"].sum() if boq is not None else 0.0
+
+        spend.append(expenses.groupby("category")["amount"].agg(["sum", "count"]).assign(project=name))
+        boq_qty = boq.loc[boq["Item"].str.lower().str.contains("cement"), "Qty"].sum() if boq is not None else 0.0
+        moves = logs.loc[logs["Item"].str.lower().str.contains("cement"), "Change"]
+        cement.append((name, location, float(boq_qty), float(moves[moves > 0].sum()), float(-moves[moves < 0].sum())))
+        bids.extend((r["supplier_name"], r["status"], r["amount"], planned) for r in db.get_bids_for_project.uncached(name))
+
+    spend = pd.concat(spend).groupby(level=0).agg(amount=("sum", "sum"), entries=("count", "sum"))
+    cement = pd.DataFrame(cement, columns=["project", "location", "boq_qty", "delivered", "used"])
+    bids = pd.DataFrame(bids, columns=["supplier", "status", "amount", "planned"])
+    wins = bids.assign(won=bids["status"] == "Accepted").groupby("supplier").agg(bids=("status", "size"), wins=("won", "sum"))
+    return spend, cement, wins
+
+def sql_reports():
+    return analytics.spend_by_category(), analytics.cement_vs_boq(), analytics.supplier_win_rates()
+
+def _agree(baseline, reports):
+    """Same totals per category, per-project cement figures and per-supplier wins as the pandas baseline."""
+    spend, cement, wins = baseline
+    s, c, w = reports
+    ok = np.allclose(s.set_index("category").loc[spend.index, "amount"], spend["amount"])
+    merged = c.set_index("project").loc[cement["project"]]
+    ok &= np.allclose(merged[["boq_qty", "delivered", "used"]].to_numpy(dtype=float), cement[["boq_qty", "delivered", "used"]].to_numpy())
+    ok &= (w.set_index("supplier").loc[wins.index, ["bids", "wins"]].to_numpy() == wins[["bids", "wins"]].to_numpy()).all()
+    return bool(ok)
+
+def _timed(fn, repeat=1):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio reports: pandas per project vs. DuckDB vs. SQLite.")
+    parser.add_argument("--projects", type=int, default=10_000)
+    parser.add_argument("--rows-per-project", type=int, default=30, help="Expenses and stock movements per project")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per warm measurement (fastest is reported)")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="sitemate_analytics_"), "portfolio.db")
+    seed(path, args)
+    db.DB_FILE = path
+
+    baseline_ms, baseline = _timed(pandas_per_project)
+    results = [("pandas per project", baseline_ms, True)]
+
+    analytics.USE_DUCKDB = True
+    try:
+        cold_ms, reports = _timed(sql_reports)
+        info = analytics.engine_info()
+        results.append((f"duckdb cold ({info['method']} copy {info['load_ms']:,.0f} ms)", cold_ms, _agree(baseline, reports)))
+        warm_ms, reports = _timed(sql_reports, args.repeat)
+        results.append(("duckdb warm", warm_ms, _agree(baseline, reports)))
+    except ImportError:
+        print("duckdb not installed (pip install duckdb): skipping the DuckDB rows")
+
+    analytics.USE_DUCKDB = False
+    direct_ms, reports = _timed(sql_reports, args.repeat)
+    results.append(("sqlite direct SQL", direct_ms, _agree(baseline, reports)))
+
+    print(f"\n--- PORTFOLIO REPORTS ({args.projects:,} projects; spend by category + cement vs BOQ + win rates) ---")
+    print(f"{'approach':<52}{'time':>12}{'speedup':>10}  agrees")
+    for label, ms, ok in results:
+        print(f"{label:<52}{ms:>9,.0f} ms{baseline_ms / ms:>9.1f}x  {'✅' if ok else '❌'}")
+    sys.exit(0 if all(ok for _, _, ok in results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+### (Benchmark: portfolio ZIP export throughput (reports/sec) vs. worker count.)
+### Run from sitemate_app/:  python benchmarks/bench_batch_export.py --projects 40 --workers 1 2 4
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+# Path fix to find 'logic' folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import logic.db_manager as db
+from logic.batch_export import export_portfolio
+
+ITEMS = ["Cement", "Sand (Tons)", "Granite (Tons)", "Blocks (9 inch)", "Iron Rods (12mm)"]
+
+def seed_db(path, n_projects, rows_per_table, seed=7):
+    """Creates a throwaway portfolio DB with BOQs, expenses, inventory logs and diaries."""
+    rng = random.Random(seed)
+    db.DB_FILE = path
+    db.init_db()
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    for p in range(n_projects):
+        name = f"Bench Project {p:04d}"
+        boq = pd.DataFrame([{"Item": i, "Qty": rng.randint(10, 500), "Unit Price": rng.randint(500, 20000)} for i in ITEMS])
+        boq["Total Cost"] = boq["Qty"] * boq["Unit Price"]
+        c.execute("INSERT INTO projects (name, location, soil, boq_json, timestamp) VALUES (?, ?, ?, ?, ?)",
+                  (name, "Lekki, Lagos", "Swampy", boq.to_json(), "2026-01-01 08:00"))
+        c.executemany("INSERT INTO expenses (project_name, item_name, amount, category, date, note) VALUES (?, ?, ?, ?, ?, ?)",
+                      [(name, rng.choice(ITEMS), rng.randint(1000, 500000), "Materials", f"2026-01-{d % 28 + 1:02d}", "bench") for d in range(rows_per_table)])
+        c.executemany("INSERT INTO inventory_logs (project_name, item_name, change_qty, unit, operation, date, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      [(name, rng.choice(ITEMS), 5.0, "Bags", "Stock IN", f"2026-01-{d % 28 + 1:02d}", "09:00") for d in range(rows_per_table)])
+        c.executemany("INSERT INTO inventory (project_name, item_name, quantity, unit, last_updated) VALUES (?, ?, ?, ?, ?)",
+                      [(name, i, 100.0, "Bags", "2026-01-28") for i in ITEMS])
+        c.executemany("INSERT INTO site_diary (project_name, date, weather, labor_count, work_done, issues, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      [(name, f"2026-01-{d + 1:02d}", "☀️ Sunny", json.dumps({"Mason": 2, "Laborer": 4}), "Block work", "", "17:00") for d in range(min(rows_per_table, 28))])
+    conn.commit()
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch export throughput benchmark")
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=200, help="Expense/inventory rows per project")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_portfolio.db")
+        seed_db(db_path, args.projects, args.rows)
+        print(f"--- BATCH EXPORT BENCHMARK ({args.projects} projects x 4 reports) ---")
+        baseline = None
+        for n in args.workers:
+            stats = export_portfolio(os.path.join(tmp, f"out_{n}.zip"), db_file=db_path, workers=n, progress=None)
+            baseline = baseline or stats["reports_per_sec"]
+            size_mb = os.path.getsize(os.path.join(tmp, f"out_{n}.zip")) / 1e6
+            print(f"workers={n:<3} {stats['reports']:>5} reports  {stats['seconds']:6.2f}s  "
+                  f"{stats['reports_per_sec']:7.1f} reports/s  x{stats['reports_per_sec'] / baseline:.2f}  ({size_mb:.1f} MB zip)")
+
+if __name__ == "__main__":
+    main()
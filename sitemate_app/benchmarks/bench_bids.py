@@ -0,0 +1,121 @@
+### (Tender evaluation at scale. Seeds tenders with thousands of bids each, then times the old
+### Marketplace path (every bid row fetched, % vs estimate and the price label worked out in a
+### Python loop) against logic.bid_engine.rank_bids (one indexed query, weighted score in NumPy).
+### Finally fires concurrent awards at one tender and checks that exactly one bid was accepted
+### and every other one rejected.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_bids.py                                # 50 tenders x 5,000 bids
+###   python benchmarks/bench_bids.py --tenders 200 --bids 2000 --awarders 16
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logic.bid_engine as bid_engine
+import logic.db_manager as db
+from logic.query_cache import invalidate
+from logic.storage import SQLiteBackend, use_backend
+
+LOCATIONS = ["Lekki, Lagos", "Ibadan, Oyo", "Abuja, FCT"]
+BOQ = pd.DataFrame({"Item": ["Cement"], "Qty": [1000.0], "Unit Price": [10500.0], "Total Cost": [10_500_000.0]})
+
+def seed(args, rng):
+    backend = db._backend()
+    tenders = [f"Tender {i:04d}" for i in range(args.tenders)]
+    for name in tenders:
+        db.save_project(name, rng.choice(LOCATIONS), "Firm", BOQ)
+    conn = db._connect()
+    with conn:
+        backend.bulk_insert(conn, "suppliers", ["company_name", "location", "phone", "email", "materials", "rating", "timestamp"],
+                            [(f"Supplier {i:05d}", rng.choice(LOCATIONS), "0803", f"s{i}@x", '["Cement"]', round(rng.uniform(2, 5), 1), "2026-01-01")
+                             for i in range(args.suppliers)])
+        for name in tenders:
+            backend.bulk_insert(conn, "bids", ["project_name", "supplier_name", "amount", "phone", "status", "timestamp", "delivery_days"],
+                                [(name, f"Supplier {rng.randrange(args.suppliers):05d}", round(10_500_000 * rng.uniform(0.8, 1.3), -3), "0803",
+                                  "Pending", f"2026-01-{1 + j % 28:02d} 10:00", rng.randint(2, 30)) for j in range(args.bids)])
+    conn.close()
+    return tenders
+
+def legacy_board(project):
+    """The Marketplace loop before bid_engine: all rows, then per-bid arithmetic in Python."""
+    _, _, proj_df = db.load_project_data.uncached(project)
+    est_total = proj_df["Total Cost"].sum()
+    cards = []
+    for bid in db.get_bids_for_project.uncached(project):
+        diff = (bid["amount"] - est_total) / est_total * 100
+        label = "Fair" if abs(diff) <= 10 else "High" if diff > 10 else "Low"
+        cards.append((bid["supplier_name"], bid["amount"], diff, label))
+    return cards
+
+def ranked_board(project):
+    invalidate(f"bids:{project}")  # Time the query too, not a cache hit
+    return bid_engine.rank_bids(project)
+
+def _timed(fn, projects):
+    ms = []
+    for project in projects:
+        start = time.perf_counter()
+        fn(project)
+        ms.append((time.perf_counter() - start) * 1000)
+    return np.array(ms)
+
+def race_awards(project, awarders, rng):
+    """`awarders` threads accept different bids at once; returns (accepted, rejected, pending, award p50 ms)."""
+    ids = rng.sample(bid_engine.rank_bids(project)["Bid ID"].tolist(), awarders)
+    barrier, ms, wins = threading.Barrier(awarders), [], []
+    def award(bid_id):
+        barrier.wait()
+        start = time.perf_counter()
+        wins.append(db.update_bid_status(bid_id, "Accepted"))
+        ms.append((time.perf_counter() - start) * 1000)
+    threads = [threading.Thread(target=award, args=(i,)) for i in ids]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    status = bid_engine.rank_bids(project)["Status"].value_counts()
+    return sum(wins), int(status.get("Accepted", 0)), int(status.get("Rejected", 0)), int(status.get("Pending", 0)), float(np.median(ms))
+
+def main():
+    parser = argparse.ArgumentParser(description="Bid ranking and single-award checks at thousands of bids per tender.")
+    parser.add_argument("--tenders", type=int, default=50)
+    parser.add_argument("--bids", type=int, default=5000, help="Bids per tender")
+    parser.add_argument("--suppliers", type=int, default=2000)
+    parser.add_argument("--awarders", type=int, default=8, help="Concurrent award attempts on one tender")
+    args = parser.parse_args()
+
+    rng = random.Random(48)
+    path = os.path.join(tempfile.mkdtemp(prefix="sitemate_bids_"), "bids.db")
+    use_backend(SQLiteBackend(path, timeout=db.BUSY_TIMEOUT))
+    db.set_search_status("disabled", "bid benchmark: SQL paths only")
+    try:
+        db.init_db()
+        start = time.perf_counter()
+        tenders = seed(args, rng)
+        print(f"Seeded {args.tenders:,} tenders x {args.bids:,} bids ({args.tenders * args.bids:,} rows) in {time.perf_counter() - start:.1f}s")
+
+        sample = tenders[:min(len(tenders), 20)]
+        legacy, ranked = _timed(legacy_board, sample), _timed(ranked_board, sample)
+        print(f"\n--- BID BOARD PER TENDER ({args.bids:,} bids; {len(sample)} tenders timed) ---")
+        print(f"{'approach':<36}{'p50':>12}{'p95':>12}")
+        for label, ms in [("rows + Python loop (before)", legacy), ("rank_bids (SQL + NumPy score)", ranked)]:
+            print(f"{label:<36}{np.percentile(ms, 50):>9.1f} ms{np.percentile(ms, 95):>9.1f} ms")
+
+        won, accepted, rejected, pending, award_ms = race_awards(tenders[-1], args.awarders, rng)
+        ok = won == 1 and accepted == 1 and rejected == args.bids - 1 and pending == 0
+        print(f"\n--- {args.awarders} CONCURRENT AWARDS ON ONE TENDER ---")
+        print(f"winning calls {won}, accepted {accepted}, rejected {rejected:,}, pending {pending}; award p50 {award_ms:.1f} ms  {'✅' if ok else '❌'}")
+        sys.exit(0 if ok else 1)
+    finally:
+        use_backend(None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+### (Benchmark: bulk CSV-style ingestion vs. one update_inventory/log_expense call per row.)
+### Run from sitemate_app/:  python benchmarks/bench_bulk_ingest.py --rows 100000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Path fix to find 'logic' folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logic.db_manager as db
+from logic.bulk_ingest import ingest_expenses, ingest_inventory
+
+ITEMS = np.array(["Cement", "Sand (Tons)", "Granite (Tons)", "Blocks (9 inch)", "Iron Rods (12mm)"])
+
+def make_sheets(n_rows, seed=1):
+    rng = np.random.default_rng(seed)
+    dates = (pd.Timestamp("2025-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 365, n_rows)), unit="D")).strftime("%Y-%m-%d")
+    inventory = pd.DataFrame({
+        "Item": ITEMS[rng.integers(0, len(ITEMS), n_rows)],
+        "Qty": rng.integers(1, 50, n_rows),
+        "Operation": np.where(rng.random(n_rows) < 0.6, "IN", "OUT"),
+        "Date": dates,
+    })
+    expenses = pd.DataFrame({
+        "Item": ITEMS[rng.integers(0, len(ITEMS), n_rows)],
+        "Amount": rng.integers(1000, 500000, n_rows),
+        "Category": rng.choice(["Materials", "Labor", "Logistics"], n_rows),
+        "Date": dates,
+        "Note": "bench",
+    })
+    return inventory, expenses
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingestion benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--per-row-sample", type=int, default=500, help="Rows for the one-commit-per-row comparison")
+    args = parser.parse_args()
+
+    inventory, expenses = make_sheets(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_FILE = os.path.join(tmp, "bench_ingest.db")
+        db.init_db()
+        print(f"--- BULK INGEST BENCHMARK ({args.rows:,} rows) ---")
+
+        start = time.perf_counter()
+        n, errors = ingest_expenses("Bench Site", expenses)
+        s = time.perf_counter() - start
+        print(f"💸 Expenses : {n:,} rows in {s:.2f}s -> {n / s:,.0f} rows/s ({len(errors)} rejected)")
+
+        start = time.perf_counter()
+        n, errors = ingest_inventory("Bench Site", inventory)
+        s = time.perf_counter() - start
+        print(f"📦 Inventory: {n:,} rows in {s:.2f}s -> {n / s:,.0f} rows/s ({len(errors)} rejected as overdrafts/invalid)")
+
+        sample = expenses.head(args.per_row_sample)
+        start = time.perf_counter()
+        for r in sample.itertuples():
+            db.log_expense("Per Row Site", r.Item, float(r.Amount), r.Category, r.Note)
+        s = time.perf_counter() - start
+        print(f"🐢 log_expense per row: {len(sample) / s:,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+### (Catalogue benchmark: load/index time and lookup latency for the offline
+### material catalogue, on the real Dataset file and on synthetic catalogues
+### built by cloning its listings with new brands, sizes and suppliers.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_catalogue.py [--sizes 10000 100000] [--lookups 2000]
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from logic.catalogue import CATALOGUE_FILE, MaterialCatalogue
+
+# Names the app actually prices (agent context, BOQ rows, inventory form)
+BOQ_QUERIES = [
+    "Cement", "Granite", "Sharp Sand", "12mm Iron Rod", "9-inch Vibrated Block", "Iron Rods (16mm)",
+    "Blocks (6 inch)", "Sand (Tons)", "Roofing sheet", "2.5mm cable", "PVC pipe 4 inch", "Cemnt", "Diesel",
+]
+
+def synthetic_records(base, n, seed=7):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        src = base[i % len(base)]
+        records.append({
+            "objectID": f"{src['category'][:3]}_{i:07d}",
+            "name": f"{src['name']} - Brand {rng.randint(1, 500)}",
+            "category": src["category"],
+            "price": round(src["price"] * rng.uniform(0.85, 1.2)),
+            "unit": src["unit"],
+            "supplier": f"Supplier {rng.randint(1, 2000)}",
+            "location": src["location"],
+            "_geoloc": {"lat": src["_geoloc"]["lat"] + rng.uniform(-2, 2), "lng": src["_geoloc"]["lng"] + rng.uniform(-2, 2)},
+        })
+    return records
+
+def bench_file(path, lookups):
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as f:
+        records = json.load(f)
+    parsed = time.perf_counter()
+    catalogue = MaterialCatalogue(records)
+    built = time.perf_counter()
+
+    latencies = {"resolve": [], "market_price": []}
+    for k in range(lookups):
+        query = BOQ_QUERIES[k % len(BOQ_QUERIES)]
+        t = time.perf_counter(); catalogue.resolve(query); latencies["resolve"].append(time.perf_counter() - t)
+        t = time.perf_counter(); catalogue.market_price(query); latencies["market_price"].append(time.perf_counter() - t)
+
+    print(f"\n{catalogue.size:>9,} listings | {len(catalogue.vocabulary):,} tokens | {len(catalogue.categories)} categories")
+    print(f"  parse JSON   : {(parsed - start) * 1000:9.1f} ms")
+    print(f"  build index  : {(built - parsed) * 1000:9.1f} ms")
+    for name, values in latencies.items():
+        ms = np.array(values) * 1000
+        print(f"  {name:<13}: p50 {np.percentile(ms, 50):7.3f} ms   p95 {np.percentile(ms, 95):7.3f} ms")
+    return catalogue
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the offline material catalogue.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    catalogue = bench_file(CATALOGUE_FILE, args.lookups)
+    print("\n  Sample resolutions:")
+    for query in BOQ_QUERIES:
+        price, label = catalogue.market_price(query)
+        print(f"    {query:<22} -> {label} (N{price:,.0f})")
+
+    with open(CATALOGUE_FILE, encoding="utf-8") as f:
+        base = json.load(f)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"catalogue_{n}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(synthetic_records(base, n), f)
+            bench_file(path, args.lookups)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+### (Live feed polling: whole lists vs. deltas since the last event id. Seeds open tenders with bids,
+### then runs rounds of new bids / tenders through db_manager while simulated sessions poll:
+### engineers re-reading their project's bids and suppliers re-reading the job board (before), or
+### each session asking logic.event_feed for the events past its cursor. Checks that every session
+### saw each of its events exactly once, and times publish -> wake-up for in-process subscribers.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_event_feed.py                          # 200 tenders x 500 bids, 50 sessions
+###   python benchmarks/bench_event_feed.py --tenders 50 --sessions 200 --rounds 20
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logic.db_manager as db
+import logic.event_feed as feed
+from logic.storage import SQLiteBackend, use_backend
+
+LOCATIONS = ["Lekki, Lagos", "Ibadan, Oyo", "Abuja, FCT"]
+BOQ = pd.DataFrame({"Item": ["Cement", "Sharp Sand"], "Qty": [600.0, 40], "Unit Price": [10500.0, 130000]}).assign(
+    **{"Total Cost": lambda d: d["Qty"] * d["Unit Price"]})
+
+def seed(args, rng):
+    backend = db._backend()
+    tenders = [f"Tender {i:04d}" for i in range(args.tenders)]
+    conn = db._connect()
+    with conn:
+        backend.bulk_insert(conn, "projects", ["name", "location", "soil", "boq_json", "timestamp", "planned_total"],
+                            [(name, LOCATIONS[i % 3], "Firm", BOQ.to_json(), "2026-01-01 09:00", float(BOQ["Total Cost"].sum()))
+                             for i, name in enumerate(tenders)])
+        for name in tenders:
+            backend.bulk_insert(conn, "bids", ["project_name", "supplier_name", "amount", "phone", "status", "timestamp"],
+                                [(name, f"Supplier {rng.randrange(args.suppliers):04d}", 9_000_000.0, "0803", "Pending", "2026-01-02 10:00")
+                                 for _ in range(args.bids)])
+    conn.close()
+    return tenders
+
+def make_sessions(args, tenders, rng):
+    """Half engineers watching one tender each, half suppliers watching their own feed."""
+    engineers = [{"project": rng.choice(tenders)} for _ in range(args.sessions // 2)]
+    suppliers = [{"supplier": f"Supplier {rng.randrange(args.suppliers):04d}", "location": rng.choice(LOCATIONS)}
+                 for _ in range(args.sessions - len(engineers))]
+    return engineers, suppliers
+
+def poll_lists(engineers, suppliers):
+    """Before: each poll re-reads the whole list (uncached, as a rerun after a write would)."""
+    rows = 0
+    for s in engineers:
+        rows += len(db.get_bids_for_project.uncached(s["project"]))
+    for s in suppliers:
+        rows += len(db.get_open_tenders.uncached(s["location"]))
+    return rows
+
+def poll_feed(engineers, suppliers, seen):
+    """After: each session reads only the events past its own cursor."""
+    rows = 0
+    for i, s in enumerate(engineers):
+        events, s["cursor"] = feed.events_since(s["cursor"], project_name=s["project"])
+        seen.update(("e", i, e["id"]) for e in events)
+        rows += len(events)
+    for i, s in enumerate(suppliers):
+        events, s["cursor"] = feed.events_since(s["cursor"], supplier_name=s["supplier"])
+        seen.update(("s", i, e["id"]) for e in events)
+        rows += len(events)
+    return rows
+
+def wake_latency(samples):
+    """ms from a committed write to an in-process waiter waking up."""
+    ms = []
+    for i in range(samples):
+        woke = []
+        waiter = threading.Thread(target=lambda: (feed.wait_for_events(feed._latest, 5), woke.append(time.perf_counter())))
+        waiter.start()
+        time.sleep(0.01)
+        start = time.perf_counter()
+        db.save_project(f"Wake {i:03d}", "Lekki, Lagos", "Firm", BOQ)
+        waiter.join()
+        ms.append((woke[0] - start) * 1000)
+    return np.array(ms)
+
+def main():
+    parser = argparse.ArgumentParser(description="Live feed: full-list polling vs. event-id deltas.")
+    parser.add_argument("--tenders", type=int, default=200)
+    parser.add_argument("--bids", type=int, default=500, help="Seeded bids per tender")
+    parser.add_argument("--suppliers", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=50, help="Polling sessions (half engineers, half suppliers)")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--writes", type=int, default=20, help="New bids per round (plus one new tender)")
+    args = parser.parse_args()
+
+    rng = random.Random(50)
+    path = os.path.join(tempfile.mkdtemp(prefix="sitemate_feed_"), "feed.db")
+    use_backend(SQLiteBackend(path, timeout=db.BUSY_TIMEOUT))
+    db.set_search_status("disabled", "feed benchmark: SQL paths only")
+    try:
+        db.init_db()
+        start = time.perf_counter()
+        tenders = seed(args, rng)
+        print(f"Seeded {args.tenders:,} tenders x {args.bids:,} bids in {time.perf_counter() - start:.1f}s")
+
+        engineers, suppliers = make_sessions(args, tenders, rng)
+        for s in engineers + suppliers:
+            s["cursor"] = feed.latest_event_id()
+        watched = Counter(s["project"] for s in engineers)
+        expected, seen = 0, Counter()
+        list_ms, feed_ms, list_rows, feed_rows, idle_ms = [], [], 0, 0, []
+        for r in range(args.rounds):
+            for _ in range(args.writes):
+                project = rng.choice(tenders)
+                db.submit_bid(project, f"Supplier {rng.randrange(args.suppliers):04d}", 8_500_000.0, "0803", rng.randint(2, 20))
+                expected += watched[project]
+            db.save_project(f"New Tender {r:03d}", rng.choice(LOCATIONS), "Firm", BOQ)
+            expected += len(suppliers)
+
+            t0 = time.perf_counter()
+            list_rows += poll_lists(engineers, suppliers)
+            t1 = time.perf_counter()
+            feed_rows += poll_feed(engineers, suppliers, seen)
+            t2 = time.perf_counter()
+            poll_feed(engineers, suppliers, seen)  # Nothing new: the cheap-cursor path
+            t3 = time.perf_counter()
+            list_ms.append((t1 - t0) * 1000)
+            feed_ms.append((t2 - t1) * 1000)
+            idle_ms.append((t3 - t2) * 1000)
+
+        ok = sum(seen.values()) == expected and max(seen.values(), default=1) == 1
+        print(f"\n--- ONE POLL OF {args.sessions} SESSIONS ({args.writes} bids + 1 tender per round, {args.rounds} rounds) ---")
+        print(f"{'approach':<32}{'p50':>12}{'max':>12}{'rows read':>14}")
+        print(f"{'whole lists (before)':<32}{np.percentile(list_ms, 50):>9.1f} ms{max(list_ms):>9.1f} ms{list_rows:>14,}")
+        print(f"{'event deltas (event_feed)':<32}{np.percentile(feed_ms, 50):>9.1f} ms{max(feed_ms):>9.1f} ms{feed_rows:>14,}")
+        print(f"{'event deltas, nothing new':<32}{np.percentile(idle_ms, 50):>9.1f} ms{max(idle_ms):>9.1f} ms{0:>14,}")
+        wake = wake_latency(20)
+        print(f"\nPublish -> in-process wake-up: p50 {np.percentile(wake, 50):.1f} ms, max {wake.max():.1f} ms")
+        print(f"Every event delivered exactly once: {'✅' if ok else '❌'} ({sum(seen.values()):,} of {expected:,})")
+        sys.exit(0 if ok else 1)
+    finally:
+        use_backend(None)
+
+if __name__ == "__main__":
+    main()
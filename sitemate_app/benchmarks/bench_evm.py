@@ -0,0 +1,122 @@
+### (Portfolio earned-value ranking: incremental vs. full recompute. Seeds baselined projects with
+### expense and progress history, then repeatedly logs a few new expenses / progress entries and
+### ranks the portfolio two ways: logic.evm_engine.portfolio_risk (running EV, AC folded in from
+### the new expense rows only) and a full recompute (every project's expenses summed and progress
+### replayed). Checks that both give the same CPI/SPI.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_evm.py                                   # 500 sites, 2,000 expenses each
+###   python benchmarks/bench_evm.py --projects 2000 --expenses 500 --rounds 20
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logic.db_manager as db
+import logic.evm_engine as evm
+from logic.storage import SQLiteBackend, use_backend
+
+BOQ = pd.DataFrame({"Item": ["Dangote Cement", "Sharp Sand", "9 inch Sandcrete Blocks"], "Qty": [600.0, 40, 12000],
+                    "Unit Price": [10500.0, 130000, 650]}).assign(**{"Total Cost": lambda d: d["Qty"] * d["Unit Price"]})
+
+def seed(projects, expenses, rng):
+    """Baselined projects started 0-60 days ago, each with `expenses` ledger rows and a few progress entries."""
+    names = [f"EVM Site {i:05d}" for i in range(projects)]
+    backend = db._backend()
+    for name in names:
+        db.save_project(name, "Lekki, Lagos", "Firm", BOQ)
+        evm.set_baseline(name, date.today() - timedelta(days=rng.randint(0, 60)))
+    conn = db._connect()
+    with conn:
+        for name in names:
+            backend.bulk_insert(conn, "expenses", ["project_name", "item_name", "amount", "category", "date", "note"],
+                                [(name, "Materials", float(rng.randint(5, 60) * 1000), "Materials",
+                                  (date.today() - timedelta(days=rng.randint(0, 60))).isoformat(), "seed") for _ in range(expenses)])
+    conn.close()
+    for name in names:
+        for pct in sorted(rng.sample(range(5, 100), 3)):
+            evm.record_progress(name, pct)
+    return names
+
+def full_recompute():
+    """What ranking costs without running totals: every expense summed and every progress entry replayed."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT project_name, bac FROM evm_state")
+    state = pd.DataFrame(c.fetchall(), columns=["project_name", "bac"])
+    c.execute("SELECT project_name, SUM(amount) FROM expenses GROUP BY project_name")
+    ac = dict(c.fetchall())
+    c.execute("SELECT project_name, phase, start_date, end_date, budget FROM evm_baseline ORDER BY project_name, seq")
+    baseline = pd.DataFrame(c.fetchall(), columns=["project_name", "phase", "start_date", "end_date", "budget"])
+    c.execute("SELECT project_name, phase, pct FROM evm_progress ORDER BY id")
+    progress = c.fetchall()
+    conn.close()
+
+    phases = {name: (grp["phase"].tolist(), grp["budget"].to_numpy(dtype=float)) for name, grp in baseline.groupby("project_name")}
+    pcts = {name: [0.0] * len(p) for name, (p, _) in phases.items()}
+    for name, phase, pct in progress:
+        pcts[name] = evm._advance(pcts[name], phases[name][0].index(phase), pct)
+    state["ev"] = [float(np.dot(phases[n][1], pcts[n]) / 100) for n in state["project_name"]]
+    state["ac"] = [float(ac.get(n, 0.0)) for n in state["project_name"]]
+    state["bac"] = state["bac"].astype(float)
+    return evm._indices(state, baseline, date.today()).sort_values(["Risk", "Project"], ascending=[False, True], ignore_index=True)
+
+def _agree(a, b):
+    a, b = a.set_index("Project").sort_index(), b.set_index("Project").sort_index()
+    return bool(np.allclose(a[["CPI", "SPI", "EAC"]].to_numpy(dtype=float), b[["CPI", "SPI", "EAC"]].to_numpy(dtype=float), equal_nan=True))
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio EVM ranking: running totals vs. full recompute.")
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--expenses", type=int, default=2000, help="Seeded expense rows per project")
+    parser.add_argument("--rounds", type=int, default=10, help="Rank after each round of new entries")
+    parser.add_argument("--writes", type=int, default=20, help="New expenses and progress entries per round")
+    args = parser.parse_args()
+
+    rng = random.Random(47)
+    path = os.path.join(tempfile.mkdtemp(prefix="sitemate_evm_"), "evm.db")
+    use_backend(SQLiteBackend(path, timeout=db.BUSY_TIMEOUT))
+    db.set_search_status("disabled", "EVM benchmark: SQL paths only")
+    try:
+        db.init_db()
+        start = time.perf_counter()
+        names = seed(args.projects, args.expenses, rng)
+        print(f"Seeded {args.projects:,} baselined projects x {args.expenses:,} expenses in {time.perf_counter() - start:.1f}s")
+        evm.portfolio_risk.uncached()  # First sync folds in the seeded history
+
+        incremental, full, ok = [], [], True
+        for _ in range(args.rounds):
+            for _ in range(args.writes):
+                name = rng.choice(names)
+                db.log_expense(name, "Diesel", rng.randint(5, 90) * 1000, "Logistics", "bench")
+                evm.record_progress(name, rng.randint(0, 100))
+            t0 = time.perf_counter()
+            ranked = evm.portfolio_risk.uncached()
+            t1 = time.perf_counter()
+            recomputed = full_recompute()
+            t2 = time.perf_counter()
+            incremental.append((t1 - t0) * 1000)
+            full.append((t2 - t1) * 1000)
+            ok &= _agree(ranked, recomputed)
+
+        print(f"\n--- PORTFOLIO RISK RANKING ({args.projects:,} projects, {args.projects * args.expenses:,} expenses, "
+              f"{args.writes} new entries per round) ---")
+        print(f"{'approach':<28}{'p50':>12}{'max':>12}")
+        for label, ms in [("running totals (evm_engine)", incremental), ("full recompute", full)]:
+            print(f"{label:<28}{np.percentile(ms, 50):>9.1f} ms{max(ms):>9.1f} ms")
+        print(f"Speedup (p50): {np.percentile(full, 50) / np.percentile(incremental, 50):.1f}x   rankings agree: {'✅' if ok else '❌'}")
+        sys.exit(0 if ok else 1)
+    finally:
+        use_backend(None)
+
+if __name__ == "__main__":
+    main()
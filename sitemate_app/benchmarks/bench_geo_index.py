@@ -0,0 +1,88 @@
+### (Nearest-supplier benchmark: builds the grid index over N synthetic supplier
+### points scattered around Nigerian cities and compares radius / k-nearest
+### queries against a brute-force haversine scan, checking both give the same answer.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_geo_index.py [--points 1000000] [--queries 500] [--radius 20] [--k 5]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from logic.geo_index import GeoIndex, haversine_km
+
+# Supplier clusters (lat, lng, spread in degrees) - dense markets plus a thin rural scatter
+CITIES = [
+    (6.45, 3.45, 0.25),   # Lagos
+    (7.38, 3.93, 0.15),   # Ibadan
+    (9.07, 7.40, 0.20),   # Abuja
+    (6.50, 7.50, 0.20),   # Enugu
+    (12.00, 8.52, 0.20),  # Kano
+    (4.82, 7.03, 0.15),   # Port Harcourt
+]
+
+def synthetic_points(n, seed=42):
+    rng = np.random.default_rng(seed)
+    n_rural = n // 5
+    city = rng.integers(0, len(CITIES), n - n_rural)
+    centre = np.array(CITIES)[city]
+    lat = np.concatenate([centre[:, 0] + rng.normal(0, 1, len(city)) * centre[:, 2], rng.uniform(4.3, 13.8, n_rural)])
+    lng = np.concatenate([centre[:, 1] + rng.normal(0, 1, len(city)) * centre[:, 2], rng.uniform(2.7, 14.6, n_rural)])
+    stocks_cement = rng.random(n) < 0.3
+    return lat, lng, stocks_cement
+
+def brute_force(lat, lng, qlat, qlng, radius_km, k, mask):
+    dist = haversine_km(qlat, qlng, lat, lng)
+    ok = np.flatnonzero((dist <= radius_km) & mask)
+    return ok[np.argsort(dist[ok], kind="stable")][:k]
+
+def percentiles(seconds):
+    ms = np.array(seconds) * 1000
+    return f"p50 {np.percentile(ms, 50):8.3f} ms   p95 {np.percentile(ms, 95):8.3f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the nearest-supplier grid index.")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--radius", type=float, default=20.0)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    lat, lng, cement = synthetic_points(args.points)
+    start = time.perf_counter()
+    index = GeoIndex(lat, lng)
+    print(f"{args.points:,} supplier points | index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = np.random.default_rng(1)
+    sites = np.array(CITIES)[rng.integers(0, len(CITIES), args.queries), :2] + rng.normal(0, 0.1, (args.queries, 2))
+
+    indexed, brute, knn, mismatches = [], [], [], 0
+    for qlat, qlng in sites:
+        t = time.perf_counter()
+        ids, _ = index.query(qlat, qlng, args.radius, k=args.k, mask=cement)
+        indexed.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        expected = brute_force(lat, lng, qlat, qlng, args.radius, args.k, cement)
+        brute.append(time.perf_counter() - t)
+        mismatches += not np.array_equal(np.sort(ids), np.sort(expected))
+
+        t = time.perf_counter()
+        index.nearest(qlat, qlng, k=args.k)
+        knn.append(time.perf_counter() - t)
+
+    print(f"\n'{args.k} nearest cement suppliers within {args.radius:g} km' x {args.queries} sites")
+    print(f"  grid index   : {percentiles(indexed)}")
+    print(f"  brute force  : {percentiles(brute)}")
+    print(f"  speed-up     : {np.median(brute) / np.median(indexed):.0f}x (median)")
+    print(f"  k-nearest (no radius): {percentiles(knn)}")
+    print(f"\n{'✅' if mismatches == 0 else '❌'} {mismatches} result mismatches vs brute force")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+### (Cold-start budget check: imports every module app.py pulls in under
+### `python -X importtime` in a fresh interpreter and reports the cost on top of
+### the framework imports (streamlit, pandas, altair) that app.py needs anyway.
+### Exits non-zero when the budget is exceeded or a heavy SDK loads at startup.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_import_time.py [--budget-ms 150] [--runs 3] [--top 15]
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Imported by app.py itself; their cost is the baseline
+FRAMEWORK_MODULES = ["streamlit", "pandas", "altair"]
+
+# What app.py and the pages import at startup
+APP_MODULES = [
+    "logic.transcriber", "logic.oyenuga_logic", "logic.data_fetcher", "logic.report_service",
+    "logic.integrations", "logic.labor_engine", "logic.timeline_engine", "logic.db_manager",
+    "logic.paging", "logic.weather_engine", "logic.expert_verifier", "logic.feasibility_engine",
+    "logic.auth", "logic.bulk_ingest", "logic.bootstrap",
+]
+
+# SDKs that must NOT be imported until a feature actually uses them
+HEAVY_MODULES = ["groq", "google.generativeai", "matplotlib", "fpdf", "streamlit_mic_recorder", "algoliasearch"]
+
+COLD_START_BUDGET_MS = 150  # App modules on top of FRAMEWORK_MODULES
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def import_profile(modules):
+    """Runs one fresh interpreter. Returns {module: (self_us, cumulative_us, depth)}."""
+    code = "".join(f"import {m}\n" for m in FRAMEWORK_MODULES + modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=APP_DIR,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    profile = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cum_us, indent, name = match.groups()
+            profile[name] = (int(self_us), int(cum_us), len(indent) // 2)
+    return profile
+
+def top_level_total(profile):
+    """Sum of cumulative time for modules imported directly (depth 0)."""
+    return sum(cum for _, cum, depth in profile.values() if depth == 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure SiteMate cold-start import time.")
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="Take the best of N runs")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.runs):
+        base = top_level_total(import_profile([]))
+        profile = import_profile(APP_MODULES)
+        app_ms = (top_level_total(profile) - base) / 1000
+        if best is None or app_ms < best[0]:
+            best = (app_ms, base / 1000, profile)
+    app_ms, base_ms, profile = best
+
+    print(f"streamlit/pandas/altair: {base_ms:8.1f} ms")
+    print(f"app modules on top     : {app_ms:8.1f} ms  (budget {args.budget_ms:.0f} ms)\n")
+
+    print(f"Slowest modules (cumulative, top {args.top}):")
+    ranked = sorted(((cum, name) for name, (_, cum, depth) in profile.items() if depth <= 1), reverse=True)
+    for cum, name in ranked[:args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    loaded_heavy = [m for m in HEAVY_MODULES if m in profile]
+    if loaded_heavy:
+        print(f"\n⚠️ Heavy SDKs imported at startup: {', '.join(loaded_heavy)}")
+
+    if app_ms > args.budget_ms or loaded_heavy:
+        print("\n❌ Cold-start budget exceeded.")
+        sys.exit(1)
+    print("\n✅ Within cold-start budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+### (Benchmark: large inventory-history PDFs through the vectorized table layer vs. the old iterrows loop.)
+### Run from sitemate_app/:  python benchmarks/bench_report_tables.py --pages 100
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Path fix to find 'logic' folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logic.report_generator import PDF, clean_text, generate_inventory_pdf
+
+ROWS_PER_PAGE = 31  # 8mm rows on A4 after header/footer margins
+
+def make_history(n_rows, seed=42):
+    """Synthetic inventory log in the shape returned by get_inventory_logs()."""
+    rng = np.random.default_rng(seed)
+    items = np.array(["Cement", "Sand (Tons)", "Granite (Tons)", "Blocks (9 inch)", "Iron Rods (12mm)", "**Bold** ### Item – ₦"])
+    units = np.array(["Bags", "Tons", "Tons", "Pcs", "Tons", "Pcs"])
+    idx = rng.integers(0, len(items), n_rows)
+    is_in = rng.random(n_rows) < 0.5
+    change = np.round(rng.uniform(1, 200, n_rows), 1) * np.where(is_in, 1, -1)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, n_rows), unit="D")
+    return pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Time": [f"{h:02d}:{m:02d}" for h, m in zip(rng.integers(6, 19, n_rows), rng.integers(0, 60, n_rows))],
+        "Item": items[idx],
+        "Action": np.where(is_in, "Stock IN", "Stock OUT"),
+        "Change": change,
+        "Unit": units[idx],
+    })
+
+def legacy_history_pdf(history_df):
+    """The pre-vectorization loop (iterrows + per-cell clean_text), kept for comparison."""
+    pdf = PDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Arial", size=9)
+    for _, row in history_df.iterrows():
+        pdf.cell(25, 8, str(row['Date']), 1)
+        pdf.cell(20, 8, str(row['Time']), 1)
+        pdf.cell(60, 8, clean_text(str(row['Item']))[:30], 1)
+        op = str(row['Action'])
+        if "IN" in op: pdf.set_text_color(0, 128, 0)
+        else: pdf.set_text_color(200, 0, 0)
+        pdf.cell(35, 8, op, 1, 0, 'C')
+        pdf.cell(25, 8, f"{row['Change']:+.1f}", 1, 0, 'R')
+        pdf.set_text_color(0)
+        pdf.cell(25, 8, clean_text(str(row['Unit'])), 1, 1, 'C')
+    return pdf.output(dest='S').encode('latin-1')
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory PDF table benchmark")
+    parser.add_argument("--pages", type=int, default=100, help="Target history pages")
+    parser.add_argument("--rows", type=int, default=None, help="Override row count (e.g. 50000)")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    n_rows = args.rows or args.pages * ROWS_PER_PAGE
+    history_df = make_history(n_rows)
+    inventory_df = history_df.groupby(["Item", "Unit"], as_index=False)["Change"].sum().rename(columns={"Change": "Quantity"})
+    inventory_df["Last Updated"] = history_df["Date"].max()
+
+    print(f"--- INVENTORY PDF BENCHMARK ({n_rows:,} log rows) ---")
+    pdf_bytes, new_s = timed(generate_inventory_pdf, "Benchmark Site", inventory_df, history_df)
+    pages = pdf_bytes.count(b"/Type /Page\n")
+    print(f"✅ Table layer : {new_s:7.2f}s | {pages} pages | {n_rows / new_s:,.0f} rows/s | {len(pdf_bytes) / 1e6:.1f} MB")
+
+    if not args.skip_legacy:
+        _, old_s = timed(legacy_history_pdf, history_df)
+        print(f"🐢 iterrows    : {old_s:7.2f}s | {n_rows / old_s:,.0f} rows/s | speedup x{old_s / new_s:.2f}")
+
+if __name__ == "__main__":
+    main()
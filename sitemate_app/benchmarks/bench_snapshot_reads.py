@@ -0,0 +1,129 @@
+### (Dashboard reads vs writers on SQLite, with and without the read snapshot. Writer threads log
+### expenses, move stock and submit bids while reader threads run the dashboard aggregates
+### (metrics, weekly/monthly totals, job board) uncached; reports writer latency, reader
+### throughput and how far behind the primary the readers were.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_snapshot_reads.py --writers 8 --readers 4 --duration 10
+###   python benchmarks/bench_snapshot_reads.py --history 50000 --staleness 2 --think 0   # readers flat out
+### On a single core, readers with no think time slow writers through the CPU whichever copy they read.
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logic.db_manager as db
+import logic.read_replica as read_replica
+from logic.storage import SQLiteBackend, use_backend
+
+ITEMS = [("Cement", "Bags"), ("Granite", "Tons"), ("Sharp Sand", "Tons")]
+LOCATION = "Lekki, Lagos"
+
+def _seed(projects, history):
+    """`history` dated expenses and stock movements per project, so the aggregates have work to do."""
+    boq = pd.DataFrame({"Item": ["Cement"], "Qty": [100], "Unit Price": [10500.0], "Total Cost": [1050000.0]})
+    dates = pd.date_range("2023-01-01", periods=history, freq="h").strftime("%Y-%m-%d")
+    backend = db._backend()
+    conn = db._connect()
+    for name in projects:
+        db.save_project(name, LOCATION, "Firm", boq)
+    with conn:
+        for name in projects:
+            backend.bulk_insert(conn, "expenses", ["project_name", "item_name", "amount", "category", "date", "note"],
+                                [(name, f"Item {i % 9}", 1000.0 + i, ["Materials", "Labor", "Logistics"][i % 3], d, "seed") for i, d in enumerate(dates)])
+            backend.bulk_insert(conn, "inventory_logs", ["project_name", "item_name", "change_qty", "unit", "operation", "date", "timestamp"],
+                                [(name, ITEMS[i % 3][0], 5.0 if i % 2 else -2.0, ITEMS[i % 3][1], "Stock IN" if i % 2 else "Stock OUT", d, "08:00")
+                                 for i, d in enumerate(dates)])
+    conn.close()
+
+def _writer(project, seed, deadline, out):
+    rng = random.Random(seed)
+    ms = []
+    while time.time() < deadline:
+        op = rng.random()
+        start = time.perf_counter()
+        if op < 0.5:
+            db.log_expense(project, "Diesel", rng.randint(5, 90) * 1000, "Logistics", "bench")
+        elif op < 0.85:
+            item, unit = rng.choice(ITEMS)
+            db.update_inventory(project, item, float(rng.randint(1, 10)), unit, "add")
+        else:
+            db.submit_bid(project, f"Supplier {seed % 7}", rng.randint(500, 900) * 1000, "0803")
+        ms.append((time.perf_counter() - start) * 1000)
+    out.append(("write", ms, []))
+
+def _reader(project, think, deadline, out):
+    ms, lag = [], []
+    while time.time() < deadline:
+        start = time.perf_counter()
+        db.get_project_metrics.uncached(project)
+        db.get_expense_totals.uncached(project, by="week")
+        db.get_inventory_movement_totals.uncached(project, by="month")
+        db.get_open_tenders.uncached(LOCATION.split(",")[0])
+        ms.append((time.perf_counter() - start) * 1000)
+        replica = read_replica.get_replica(db._backend())
+        if replica is not None:
+            lag.append(time.monotonic() - replica.taken)
+        time.sleep(think)  # A person looking at the dashboard before the next rerun
+    out.append(("read", ms, lag))
+
+def run(label, staleness, args):
+    read_replica.MAX_STALENESS = staleness
+    path = os.path.join(tempfile.mkdtemp(prefix="sitemate_snapshot_"), "bench.db")
+    use_backend(SQLiteBackend(path, timeout=db.BUSY_TIMEOUT))
+    db.init_db()
+    projects = [f"Bench Site {i}" for i in range(args.writers)]
+    _seed(projects, args.history)
+
+    out = []
+    deadline = time.time() + args.duration
+    threads = [threading.Thread(target=_writer, args=(projects[i], i, deadline, out)) for i in range(args.writers)]
+    threads += [threading.Thread(target=_reader, args=(projects[i % len(projects)], args.think / 1000, deadline, out)) for i in range(args.readers)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+
+    for kind in ("write", "read"):
+        ms = np.concatenate([m for k, m, _ in out if k == kind] or [np.zeros(0)])
+        lag = np.concatenate([l for k, _, l in out if k == kind] or [np.zeros(0)])
+        if len(ms):
+            lag_text = f"{lag.max():>9.2f} s" if len(lag) else f"{'-':>11}"
+            print(f"{label:<12}{kind:<7}{len(ms) / elapsed:>10,.0f}{np.percentile(ms, 50):>9.2f} ms"
+                  f"{np.percentile(ms, 95):>9.2f} ms{np.percentile(ms, 99):>9.2f} ms{lag_text}")
+    replica = read_replica.get_replica(db._backend())
+    if replica is not None:
+        stats = replica.stats()
+        print(f"{'':<12}snapshot: {stats['refreshes']} refreshes, last copy {stats['last_copy_ms']:.1f} ms, {stats['bytes'] / 1e6:.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite writer latency with dashboard reads on the primary vs the snapshot.")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per mode")
+    parser.add_argument("--history", type=int, default=5000, help="Seeded expense and stock rows per project")
+    parser.add_argument("--think", type=float, default=500, help="Pause between a reader's dashboard loads (ms)")
+    parser.add_argument("--staleness", type=float, default=read_replica.MAX_STALENESS or 5, help="Snapshot max staleness (s)")
+    args = parser.parse_args()
+
+    db.set_search_status("disabled", "snapshot benchmark: SQL paths only")
+    print(f"--- DASHBOARD READS VS WRITERS ({args.writers} writers + {args.readers} readers, "
+          f"{args.history:,} history rows/project, {args.duration:g}s per mode) ---")
+    print(f"{'reads on':<12}{'ops':<7}{'ops/s':>10}{'p50':>12}{'p95':>12}{'p99':>12}{'max lag':>11}")
+    try:
+        run("primary", 0, args)
+        run("snapshot", args.staleness, args)
+    finally:
+        use_backend(None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+### (Tender-to-supplier matching at 100k suppliers. Seeds the supplier pool with
+### Dataset/generate_full_database.py (stock lists as JSON plus the supplier_materials junction
+### rows), then matches random BOQs two ways: parsing every supplier's materials JSON in Python,
+### and logic.supplier_matching (category postings + NumPy scoring). Checks both pick suppliers
+### with the same scores.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_supplier_matching.py                     # 100,000 suppliers
+###   python benchmarks/bench_supplier_matching.py --suppliers 20000 --tenders 50 --k 25
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logic.db_manager as db
+import logic.supplier_matching as matching
+from logic.catalogue import normalize_material
+from logic.geo_index import haversine_km, proximity_score, site_coordinates
+from logic.storage import SQLiteBackend, use_backend
+from logic.weather_engine import LOCATIONS
+
+GENERATOR_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "Dataset", "generate_full_database.py"))
+BOQ_ITEMS = ["Dangote Cement", "Sharp Sand", "Granite", "Iron Rods (12mm)", "9 inch Sandcrete Blocks", "Roofing Sheets",
+             "Floor Tiles", "PVC Pipes", "Electrical Cables", "Emulsion Paint", "Labour"]
+
+def _load_generator():
+    spec = importlib.util.spec_from_file_location("generate_full_database", GENERATOR_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def seed(path, suppliers):
+    gen = _load_generator()
+    seeded = argparse.Namespace(projects=0, bids_per_project=0, expenses_per_project=0, inventory_logs_per_project=0,
+                                diary_days=0, commit_every=1000)
+    start = time.perf_counter()
+    gen.populate_db(path, gen.generate_suppliers(suppliers, random.Random(49)), random.Random(50), seeded)
+    print(f"Seeded {suppliers:,} suppliers (JSON stock lists + supplier_materials) in {time.perf_counter() - start:.1f}s")
+
+def random_boqs(n, rng):
+    boqs = []
+    for _ in range(n):
+        items = rng.sample(BOQ_ITEMS, rng.randint(2, 6))
+        boq = pd.DataFrame({"Item": items, "Qty": [rng.randint(1, 500) for _ in items], "Unit Price": [rng.randint(500, 150_000) for _ in items]})
+        boqs.append((boq.assign(**{"Total Cost": boq["Qty"] * boq["Unit Price"]}), rng.choice(list(LOCATIONS))))
+    return boqs
+
+def json_scan(boq, location, k):
+    """Matching without the junction table: every supplier row fetched and its materials JSON parsed."""
+    needs = matching.boq_needs(boq)
+    site = site_coordinates(location)
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT id, materials, lat, lng FROM suppliers")
+    scored = []
+    for supplier_id, materials, lat, lng in c.fetchall():
+        categories = {normalize_material(m)[1] for m in json.loads(materials or "[]")}
+        coverage = min(sum(share for category, share in needs.items() if category in categories), 1.0)
+        if coverage <= 0:
+            continue
+        distance = float(haversine_km(site[0], site[1], lat, lng)) if lat is not None else np.nan
+        proximity = matching.NEUTRAL_PROXIMITY if np.isnan(distance) else float(proximity_score(distance))
+        scored.append((matching.COVERAGE_WEIGHT * coverage + matching.PROXIMITY_WEIGHT * proximity, supplier_id))
+    conn.close()
+    return sorted(scored, key=lambda s: -s[0])[:k]
+
+def main():
+    parser = argparse.ArgumentParser(description="Tender-to-supplier matching: JSON scan vs. inverted index.")
+    parser.add_argument("--suppliers", type=int, default=100_000)
+    parser.add_argument("--tenders", type=int, default=30, help="Random BOQs matched")
+    parser.add_argument("--k", type=int, default=10, help="Suppliers returned per tender")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="sitemate_match_"), "match.db")
+    use_backend(SQLiteBackend(path, timeout=db.BUSY_TIMEOUT))
+    db.set_search_status("disabled", "matching benchmark: SQL paths only")
+    try:
+        seed(path, args.suppliers)
+        boqs = random_boqs(args.tenders, random.Random(51))
+
+        start = time.perf_counter()
+        matching.get_supplier_index()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        scan, indexed, ok = [], [], True
+        for boq, location in boqs:
+            t0 = time.perf_counter()
+            expected = json_scan(boq, location, args.k)
+            t1 = time.perf_counter()
+            matched = matching.match_boq(boq, location, args.k)
+            t2 = time.perf_counter()
+            scan.append((t1 - t0) * 1000)
+            indexed.append((t2 - t1) * 1000)
+            ok &= bool(np.allclose(matched["Score"].to_numpy(), np.round([s for s, _ in expected], 4)))
+
+        print(f"\n--- MATCH ONE TENDER ({args.suppliers:,} suppliers, top {args.k}; {args.tenders} BOQs) ---")
+        print(f"{'approach':<34}{'p50':>12}{'p95':>12}")
+        for label, ms in [("JSON scan (before)", scan), ("supplier_matching (index warm)", indexed)]:
+            print(f"{label:<34}{np.percentile(ms, 50):>9.1f} ms{np.percentile(ms, 95):>9.1f} ms")
+        print(f"Index build (once per supplier change): {build_ms:.0f} ms")
+        print(f"Speedup (p50): {np.percentile(scan, 50) / np.percentile(indexed, 50):.0f}x   same scores: {'✅' if ok else '❌'}   "
+              f"p95 under 50 ms: {'✅' if np.percentile(indexed, 95) < 50 else '❌'}")
+        sys.exit(0 if ok else 1)
+    finally:
+        use_backend(None)
+
+if __name__ == "__main__":
+    main()
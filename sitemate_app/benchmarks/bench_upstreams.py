@@ -0,0 +1,122 @@
+### (End-to-end latency of every external-API feature against the local stand-ins in
+### logic/mock_upstreams.py: pricing (Algolia), the agent and QS audit (Groq), voice
+### notes (Groq Whisper), site photos (Gemini), weather (Open-Meteo) and payments
+### (Paystack), called concurrently under a chosen upstream profile. The features swallow
+### upstream errors (error strings, fallbacks), so each call is also judged ok or failed, and
+### latency percentiles cover the successful calls only.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/bench_upstreams.py [--profile realistic|degraded|instant] [--concurrency 8] [--calls 40]
+
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from logic.mock_upstreams import start_mock_server, use_stand_ins
+
+PROFILES = {
+    "instant": {"latency_scale": 0},
+    "realistic": {"latency_scale": 1},
+    # Free-tier style limits plus flaky upstreams
+    "degraded": {"latency_scale": 1.5, "error_rate": {svc: 0.05 for svc in ("groq", "gemini", "algolia", "open_meteo", "paystack")},
+                 "rps": {"groq": 5, "gemini": 2, "algolia": 50}},
+}
+
+_last_status = threading.local()
+
+def _record_status():
+    """Keeps the last HTTP status each thread got through requests (fallback paths hide it from the result)."""
+    original = requests.Session.send
+
+    def send(self, request, **kwargs):
+        response = original(self, request, **kwargs)
+        _last_status.code = response.status_code
+        return response
+
+    requests.Session.send = send
+
+def _no_error(*prefixes):
+    return lambda result: isinstance(result, str) and not result.startswith(prefixes)
+
+def features():
+    """(name, zero-arg call, result -> ok?) for each feature, imported after the base URLs point at the stand-ins."""
+    from PIL import Image
+    from logic.data_fetcher import get_live_price
+    from logic.expert_verifier import verify_project_budget
+    from logic.oyenuga_logic import query_groq_direct
+    from logic.payment_gateway import initialize_payment
+    from logic.transcriber import transcribe_audio
+    from logic.vision_engine import analyze_site_progress
+    from logic.weather_engine import get_site_weather
+
+    photo = io.BytesIO()
+    Image.new("RGB", (640, 480), (128, 128, 128)).save(photo, format="JPEG")
+    boq = pd.DataFrame({"Item": ["Cement", "Sharp Sand"], "Qty": [420, 6], "Unit Price": [10500, 130000], "Total Cost": [4410000, 780000]})
+    return [
+        ("get_live_price", lambda: get_live_price("Cement", "Lekki, Lagos"), lambda r: r[0] > 0),
+        ("query_groq_direct", lambda: query_groq_direct("4 bedroom duplex |||"), _no_error("❌")),
+        ("verify_project_budget", lambda: verify_project_budget(boq, "Lekki, Lagos"), _no_error("❌")),
+        ("transcribe_audio", lambda: transcribe_audio(b"RIFF0000WAVEfmt "), _no_error("Error:")),
+        ("analyze_site_progress", lambda: analyze_site_progress(photo.getvalue()), _no_error("❌")),
+        ("get_site_weather", lambda: get_site_weather("Lekki, Lagos"), lambda r: isinstance(r, dict) and "error" not in r),
+        ("initialize_payment", lambda: initialize_payment("bench@site.ng", 25000, f"bench-{time.time_ns()}"), _no_error("https://paystack.com/pay/test")),
+    ]
+
+def timed(fn, ok):
+    """(seconds, ok). A call failed if it raised, its result is an error/fallback, or its last HTTP answer was >= 400."""
+    _last_status.code = None
+    start = time.perf_counter()
+    try:
+        good = bool(ok(fn()))
+    except Exception:
+        good = False
+    good = good and (_last_status.code is None or _last_status.code < 400)
+    return time.perf_counter() - start, good
+
+def _percentiles(ms):
+    if not len(ms):
+        return f"{'-':>10}" * 3
+    return "".join(f"{np.percentile(ms, q):>7.0f} ms" for q in (50, 95, 99))
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end latency of external-API features against local stand-ins.")
+    parser.add_argument("--profile", choices=PROFILES, default="realistic")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=40, help="Calls per feature")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = start_mock_server(seed=args.seed, **PROFILES[args.profile])
+    use_stand_ins(server)
+    _record_status()
+
+    print(f"--- UPSTREAM STAND-IN BENCHMARK ({args.profile}, {args.concurrency} concurrent, {args.calls} calls/feature) ---")
+    print(f"{'feature':<24}{'ok':>5}{'failed':>8}{'ok p50':>10}{'ok p95':>10}{'ok p99':>10}{'fail p50':>10}{'calls/s':>10}")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for name, fn, ok in features():
+            fn()  # Warm-up (client construction, catalogue load)
+            requests.post(f"{server.url}/__reset")
+            start = time.perf_counter()
+            calls = list(pool.map(lambda _: timed(fn, ok), range(args.calls)))
+            rate = args.calls / (time.perf_counter() - start)
+            ms = np.array([seconds for seconds, _ in calls]) * 1000
+            good = np.array([g for _, g in calls], dtype=bool)
+            failed_p50 = f"{np.percentile(ms[~good], 50):>7.0f} ms" if (~good).any() else f"{'-':>10}"
+            print(f"{name:<24}{good.sum():>5}{(~good).sum():>8}{_percentiles(ms[good])}{failed_p50}{rate:>10.1f}")
+            for svc, s in requests.get(f"{server.url}/__stats").json().items():
+                if s["throttled"] or s["errors"]:
+                    print(f"{'':<4}↳ {svc}: {s['requests']} upstream calls, {s['throttled']} throttled (429), {s['errors']} 5xx")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+### (Load test: N concurrent simulated sessions - Chief Engineers chatting with the agent and
+### saving projects, suppliers browsing tenders and bidding, site managers logging expenses
+### and stock - making the same logic calls the pages make, against the local upstream
+### stand-ins. Reports throughput, latency percentiles per action and SQLite lock contention.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/load_sessions.py --engineers 2 --suppliers 12 --site-managers 6 --duration 30
+###   python benchmarks/load_sessions.py --busy-timeout 0.05      # surface 'database is locked' instead of waiting
+### Exits non-zero if any action fails for a reason other than lock contention or a legit rejection.
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from logic.mock_upstreams import start_mock_server, use_stand_ins
+from logic.storage import SQLiteBackend, use_backend
+from logic.tracing import TracedConnection, TracedCursor
+
+LOCATIONS = ["Lekki, Lagos", "Ikeja, Lagos", "Ibadan, Oyo", "Abuja, FCT"]
+PROMPTS = ["I want to build a 4 bedroom duplex", "Budget for a perimeter fence with strip foundation",
+           "3 bedroom bungalow on swampy soil", "Pad foundation for a 2 storey office"]
+MATERIALS = [("Cement", "Bags", 10500), ("Sharp Sand", "Tons", 130000), ("Granite", "Tons", 180000), ("Iron Rods (12mm)", "Length", 9800)]
+EXPENSES = [("Diesel", "Logistics"), ("Mason wages", "Labor"), ("Cement", "Materials"), ("Site security", "Overheads")]
+WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "BEGIN", "COMMIT")
+
+# ==========================================
+# 🔒 LOCK CONTENTION (a SQLite backend with counting connections)
+# ==========================================
+
+class Contention:
+    """Counts statements, write latency (which includes busy-timeout waits) and lock errors."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.statements = 0
+        self.locked = 0
+        self.write_ms = []
+        self._local = threading.local()
+
+    def thread_locks(self):
+        """Lock errors seen by the calling thread (to attribute a swallowed error to contention)."""
+        return getattr(self._local, "locked", 0)
+
+    def run(self, sql, call):
+        is_write = sql.lstrip()[:7].upper().startswith(WRITE_VERBS)
+        start = time.perf_counter()
+        try:
+            return call()
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                with self.lock:
+                    self.locked += 1
+                self._local.locked = self.thread_locks() + 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.statements += 1
+                if is_write:
+                    self.write_ms.append(elapsed)
+
+CONTENTION = Contention()
+
+class CountingCursor(TracedCursor):
+    def execute(self, sql, parameters=()):
+        return CONTENTION.run(sql, lambda: super(CountingCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return CONTENTION.run(sql, lambda: super(CountingCursor, self).executemany(sql, seq_of_parameters))
+
+class CountingConnection(TracedConnection):
+    """
+    Every statement goes through cursor(): TracedConnection routes conn.execute*() there, so
+    storage's BEGIN IMMEDIATE (where writers actually hit 'database is locked') is counted too.
+    """
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or CountingCursor)
+
+    def commit(self):
+        return CONTENTION.run("COMMIT", super().commit)
+
+# ==========================================
+# 🎭 ROLES (one loop per simulated session)
+# ==========================================
+
+def _boq(rng):
+    rows = [{"Item": item, "Qty": rng.randint(5, 500), "Unit Price": price} for item, _, price in rng.sample(MATERIALS, 3)]
+    df = pd.DataFrame(rows)
+    df["Total Cost"] = df["Qty"] * df["Unit Price"]
+    return df
+
+# App modules are imported inside the roles / main(): Streamlit fixes the secrets.toml search
+# path when it is first imported, which has to happen after use_stand_ins() chdirs.
+
+def _price_boq(boq, location):
+    """Same BOQ pricing as the Planning tab."""
+    from logic.data_fetcher import get_live_price
+    return pd.DataFrame([{"Item": k, "Qty": v, "Unit Price": get_live_price(k, location)[0], "Total Cost": v * get_live_price(k, location)[0]}
+                         for k, v in boq.items()])
+
+def chief_engineer(session, rng, seed_projects):
+    """Planning tab: ask the agent, price and save the BOQ, review the bids on it."""
+    import logic.db_manager as db
+    from logic.oyenuga_logic import get_agent_response
+
+    location = rng.choice(LOCATIONS)
+    name = f"Load Project {session}-{rng.randint(1, 3)}"
+    reply = yield "agent.chat", lambda: get_agent_response(rng.choice(PROMPTS), location, "Normal")
+    boq = reply[1] if reply else None
+    if boq:
+        boq_df = yield "pricing.boq", lambda: _price_boq(boq, location)
+        yield "db.save_project", lambda: db.save_project(name, location, "Normal", boq_df)
+    yield "db.get_bids_for_project", lambda: db.get_bids_for_project(name)
+
+def supplier(session, rng, seed_projects):
+    """Marketplace / Supplier Portal: browse tenders, bid on one, check bid history."""
+    import logic.db_manager as db
+
+    location = rng.choice(LOCATIONS)
+    name = f"Load Supplier {session}"
+    tenders = yield "db.get_open_tenders", lambda: db.get_open_tenders(location.split(",")[0])
+    if tenders:
+        job = rng.choice(tenders)
+        yield "db.submit_bid", lambda: db.submit_bid(job["name"], name, round(job["est_value"] * rng.uniform(0.85, 1.1), -3), "08012345678")
+    yield "db.get_supplier_bids_page", lambda: db.get_supplier_bids_page(name)
+
+def site_manager(session, rng, seed_projects):
+    """Site Operations: log an expense, move stock, refresh the dashboard metrics."""
+    import logic.db_manager as db
+
+    project, _ = seed_projects[session % len(seed_projects)]
+    item, unit, price = rng.choice(MATERIALS)
+    spent, category = rng.choice(EXPENSES)
+    yield "db.log_expense", lambda: db.log_expense(project, spent, rng.randint(5, 200) * 1000, category, "load test")
+    op = "add" if rng.random() < 0.6 else "remove"
+    yield "db.update_inventory", lambda: db.update_inventory(project, item, float(rng.randint(1, 20)), unit, op)
+    yield "db.get_project_metrics", lambda: db.get_project_metrics(project)
+    if rng.random() < 0.3:
+        yield "db.get_project_expenses_page", lambda: db.get_project_expenses_page(project)
+
+ROLES = {"chief_engineer": chief_engineer, "supplier": supplier, "site_manager": site_manager}
+
+# Business rejections the UI shows as warnings - not failures of the system
+LEGIT_REJECTIONS = ("Insufficient Stock!", "Item not in inventory!")
+
+def _failed(result):
+    if result is False:
+        return "returned False"
+    if isinstance(result, tuple) and len(result) == 2 and result[0] is False and result[1] not in LEGIT_REJECTIONS:
+        return str(result[1])
+    return None
+
+def run_session(role, session, seed, deadline, think_s, seed_projects, results):
+    rng = random.Random(seed)
+    while time.time() < deadline:
+        flow = ROLES[role](session, rng, seed_projects)
+        result = None
+        try:
+            while True:
+                action, call = flow.send(result)
+                locks_before = CONTENTION.thread_locks()
+                start = time.perf_counter()
+                try:
+                    result = call()
+                    error = _failed(result)
+                except Exception as e:
+                    result, error = None, f"{type(e).__name__}: {e}"
+                if error and CONTENTION.thread_locks() > locks_before:
+                    error = "database is locked"  # Most db_manager writes swallow the exception and return False
+                elapsed = (time.perf_counter() - start) * 1000
+                with results["lock"]:
+                    results["ms"][(role, action)].append(elapsed)
+                    if error:
+                        results["errors"][(role, action)].append(error)
+                if think_s:
+                    time.sleep(rng.expovariate(1 / think_s))
+        except StopIteration:
+            pass
+
+# ==========================================
+# 🚀 MAIN
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test against local upstream stand-ins.")
+    parser.add_argument("--engineers", type=int, default=2, help="Chief Engineer sessions")
+    parser.add_argument("--suppliers", type=int, default=12, help="Supplier sessions")
+    parser.add_argument("--site-managers", type=int, default=6, help="Site Manager sessions")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--think", type=float, default=0.2, help="Mean think time between actions (s); 0 = closed loop")
+    parser.add_argument("--busy-timeout", type=float, help="sqlite busy timeout (s) for every connection (default: the app's)")
+    parser.add_argument("--wal", action="store_true", help="Switch the database to WAL journaling first")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Upstream stand-in latency multiplier (0 = instant)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    server = start_mock_server(latency_scale=args.latency_scale, seed=args.seed)
+    workdir = use_stand_ins(server)
+    import logic.db_manager as db
+    if args.busy_timeout is None:
+        args.busy_timeout = db.BUSY_TIMEOUT
+    # The Algolia SDK only speaks https, so db_manager's search sync runs in its SQLite offline mode
+    db.set_search_status("disabled", "load test: Algolia SDK can't be redirected to the stand-ins")
+
+    db.DB_FILE = os.path.join(workdir, "load_test.db")
+    db.init_db()
+    if args.wal:
+        sqlite3.connect(db.DB_FILE).execute("PRAGMA journal_mode=WAL").close()
+    use_backend(SQLiteBackend(db.DB_FILE, timeout=args.busy_timeout, factory=CountingConnection))
+
+    rng = random.Random(args.seed)
+    seed_projects = [(f"Load Site {i}", LOCATIONS[i % len(LOCATIONS)]) for i in range(max(args.site_managers, 4))]
+    for name, location in seed_projects:
+        db.save_project(name, location, "Normal", _boq(rng))
+        for item, unit, _ in MATERIALS:
+            db.update_inventory(name, item, 500.0, unit, "add")
+
+    results = {"ms": defaultdict(list), "errors": defaultdict(list), "lock": threading.Lock()}
+    sessions = [(role, i) for role, n in (("chief_engineer", args.engineers), ("supplier", args.suppliers), ("site_manager", args.site_managers))
+                for i in range(n)]
+    CONTENTION.reset()  # Seeding doesn't count
+    deadline = time.time() + args.duration
+    threads = [threading.Thread(target=run_session, args=(role, i, args.seed * 1000 + n, deadline, args.think, seed_projects, results))
+               for n, (role, i) in enumerate(sessions)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    journal = "WAL" if args.wal else "rollback journal"
+    print(f"--- SESSION LOAD TEST ({args.engineers} engineers, {args.suppliers} suppliers, {args.site_managers} site managers, "
+          f"{elapsed:.0f}s, busy timeout {args.busy_timeout:g}s, {journal}) ---")
+    print(f"{'role / action':<44}{'calls':>7}{'/s':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'locked':>8}{'failed':>8}")
+    total_calls = total_failed = 0
+    for (role, action), ms in sorted(results["ms"].items()):
+        ms = np.array(ms)
+        errors = results["errors"][(role, action)]
+        failed, locked = len(errors), sum("locked" in e for e in errors)
+        total_calls += len(ms)
+        total_failed += failed
+        print(f"{role + ' / ' + action:<44}{len(ms):>7}{len(ms) / elapsed:>7.1f}{np.percentile(ms, 50):>7.1f} ms"
+              f"{np.percentile(ms, 95):>7.1f} ms{np.percentile(ms, 99):>7.1f} ms{locked:>8}{failed:>8}")
+
+    writes = np.array(CONTENTION.write_ms) if CONTENTION.write_ms else np.zeros(1)
+    print(f"\nThroughput      : {total_calls / elapsed:,.1f} actions/s ({total_calls} actions, {total_failed} failed)")
+    print(f"SQL statements  : {CONTENTION.statements:,}  | write p50 {np.percentile(writes, 50):.2f} ms, "
+          f"p99 {np.percentile(writes, 99):.2f} ms, max {writes.max():.0f} ms (includes lock waits)")
+    print(f"'database is locked': {CONTENTION.locked} ({CONTENTION.locked / max(CONTENTION.statements, 1):.2%} of statements)")
+
+    unexpected = {key: errs for key, errs in results["errors"].items() if any("locked" not in e for e in errs)}
+    for (role, action), errs in unexpected.items():
+        print(f"❌ {role} / {action}: {errs[0]}")
+    sys.exit(1 if unexpected else 0)
+
+if __name__ == "__main__":
+    main()
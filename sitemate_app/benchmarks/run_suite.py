@@ -0,0 +1,328 @@
+### (End-to-end benchmark suite for the logic package. Seeds a synthetic database with
+### Dataset/generate_full_database.py, times every case, and compares each case's fastest sample
+### against benchmarks/baselines.json. Exits 1 when a case is slower than baseline x --threshold.
+### Baselines are the median of the fastest sample over several fresh rounds, and are scaled by a
+### fixed calibration workload timed in the same run, so a busier or slower host moves both sides.
+### A case that swung between those rounds gets that much more room before it counts as a regression.)
+###
+### Usage (from sitemate_app/):
+###   python benchmarks/run_suite.py                      # compare against stored baselines
+###   python benchmarks/run_suite.py --update-baseline    # record this machine's numbers (5 rounds)
+###   python benchmarks/run_suite.py --filter db. --repeat 9 --threshold 1.3
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logic.db_manager as db
+from logic.data_fetcher import get_live_price
+from logic.feasibility_engine import check_feasibility
+from logic.labor_engine import calculate_labor_cost
+from logic.report_generator import generate_expense_pdf, generate_pdf_report
+from logic.structural_engine import StructuralEngine
+from logic.timeline_engine import calculate_project_timeline
+from logic.utils import extract_json_from_text
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+GENERATOR_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "Dataset", "generate_full_database.py"))
+
+NOISE_FLOOR_MS = 0.05   # Ignore regressions smaller than this in absolute terms
+SUB_MS_THRESHOLD = 2.0  # Cases under 1 ms swing with cache and allocator state: judged against this instead
+MIN_SAMPLE_S = 0.02     # Fast cases are looped until one sample takes at least this long
+
+CASES = {}
+
+def case(name):
+    """Registers fn(ctx) as a benchmark case."""
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+# ==========================================
+# 🧪 FIXTURES
+# ==========================================
+
+def _load_generator():
+    spec = importlib.util.spec_from_file_location("generate_full_database", GENERATOR_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def build_fixtures(tmp, args):
+    """Synthetic app database + in-memory inputs, identical for every run with the same flags."""
+    gen = _load_generator()
+    seeded = argparse.Namespace(projects=args.projects, bids_per_project=8, expenses_per_project=args.rows_per_project,
+                                inventory_logs_per_project=args.rows_per_project, diary_days=90, commit_every=100)
+    pool = gen.generate_suppliers(500, random.Random(7))
+    start = time.perf_counter()
+    gen.populate_db(os.path.join(tmp, "bench_suite.db"), pool, random.Random(8), seeded)
+    print(f"Seeded {args.projects:,} projects x {args.rows_per_project:,} rows in {time.perf_counter() - start:.1f}s")
+
+    project = db.get_all_projects.uncached()[0][0]
+    rng = np.random.default_rng(3)
+    boq_items = np.array(["Cement", "Sharp Sand", "Granite", "Blocks (9 inch)", "Blocks (6 inch)", "Iron Rods (12mm)", "Roofing Sheet", "PVC Pipe"])
+    n_boq = 400
+    boq = pd.DataFrame({"Item": boq_items[rng.integers(0, len(boq_items), n_boq)], "Qty": rng.integers(1, 2000, n_boq).astype(float),
+                        "Unit Price": rng.integers(500, 700000, n_boq).astype(float)})
+    boq["Total Cost"] = boq["Qty"] * boq["Unit Price"]
+
+    # A long LLM answer: prose, then the ||| JSON ||| block with a large BOQ
+    prose = "Design notes: strip foundation 675mm wide, 225mm deep, Y12 runners. " * 4000
+    payload = json.dumps({"items": [{"item": str(i), "qty": int(q)} for i, q in zip(boq["Item"], boq["Qty"])] * 50})
+    llm_text = f"{prose}\n### JSON\n|||{payload}|||\n"
+
+    return {
+        "project": project,
+        "expenses": db.get_project_expenses.uncached(project),
+        "planned": db.get_project_metrics.uncached(project)["planned"],
+        "boq": boq,
+        "ai_text": "Executive summary for a 4-bedroom duplex on laterite. " * 200,
+        "llm_text": llm_text,
+        "engine": StructuralEngine(),
+        "counter": [0],
+    }
+
+# ==========================================
+# 🗄️ DATABASE
+# ==========================================
+
+@case("db.get_all_projects")
+def _(ctx):
+    db.get_all_projects.uncached()
+
+@case("db.get_project_expenses")
+def _(ctx):
+    db.get_project_expenses.uncached(ctx["project"])
+
+@case("db.get_project_expenses.cached")
+def _(ctx):
+    db.get_project_expenses(ctx["project"])
+
+@case("db.get_project_expenses_page")
+def _(ctx):
+    db.get_project_expenses_page.uncached(ctx["project"])
+
+@case("db.get_project_metrics")
+def _(ctx):
+    db.get_project_metrics.uncached(ctx["project"])
+
+@case("db.get_inventory_balance_as_of")
+def _(ctx):
+    db.get_inventory_balance_as_of(ctx["project"], "Cement", "2025-01-01")
+
+@case("db.get_bids_for_project")
+def _(ctx):
+    db.get_bids_for_project.uncached(ctx["project"])
+
+@case("db.log_expense")
+def _(ctx):
+    db.log_expense(ctx["project"], "Cement", 10500, "Materials", "bench")
+
+@case("db.update_inventory")
+def _(ctx):
+    # Alternate IN/OUT so the balance never drifts towards zero
+    ctx["counter"][0] += 1
+    db.update_inventory(ctx["project"], "Cement", 5, "Bags", "add" if ctx["counter"][0] % 2 else "remove")
+
+# ==========================================
+# 💰 PRICING & ENGINES
+# ==========================================
+
+@case("pricing.get_live_price")
+def _(ctx):
+    # Offline catalogue path (no Algolia keys in the benchmark process)
+    for item in ("Cement", "Sharp Sand", "12mm Iron Rod", "9-inch Vibrated Block"):
+        get_live_price(item, "Lekki, Lagos")
+
+@case("engine.labor")
+def _(ctx):
+    calculate_labor_cost(ctx["boq"])
+
+@case("engine.timeline")
+def _(ctx):
+    calculate_project_timeline(ctx["boq"])
+
+@case("engine.structural")
+def _(ctx):
+    engine = ctx["engine"]
+    for load in range(50, 1050, 50):
+        engine.design_strip_foundation(load, 150)
+        engine.design_pad_foundation(load * 4, 150)
+
+@case("engine.feasibility")
+def _(ctx):
+    for location in ("Lekki, Lagos", "Ibadan, Oyo", "Abuja, FCT"):
+        for building in ("3-Bedroom Bungalow", "4-Bedroom Duplex", "Perimeter Fence (Plot)"):
+            check_feasibility(location, building, 2, 600)
+
+@case("utils.extract_json_from_text")
+def _(ctx):
+    extract_json_from_text(ctx["llm_text"])
+
+# ==========================================
+# 📄 REPORTS
+# ==========================================
+
+@case("report.boq_pdf")
+def _(ctx):
+    generate_pdf_report("4 bedroom duplex", "Lekki, Lagos", "Laterite", ctx["ai_text"], ctx["boq"])
+
+@case("report.expense_pdf")
+def _(ctx):
+    generate_expense_pdf(ctx["project"], ctx["planned"], ctx["expenses"])
+
+# ==========================================
+# ⏱️ RUNNER
+# ==========================================
+
+def measure(fn, ctx, repeat):
+    """Per-call seconds for `repeat` samples (after one warm-up call)."""
+    fn(ctx)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(ctx)
+        if time.perf_counter() - start >= MIN_SAMPLE_S or number >= 100_000:
+            break
+        number *= 10
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(ctx)
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+def calibrate(repeat=15):
+    """Fastest time (ms) of a fixed mixed workload (Python loop, NumPy sort, in-memory SQLite) on this host, right now."""
+    data = np.random.default_rng(0).random(200_000)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (k INTEGER, v REAL)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", ((i % 97, float(v)) for i, v in enumerate(data[:20_000])))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sum(i * i for i in range(200_000))
+        np.sort(data)
+        conn.execute("SELECT k, SUM(v) FROM t GROUP BY k").fetchall()
+        best = min(best, time.perf_counter() - start)
+    conn.close()
+    return round(best * 1000, 4)
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor() or platform.machine()}
+
+def load_baselines():
+    if not os.path.exists(BASELINE_FILE):
+        return {"machine": None, "cases": {}}
+    with open(BASELINE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+def run_round(selected, args):
+    """One pass over the selected cases on freshly seeded fixtures: {name: samples in ms}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_FILE = os.path.join(tmp, "bench_suite.db")
+        ctx = build_fixtures(tmp, args)
+        return {name: np.array(measure(fn, ctx, args.repeat)) * 1000 for name, fn in selected.items()}
+
+def record_baselines(baselines, selected, args, settings):
+    """
+    Median over --rounds fresh rounds of each case's fastest sample (one fast or slow round can't set
+    the bar), plus its spread: slowest round's best / that median, the run-to-run noise for the case.
+    """
+    rounds, calibrations = [], []
+    for _ in range(args.rounds):
+        rounds.append(run_round(selected, args))
+        calibrations.append(calibrate())
+    results = {}
+    for name in selected:
+        bests = [float(r[name].min()) for r in rounds]
+        pooled = np.concatenate([r[name] for r in rounds])
+        results[name] = {"best_ms": round(statistics.median(bests), 4), "median_ms": round(float(np.median(pooled)), 4),
+                         "p95_ms": round(float(np.percentile(pooled, 95)), 4), "spread": round(max(bests) / statistics.median(bests), 3)}
+        print(f"{name:<34}{results[name]['best_ms']:>9.3f} ms  (round bests {min(bests):.3f}-{max(bests):.3f} ms)")
+    baselines["machine"] = machine()
+    baselines["calibration_ms"] = round(statistics.median(calibrations), 4)
+    baselines["cases"].update(results)
+    baselines["settings"] = settings
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\n💾 Stored {len(results)} baselines ({args.rounds} rounds) in {BASELINE_FILE}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the logic benchmark suite and check for regressions.")
+    parser.add_argument("--filter", default="", help="Only cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=1.25, help="Fail when best time > baseline x threshold (x the case's recorded spread)")
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--rows-per-project", type=int, default=500)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this machine's timings in baselines.json")
+    parser.add_argument("--rounds", type=int, default=5, help="Fresh rounds behind each stored baseline (--update-baseline)")
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    settings = {"projects": args.projects, "rows_per_project": args.rows_per_project}
+    selected = {name: fn for name, fn in CASES.items() if args.filter in name}
+    if args.update_baseline:
+        record_baselines(baselines, selected, args, settings)
+        return
+
+    if baselines["machine"] and baselines["machine"] != machine():
+        print(f"⚠️ Baselines were recorded on {baselines['machine']['platform']} ({baselines['machine']['processor']}); "
+              "ratios across machines are only indicative.")
+    if baselines.get("settings", settings) != settings:
+        print(f"⚠️ Baselines were recorded with {baselines['settings']}; this run uses {settings}.")
+    # Host speed right now vs. when the baselines were taken (same fingerprint doesn't mean same load).
+    # Only ever relaxes the bar: a calibration that happens to run fast must not fail the deploy.
+    scale = max(1.0, calibrate() / baselines["calibration_ms"]) if baselines.get("calibration_ms") else 1.0
+    print(f"Host speed factor vs. baselines: {scale:.2f}x")
+
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_FILE = os.path.join(tmp, "bench_suite.db")
+        ctx = build_fixtures(tmp, args)
+        print(f"\n{'case':<34}{'best':>12}{'median':>12}{'baseline':>12}{'ratio':>9}")
+        for name, fn in selected.items():
+            samples = np.array(measure(fn, ctx, args.repeat)) * 1000
+            best, median = float(samples.min()), float(statistics.median(samples))
+
+            recorded = baselines["cases"].get(name, {})
+            if not recorded.get("best_ms"):
+                print(f"{name:<34}{best:>9.3f} ms{median:>9.3f} ms{'-':>12}{'-':>9}")
+                continue
+            base = recorded["best_ms"] * scale
+            threshold = args.threshold * recorded.get("spread", 1.0)
+            if base < 1.0:
+                threshold = max(threshold, SUB_MS_THRESHOLD)
+            if best / base > threshold:
+                # Confirm before flagging: one noisy burst shouldn't fail a deploy
+                best = min(best, float(np.min(measure(fn, ctx, args.repeat))) * 1000)
+            ratio = best / base
+            slow = ratio > threshold and best - base > NOISE_FLOOR_MS
+            if slow:
+                regressions.append(name)
+            print(f"{name:<34}{best:>9.3f} ms{median:>9.3f} ms{base:>9.3f} ms{ratio:>8.2f}x {'❌' if slow else '✅'}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:g}x baseline: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\n✅ No regressions over {args.threshold:g}x baseline")
+
+if __name__ == "__main__":
+    main()
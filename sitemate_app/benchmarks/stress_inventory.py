@@ -0,0 +1,79 @@
+### (Concurrency stress test: many threads issuing/receiving the same inventory item at once.)
+### Run from sitemate_app/:  python benchmarks/stress_inventory.py --threads 16 --ops 200
+### Exits non-zero if any update is lost or the ledger disagrees with the balance.
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Path fix to find 'logic' folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logic.db_manager as db
+
+PROJECT, ITEM, UNIT = "Stress Site", "Cement", "Bags"
+
+def worker(ops, seed, results):
+    rng = random.Random(seed)
+    applied, rejected = 0.0, 0
+    for _ in range(ops):
+        qty = float(rng.randint(1, 10))
+        op = 'add' if rng.random() < 0.5 else 'remove'
+        ok, msg = db.update_inventory(PROJECT, ITEM, qty, UNIT, op)
+        if ok:
+            applied += qty if op == 'add' else -qty
+        elif msg in ("Insufficient Stock!", "Item not in inventory!"):
+            rejected += 1
+        else:
+            results["errors"].append(msg)
+    with results["lock"]:
+        results["applied"] += applied
+        results["rejected"] += rejected
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory ledger concurrency stress test")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="Operations per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_FILE = os.path.join(tmp, "stress.db")
+        db.init_db()
+        conn = sqlite3.connect(db.DB_FILE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+        results = {"applied": 0.0, "rejected": 0, "errors": [], "lock": threading.Lock()}
+        threads = [threading.Thread(target=worker, args=(args.ops, i, results)) for i in range(args.threads)]
+        start = time.perf_counter()
+        for t in threads: t.start()
+        for t in threads: t.join()
+        elapsed = time.perf_counter() - start
+
+        inv = db.get_project_inventory(PROJECT)
+        balance = float(inv["Quantity"].iloc[0]) if not inv.empty else 0.0
+        logs = db.get_inventory_logs(PROJECT)
+        ledger_sum = float(logs["Change"].sum()) if not logs.empty else 0.0
+        as_of = db.get_inventory_balance_as_of(PROJECT, ITEM, "9999-12-31")
+        total_ops = args.threads * args.ops
+
+        print(f"--- INVENTORY STRESS ({args.threads} threads x {args.ops} ops) ---")
+        print(f"Throughput     : {total_ops / elapsed:,.0f} ops/s ({elapsed:.2f}s)")
+        print(f"Rejected (legit): {results['rejected']}  | Unexpected errors: {len(results['errors'])}")
+        print(f"Expected balance: {results['applied']:.1f}")
+        print(f"Table balance   : {balance:.1f}")
+        print(f"Ledger sum      : {ledger_sum:.1f}  ({len(logs)} rows)")
+        print(f"Snapshot as-of  : {as_of:.1f}")
+
+        ok = (not results["errors"]) and abs(balance - results["applied"]) < 1e-6 \
+            and abs(ledger_sum - balance) < 1e-6 and abs(as_of - balance) < 1e-6 and balance >= 0
+        print("✅ No lost updates." if ok else f"❌ MISMATCH {results['errors'][:3]}")
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+### (Portfolio analytics: spend by category across every site, cement used vs. BOQ per project,
+### supplier win rates. Each report is one SQL query over the whole portfolio instead of loading
+### each project's DataFrames in Python.
+###
+### With DuckDB installed (pip install duckdb) the tables are copied into an in-memory columnar
+### copy (through DuckDB's sqlite scanner when it can be loaded, else in chunks over the
+### read snapshot) and refreshed once it is older than MAX_STALENESS and the database changed.
+### Without DuckDB, the same SQL runs on the configured database (SQLite snapshot or PostgreSQL).
+###
+### Usage (from sitemate_app/):
+###   python -m logic.analytics --report win_rates
+###   python -m logic.analytics --parquet exports/    # columnar Parquet files for external tools)
+
+import argparse
+import os
+import threading
+import time
+
+import pandas as pd
+
+import logic.db_manager as db
+from logic.read_replica import get_replica
+from logic.tracing import span
+
+STALENESS_VAR = "SITEMATE_ANALYTICS_STALENESS"
+MAX_STALENESS = float(os.environ.get(STALENESS_VAR, 60))  # Seconds the columnar copy may lag the database
+FETCH_ROWS = 50_000                                        # Rows per chunk when copying without the sqlite scanner
+USE_DUCKDB = True                                          # False: always run the reports on the database itself
+
+# Columns copied into DuckDB (only what the reports read)
+TABLES = {
+    "projects": {"name": "VARCHAR", "location": "VARCHAR", "boq_json": "VARCHAR", "planned_total": "DOUBLE", "timestamp": "VARCHAR"},
+    "expenses": {"project_name": "VARCHAR", "item_name": "VARCHAR", "amount": "DOUBLE", "category": "VARCHAR", "date": "VARCHAR"},
+    "inventory_logs": {"project_name": "VARCHAR", "item_name": "VARCHAR", "change_qty": "DOUBLE", "date": "VARCHAR"},
+    "bids": {"project_name": "VARCHAR", "supplier_name": "VARCHAR", "amount": "DOUBLE", "status": "VARCHAR", "timestamp": "VARCHAR"},
+}
+
+# ==========================================
+# 🦆 COLUMNAR COPY
+# ==========================================
+
+class DuckDBCopy:
+    """In-memory DuckDB tables mirroring one database, rebuilt when stale."""
+
+    scanner_available = None  # Learned on first build; offline hosts can't fetch the sqlite extension
+
+    def __init__(self, backend):
+        import duckdb
+        self.duckdb, self.backend = duckdb, backend
+        self.con = None
+        self.loaded = 0.0          # monotonic() of the last (re)build
+        self.load_ms = 0.0
+        self.rows = 0
+        self.method = None         # "sqlite_scanner" or "chunked"
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _source_stamp(self):
+        path = getattr(self.backend, "path", None)
+        if path is None:
+            return None  # PostgreSQL: no cheap change detector, rebuild on age alone
+        try:
+            st = os.stat(path)
+            wal = os.stat(path + "-wal") if os.path.exists(path + "-wal") else None
+            return (st.st_mtime_ns, st.st_size, wal and (wal.st_mtime_ns, wal.st_size))
+        except FileNotFoundError:
+            return None
+
+    def _attach(self, con):
+        """Scans SQLite directly (needs the sqlite extension, downloaded once by DuckDB). False if unavailable."""
+        if getattr(self.backend, "path", None) is None or DuckDBCopy.scanner_available is False:
+            return False
+        replica = get_replica(self.backend)
+        path = replica.current() if replica is not None else self.backend.path
+        try:
+            con.execute("LOAD sqlite")  # Installs the extension first if needed
+            con.execute("ATTACH ? AS src (TYPE sqlite, READ_ONLY)", [path])
+        except self.duckdb.Error:
+            DuckDBCopy.scanner_available = False
+            return False
+        DuckDBCopy.scanner_available = True
+        for table, cols in TABLES.items():
+            select = ", ".join(f"CAST({c} AS {t}) AS {c}" for c, t in cols.items())
+            con.execute(f"CREATE TABLE {table} AS SELECT {select} FROM src.{table}")
+        con.execute("DETACH src")
+        return True
+
+    def _copy_chunked(self, con):
+        """Streams each table out of the read snapshot (or PostgreSQL) FETCH_ROWS at a time."""
+        source = db._connect(snapshot=True)
+        try:
+            for table, cols in TABLES.items():
+                con.execute(f"CREATE TABLE {table} ({', '.join(f'{c} {t}' for c, t in cols.items())})")
+                c = source.cursor()
+                c.execute(f"SELECT {', '.join(cols)} FROM {table}")
+                while True:
+                    rows = c.fetchmany(FETCH_ROWS)
+                    if not rows:
+                        break
+                    chunk = pd.DataFrame(rows, columns=list(cols))
+                    con.register("chunk", chunk)
+                    con.execute(f"INSERT INTO {table} SELECT * FROM chunk")
+                    con.unregister("chunk")
+        finally:
+            source.close()
+
+    def _build(self):
+        stamp = self._source_stamp()
+        with span("analytics.refresh", "db", **{"db.system": "duckdb"}) as s:
+            start = time.perf_counter()
+            con = self.duckdb.connect()
+            self.method = "sqlite_scanner" if self._attach(con) else "chunked"
+            if self.method == "chunked":
+                for table in TABLES:
+                    con.execute(f"DROP TABLE IF EXISTS {table}")
+                self._copy_chunked(con)
+            self.rows = sum(con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in TABLES)
+            self.load_ms = (time.perf_counter() - start) * 1000
+            s["attributes"].update({"analytics.method": self.method, "db.rows": self.rows})
+        self.con, self._stamp, self.loaded = con, stamp, time.monotonic()
+
+    def cursor(self):
+        """A DuckDB cursor on a copy no older than MAX_STALENESS (rebuilt first if the database changed)."""
+        if self.con is None or time.monotonic() - self.loaded > MAX_STALENESS:
+            if self._lock.acquire(blocking=self.con is None):
+                try:
+                    if self.con is None or time.monotonic() - self.loaded > MAX_STALENESS:
+                        if self.con is not None and self._stamp is not None and self._source_stamp() == self._stamp:
+                            self.loaded = time.monotonic()  # Nothing committed since the last build
+                        else:
+                            self._build()
+                finally:
+                    self._lock.release()
+        return self.con.cursor()  # One cursor per query: DuckDB connections aren't shared across threads
+
+_copies = {}
+_copies_lock = threading.Lock()
+
+def _duckdb_copy():
+    """The columnar copy for the configured database, or None when DuckDB isn't installed (or USE_DUCKDB is off)."""
+    if not USE_DUCKDB:
+        return None
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return None
+    backend = db._backend()
+    with _copies_lock:
+        copy = _copies.get(backend.cache_key)
+        if copy is None or copy.backend is not backend:
+            copy = _copies[backend.cache_key] = DuckDBCopy(backend)
+    return copy
+
+def refresh():
+    """Forces a rebuild of the columnar copy (e.g. right after a bulk import). No-op without DuckDB."""
+    copy = _duckdb_copy()
+    if copy is not None:
+        with copy._lock:
+            copy._build()
+
+def engine_info():
+    """Which engine the reports run on, and how fresh its copy is."""
+    copy = _duckdb_copy()
+    if copy is None:
+        return {"engine": db._backend().name, "method": "direct SQL", "rows": None, "age_s": None, "load_ms": None}
+    return {"engine": "duckdb", "method": copy.method, "rows": copy.rows,
+            "age_s": round(time.monotonic() - copy.loaded, 1) if copy.con is not None else None, "load_ms": round(copy.load_ms, 1)}
+
+# ==========================================
+# 🧮 QUERY RUNNER
+# ==========================================
+
+def _dialect():
+    return "duckdb" if _duckdb_copy() is not None else db._backend().name
+
+def _run(name, sql, params=()):
+    """Runs a report query on DuckDB when available, else on the database itself. Returns a DataFrame."""
+    copy = _duckdb_copy()
+    with span(f"analytics.{name}", "db", **{"db.system": "duckdb" if copy is not None else db._backend().name}) as s:
+        if copy is not None:
+            df = copy.cursor().execute(sql, list(params)).df()
+        else:
+            conn = db._connect(snapshot=True)
+            try:
+                c = conn.cursor()
+                c.execute(sql, params)
+                df = pd.DataFrame(c.fetchall(), columns=[d[0] for d in c.description])
+            finally:
+                conn.close()
+        s["attributes"]["db.rows"] = len(df)
+    return df
+
+# BOQ lines out of boq_json (DataFrame.to_json layout: {"Item": {"0": ...}, "Qty": {"0": ...}})
+_BOQ_LINES = {
+    "duckdb": """SELECT name AS project_name, boq_json->'Item'->>k AS item, TRY_CAST(boq_json->'Qty'->>k AS DOUBLE) AS qty
+                 FROM (SELECT name, boq_json, unnest(json_keys(boq_json, '$.Item')) AS k FROM projects WHERE json_valid(boq_json))""",
+    "sqlite": """SELECT p.name AS project_name, i.value AS item, CAST(json_extract(p.boq_json, '$.Qty."' || i.key || '"') AS REAL) AS qty
+                 FROM projects p, json_each(CASE WHEN json_valid(p.boq_json) THEN p.boq_json ELSE '{}' END, '$.Item') i""",
+    "postgresql": """SELECT p.name AS project_name, i.value AS item, CAST(p.boq_json::json -> 'Qty' ->> i.key AS DOUBLE PRECISION) AS qty
+                     FROM projects p, json_each_text(p.boq_json::json -> 'Item') i""",
+}
+
+# ==========================================
+# 📊 REPORTS
+# ==========================================
+
+def spend_by_category(start_date=None, end_date=None):
+    """Spend per expense category across every project, with its share of the total."""
+    query = "SELECT category, SUM(amount) AS amount, COUNT(*) AS entries, COUNT(DISTINCT project_name) AS projects FROM expenses WHERE 1 = 1"
+    params = []
+    if start_date: query += " AND date >= ?"; params.append(str(start_date))
+    if end_date: query += " AND date <= ?"; params.append(str(end_date))
+    df = _run("spend_by_category", query + " GROUP BY category ORDER BY amount DESC, category", params)
+    df["share_pct"] = df["amount"] / df["amount"].sum() * 100 if len(df) else pd.Series(dtype=float)
+    return df
+
+def cement_vs_boq(material="cement"):
+    """
+    Per project: quantity of `material` in the BOQ vs. stock delivered and used (inventory ledger).
+    used_pct_of_boq is NaN for projects whose BOQ doesn't list the material.
+    """
+    pattern = f"%{material.lower()}%"
+    query = f"""
+        WITH boq AS (SELECT project_name, SUM(qty) AS qty FROM ({_BOQ_LINES[_dialect()]}) lines
+                     WHERE LOWER(item) LIKE ? GROUP BY project_name),
+             moves AS (SELECT project_name,
+                              SUM(CASE WHEN change_qty > 0 THEN change_qty ELSE 0 END) AS delivered,
+                              SUM(CASE WHEN change_qty < 0 THEN -change_qty ELSE 0 END) AS used
+                       FROM inventory_logs WHERE LOWER(item_name) LIKE ? GROUP BY project_name)
+        SELECT p.name AS project, p.location, COALESCE(boq.qty, 0.0) AS boq_qty,
+               COALESCE(moves.delivered, 0.0) AS delivered, COALESCE(moves.used, 0.0) AS used
+        FROM projects p LEFT JOIN boq ON boq.project_name = p.name LEFT JOIN moves ON moves.project_name = p.name
+        ORDER BY p.name"""
+    df = _run("cement_vs_boq", query, (pattern, pattern))
+    df["used_pct_of_boq"] = (df["used"] / df["boq_qty"].where(df["boq_qty"] > 0)) * 100
+    return df
+
+def supplier_win_rates(min_bids=1):
+    """
+    Per supplier: bids placed, tenders decided (not Pending), wins, win rate over decided
+    tenders, value awarded and the average bid relative to the project's planned budget.
+    """
+    query = """
+        SELECT b.supplier_name AS supplier, COUNT(*) AS bids, COUNT(DISTINCT b.project_name) AS projects,
+               COUNT(CASE WHEN b.status <> 'Pending' THEN 1 END) AS decided,
+               COUNT(CASE WHEN b.status = 'Accepted' THEN 1 END) AS wins,
+               SUM(CASE WHEN b.status = 'Accepted' THEN b.amount ELSE 0 END) AS awarded_value,
+               AVG(b.amount / NULLIF(p.planned_total, 0)) AS avg_bid_vs_budget
+        FROM bids b LEFT JOIN projects p ON p.name = b.project_name
+        GROUP BY b.supplier_name HAVING COUNT(*) >= ?
+        ORDER BY wins DESC, bids DESC, supplier"""
+    df = _run("supplier_win_rates", query, (int(min_bids),))
+    df["win_rate"] = df["wins"] / df["decided"].where(df["decided"] > 0)
+    return df
+
+REPORTS = {"spend_by_category": spend_by_category, "cement_vs_boq": cement_vs_boq, "win_rates": supplier_win_rates}
+
+def export_parquet(out_dir):
+    """Writes the columnar copy's tables as Parquet files (DuckDB required). Returns {table: path}."""
+    copy = _duckdb_copy()
+    if copy is None:
+        raise RuntimeError("Parquet export needs DuckDB: pip install duckdb")
+    os.makedirs(out_dir, exist_ok=True)
+    cur, paths = copy.cursor(), {}
+    for table in TABLES:
+        paths[table] = os.path.join(out_dir, f"{table}.parquet")
+        cur.execute(f"COPY {table} TO '{paths[table]}' (FORMAT parquet, COMPRESSION zstd)")
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio-wide reports over the SiteMate database.")
+    parser.add_argument("--db", default=db.DB_FILE, help="SQLite database file (ignored when SITEMATE_DATABASE_URL is set)")
+    parser.add_argument("--report", choices=list(REPORTS), action="append", help="Report(s) to print (default: all)")
+    parser.add_argument("--parquet", metavar="DIR", help="Also export the tables as Parquet into DIR")
+    args = parser.parse_args()
+
+    db.DB_FILE = args.db
+    for name in args.report or REPORTS:
+        start = time.perf_counter()
+        df = REPORTS[name]()
+        print(f"\n--- {name} ({len(df):,} rows, {(time.perf_counter() - start) * 1000:.0f} ms) ---")
+        print(df.head(20).to_string(index=False))
+    info = engine_info()
+    print(f"\nEngine: {info['engine']} ({info['method']}" + (f", {info['rows']:,} rows copied in {info['load_ms']:.0f} ms)" if info["rows"] is not None else ")"))
+    if args.parquet:
+        for table, path in export_parquet(args.parquet).items():
+            print(f"📦 {table} -> {path}")
+
+if __name__ == "__main__":
+    main()
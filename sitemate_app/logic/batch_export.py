@@ -0,0 +1,126 @@
+### (Portfolio export: builds BOQ, expense, inventory and diary PDFs for every project
+### across a process pool and streams them into a single ZIP.)
+###
+### Usage (from sitemate_app/):
+###   python -m logic.batch_export --out portfolio_reports.zip --workers 4
+
+import argparse
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import logic.db_manager as db
+from logic.report_generator import generate_pdf_report, generate_expense_pdf, generate_inventory_pdf, generate_diary_pdf
+
+REPORT_KINDS = ["boq", "expense", "inventory", "diary"]
+
+# ==========================================
+# 🏭 WORKER SIDE (runs in child processes)
+# ==========================================
+
+def _init_worker(db_file):
+    """Points the worker's db_manager at the database being exported."""
+    db.DB_FILE = db_file
+
+def _safe_name(name):
+    return "".join(ch if ch.isalnum() or ch in " -_" else "_" for ch in name).strip() or "project"
+
+def build_report(project, kind):
+    """
+    Generates one PDF. Returns (zip path, pdf bytes). Reads bypass the query cache: each project
+    is read once per report, and caching it would grow worker memory with the portfolio.
+    """
+    location, soil, boq_df = db.load_project_data.uncached(project)
+    planned_total = boq_df['Total Cost'].sum() if boq_df is not None and 'Total Cost' in boq_df else 0
+    folder = _safe_name(project)
+
+    if kind == "boq":
+        pdf = generate_pdf_report("Project Estimation", location or "", soil or "", "Generated via SiteMate Pro", boq_df)
+    elif kind == "expense":
+        pdf = generate_expense_pdf(project, planned_total, db.get_project_expenses.uncached(project))
+    elif kind == "inventory":
+        pdf = generate_inventory_pdf(project, db.get_project_inventory.uncached(project), db.get_inventory_logs.uncached(project))
+    elif kind == "diary":
+        pdf = generate_diary_pdf(project, db.get_site_diary.uncached(project))
+    else:
+        raise ValueError(f"Unknown report kind: {kind}")
+    return f"{folder}/{folder}_{kind}.pdf", pdf
+
+# ==========================================
+# 📦 COORDINATOR
+# ==========================================
+
+def print_progress(done, total, arcname, elapsed):
+    rate = done / elapsed if elapsed else 0
+    print(f"[{done}/{total}] {arcname} ({rate:.1f} reports/s)")
+
+def export_portfolio(out_path, db_file=None, workers=None, kinds=None, projects=None, progress=print_progress):
+    """
+    Writes every (project, report kind) PDF into `out_path` (ZIP).
+    Only ~2 results per worker are in flight at once; each PDF is written to the
+    archive as soon as it arrives, so memory stays flat regardless of portfolio size.
+    Returns a stats dict: reports, failed, seconds, reports_per_sec.
+    """
+    db_file = db_file or db.DB_FILE
+    workers = workers or os.cpu_count() or 1
+    kinds = kinds or REPORT_KINDS
+    if projects is None:
+        db.DB_FILE = db_file
+        projects = [p[0] for p in db.get_all_projects()]
+
+    jobs = [(p, k) for p in projects for k in kinds]
+    total = len(jobs)
+    done, failed = 0, []
+    start = time.perf_counter()
+
+    with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as zf, \
+         ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_file,)) as pool:
+        queue = iter(jobs)
+        in_flight = {}
+
+        def top_up():
+            while len(in_flight) < workers * 2:
+                job = next(queue, None)
+                if job is None: return
+                in_flight[pool.submit(build_report, *job)] = job
+
+        top_up()
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                project, kind = in_flight.pop(future)
+                done += 1
+                try:
+                    arcname, pdf_bytes = future.result()
+                    zf.writestr(arcname, pdf_bytes)
+                except Exception as e:
+                    arcname = f"{project} ({kind})"
+                    failed.append((project, kind, str(e)))
+                if progress:
+                    progress(done, total, arcname, time.perf_counter() - start)
+            top_up()
+
+    seconds = time.perf_counter() - start
+    return {
+        "reports": done - len(failed),
+        "failed": failed,
+        "seconds": seconds,
+        "reports_per_sec": (done - len(failed)) / seconds if seconds else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Export PDF reports for every project into a ZIP.")
+    parser.add_argument("--db", default=db.DB_FILE, help="SQLite database file")
+    parser.add_argument("--out", default="portfolio_reports.zip", help="Output ZIP path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--kinds", nargs="+", choices=REPORT_KINDS, default=REPORT_KINDS)
+    args = parser.parse_args()
+
+    stats = export_portfolio(args.out, db_file=args.db, workers=args.workers, kinds=args.kinds)
+    print(f"\n✅ {stats['reports']} reports in {stats['seconds']:.1f}s ({stats['reports_per_sec']:.1f} reports/s) -> {args.out}")
+    for project, kind, err in stats["failed"]:
+        print(f"❌ {project} [{kind}]: {err}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+### (Tender evaluation. A project's bids come back from one indexed query, plus one lookup of the
+### bidding suppliers' ratings and base locations, and are scored in NumPy: price, rating, distance
+### from site and delivery time, weighted per tender. Tenders can close at a set time and be
+### sealed until then (amounts hidden, no award). The award itself is db_manager.update_bid_status:
+### one bid accepted, the rest rejected, in a single transaction.)
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import logic.db_manager as db
+from logic.geo_index import haversine_km, proximity_score, site_coordinates
+from logic.query_cache import cached_query, invalidate
+
+DEFAULT_WEIGHTS = {"price": 0.5, "rating": 0.2, "distance": 0.15, "delivery": 0.15}
+NEUTRAL_SCORE = 0.5     # Factor score when a bid doesn't say (unregistered supplier, unknown location, no delivery time)
+FAIR_BAND_PCT = 10      # Within +/-10% of the estimate is a fair price (same band as the Marketplace labels)
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# ==========================================
+# 🗓️ TENDER SETTINGS
+# ==========================================
+
+def set_tender(project_name, closes_at=None, sealed=False):
+    """
+    Close time (datetime or None = open until awarded) and sealed flag for a project's tender.
+    Returns False (nothing saved) for a sealed tender without a close time: it would never open.
+    """
+    if sealed and closes_at is None:
+        return False
+    closes = closes_at.strftime(TIME_FORMAT) if closes_at is not None else None
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        c.execute('''INSERT INTO tenders (project_name, closes_at, sealed, timestamp) VALUES (?, ?, ?, ?)
+                     ON CONFLICT (project_name) DO UPDATE SET closes_at = excluded.closes_at, sealed = excluded.sealed, timestamp = excluded.timestamp''',
+                  (project_name, closes, int(bool(sealed)), datetime.now().strftime(TIME_FORMAT)))
+        conn.commit()
+    finally:
+        conn.close()
+    invalidate("tenders", f"bids:{project_name}")
+    return True
+
+@cached_query("tenders")
+def get_tender_close_times():
+    """{project: (closes_at 'YYYY-MM-DD HH:MM' or None, sealed)} for every project with tender settings (one query, for the job board)."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT project_name, closes_at, sealed FROM tenders")
+    rows = c.fetchall()
+    conn.close()
+    return {name: (closes, bool(sealed)) for name, closes, sealed in rows}
+
+def tender_status(project_name, now=None):
+    """
+    closes_at, sealed, is_closed and is_hidden (sealed and still open) for a project's tender.
+    Sealing only holds until a close time, so a sealed row without one (saved before set_tender
+    refused them) counts as unsealed, matching the award check in db_manager.update_bid_status.
+    """
+    closes, sealed = get_tender_close_times().get(project_name, (None, False))
+    now = (now or datetime.now()).strftime(TIME_FORMAT)
+    closed = closes is not None and closes <= now
+    sealed = sealed and closes is not None
+    return {"closes_at": closes, "sealed": sealed, "is_closed": closed, "is_hidden": sealed and not closed}
+
+# ==========================================
+# 🏆 RANKING
+# ==========================================
+
+@cached_query("bids", "bids:{project_name}", "suppliers")
+def _bid_rows(project_name):
+    """(bids frame with supplier rating / base location, project location, planned total)."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT location, planned_total FROM projects WHERE name = ?", (project_name,))
+    project = c.fetchone() or (None, None)
+    c.execute("SELECT id, supplier_name, amount, delivery_days, status, timestamp FROM bids WHERE project_name = ?", (project_name,))
+    bids = pd.DataFrame(c.fetchall(), columns=["id", "supplier", "amount", "delivery_days", "status", "timestamp"])
+    # One row per bidding supplier (a join would repeat the lookup for every bid)
+    c.execute("""SELECT company_name, MAX(rating), MIN(location) FROM suppliers
+                 WHERE company_name IN (SELECT supplier_name FROM bids WHERE project_name = ?) GROUP BY company_name""", (project_name,))
+    profiles = pd.DataFrame(c.fetchall(), columns=["supplier", "rating", "location"]).set_index("supplier")
+    conn.close()
+    bids = bids.join(profiles, on="supplier")
+    return bids, project[0], float(project[1] or 0.0)
+
+def _distances(locations, site):
+    """km from the site to each supplier base (NaN where either location is unknown)."""
+    site_xy = site_coordinates(site)
+    out = np.full(len(locations), np.nan)
+    if site_xy is None:
+        return out
+    known = {loc: site_coordinates(loc) for loc in pd.unique(locations)}
+    xy = np.array([known[loc] or (np.nan, np.nan) for loc in locations], dtype=float).reshape(-1, 2)
+    if len(xy):
+        out = haversine_km(site_xy[0], site_xy[1], xy[:, 0], xy[:, 1])
+    return out
+
+def _price_label(diff_pct):
+    return np.where(np.isnan(diff_pct), "", np.where(np.abs(diff_pct) <= FAIR_BAND_PCT, "✅ Fair",
+                    np.where(diff_pct > FAIR_BAND_PCT, "⚠️ High", "📉 Suspiciously Low")))
+
+def rank_bids(project_name, weights=None, now=None, fresh=False):
+    """
+    Every bid on the project, best first, with a 0-1 weighted score over:
+      price    cheapest bid / this bid
+      rating   supplier rating / 5
+      distance 1 within the free-delivery radius, falling to 0 where haulage hits the logistics cap
+      delivery fastest delivery time / this one
+    Factors a bid doesn't provide score NEUTRAL_SCORE. `weights` overrides DEFAULT_WEIGHTS
+    (normalized to sum to 1). While a sealed tender is open, amounts and scores are withheld
+    and bids are listed in submission order. fresh=True reads the bids straight from the
+    database instead of the cache (bids placed on another node may not have expired it yet).
+    """
+    bids, site, estimate = (_bid_rows.uncached if fresh else _bid_rows)(project_name)
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    total_weight = sum(weights.values()) or 1.0
+
+    amount = bids["amount"].to_numpy(dtype=float)
+    days = pd.to_numeric(bids["delivery_days"], errors="coerce").to_numpy(dtype=float)
+    rating = pd.to_numeric(bids["rating"], errors="coerce").to_numpy(dtype=float)
+    distance = _distances(bids["location"].to_numpy(dtype=object), site)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cheapest = amount[amount > 0].min() if np.any(amount > 0) else np.nan
+        price_score = np.where(amount > 0, cheapest / amount, 0.0)
+        fastest = days[days > 0].min() if np.any(days > 0) else np.nan
+        delivery_score = np.where(days > 0, fastest / days, NEUTRAL_SCORE)
+        distance_score = np.where(np.isnan(distance), NEUTRAL_SCORE, proximity_score(distance))
+        rating_score = np.where(np.isnan(rating), NEUTRAL_SCORE, np.clip(rating / 5, 0, 1))
+        diff_pct = (amount - estimate) / estimate * 100 if estimate > 0 else np.full(len(amount), np.nan)
+    score = (weights["price"] * price_score + weights["rating"] * rating_score
+             + weights["distance"] * distance_score + weights["delivery"] * delivery_score) / total_weight
+
+    ranked = pd.DataFrame({
+        "Bid ID": bids["id"].to_numpy(),
+        "Supplier": bids["supplier"].to_numpy(),
+        "Amount": amount,
+        "vs Estimate %": diff_pct,
+        "Price Check": _price_label(diff_pct),
+        "Rating": rating,
+        "Distance km": np.round(distance, 1),
+        "Delivery Days": days,
+        "Status": bids["status"].to_numpy(),
+        "Submitted": bids["timestamp"].to_numpy(),
+        "Score": np.round(score, 4),
+    })
+    if tender_status(project_name, now)["is_hidden"]:
+        ranked[["Amount", "vs Estimate %", "Score"]] = np.nan
+        ranked["Price Check"] = ""
+        ranked = ranked.sort_values(["Submitted", "Bid ID"], ignore_index=True)
+    else:
+        ranked = ranked.sort_values(["Score", "Amount", "Bid ID"], ascending=[False, True, True], ignore_index=True)
+    ranked.insert(0, "Rank", np.arange(1, len(ranked) + 1))
+    return ranked
+
+def award_best(project_name, weights=None):
+    """Awards the tender to the highest-scoring pending bid. Returns its id, or None if nothing could be awarded."""
+    ranked = rank_bids(project_name, weights, fresh=True)
+    pending = ranked[ranked["Status"] == "Pending"]
+    if pending.empty or pending["Score"].isna().all():
+        return None
+    bid_id = int(pending["Bid ID"].iloc[0])
+    return bid_id if db.update_bid_status(bid_id, "Accepted") else None
@@ -0,0 +1,102 @@
+### (Application startup. Importing db_manager no longer touches the database or
+### the network: bootstrap() runs schema setup once per process and health-checks
+### Algolia in a background thread, so the first page renders immediately.)
+###
+### Deploy-time command (from sitemate_app/):
+###   python -m logic.bootstrap --deploy
+
+import argparse
+import threading
+import time
+
+import streamlit as st
+
+import logic.db_manager as db
+from logic.tracing import instrument_requests
+
+HEALTH_CHECK_INTERVAL = 60   # Seconds between search backend checks
+BANNER_REFRESH_SECONDS = 3   # How often the 'connecting' banner re-checks
+
+_started = False
+_lock = threading.Lock()
+
+# ==========================================
+# 🚀 PROCESS STARTUP
+# ==========================================
+
+def bootstrap():
+    """
+    Safe to call at the top of every page/rerun; only the first successful call does any work.
+    Concurrent first runs wait for the schema instead of rendering against a half-made database,
+    and a failed init_db (locked file, PostgreSQL down) raises and is retried on the next run.
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        instrument_requests()
+        db.init_db()
+        _started = True
+    db.set_search_status("connecting")
+    threading.Thread(target=_health_loop, name="sitemate-search-health", daemon=True).start()
+
+def _health_loop():
+    while True:
+        state, detail = db.check_search_backend()
+        if state != db.get_search_status()["state"]:
+            print(f"🔎 Search backend: {state} {detail}".rstrip())
+        db.set_search_status(state, detail)
+        if state == "disabled":
+            return  # No keys configured; nothing to reconnect to
+        time.sleep(HEALTH_CHECK_INTERVAL)
+
+# ==========================================
+# 🖥️ DEGRADED-MODE BANNER
+# ==========================================
+
+def _search_banner():
+    status = db.get_search_status()
+    if status["state"] == "connecting":
+        st.info("🔌 Connecting to the search service... supplier and tender search use the local database until it is ready.")
+    elif status["state"] == "degraded":
+        st.warning(f"⚠️ Search service unreachable. Running in offline mode (local database). {status['detail'][:120]}")
+
+def render_status_banner():
+    """Shows a banner while search is connecting or down. Polls itself until the check finishes."""
+    state = db.get_search_status()["state"]
+    if state == "connecting":
+        st.fragment(_search_banner, run_every=BANNER_REFRESH_SECONDS)()
+    elif state == "degraded":
+        _search_banner()
+
+# ==========================================
+# 🛠️ DEPLOY COMMAND
+# ==========================================
+
+def deploy():
+    """Schema migration + Algolia index settings. Returns True when both succeed."""
+    db.init_db()
+    print(f"✅ Database schema ready ({db._backend()!r})")
+    state, detail = db.check_search_backend()
+    if state != "ok":
+        print(f"⚠️ Search not configured: {detail}")
+        return False
+    db.set_search_status("ok")
+    return db.configure_search_indexes()
+
+def main():
+    parser = argparse.ArgumentParser(description="SiteMate deploy-time setup.")
+    parser.add_argument("--deploy", action="store_true", help="Migrate the schema and push Algolia index settings")
+    parser.add_argument("--check", action="store_true", help="Only report search backend health")
+    args = parser.parse_args()
+
+    if args.check:
+        state, detail = db.check_search_backend()
+        print(f"Search backend: {state} {detail}".rstrip())
+        raise SystemExit(0 if state == "ok" else 1)
+    if args.deploy:
+        raise SystemExit(0 if deploy() else 1)
+    parser.print_help()
+
+if __name__ == "__main__":
+    main()
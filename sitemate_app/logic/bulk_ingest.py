@@ -0,0 +1,226 @@
+### (Bulk CSV/Excel import for deliveries, stock usage and expenses.
+### Whole sheets are validated with vectorized pandas checks and written in bulk
+### (executemany on SQLite, COPY on PostgreSQL) inside a single transaction, instead
+### of one commit per form submit.)
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import logic.db_manager as db
+from logic.query_cache import invalidate
+
+EXPENSE_CATEGORIES = ["Materials", "Labor", "Logistics", "Permits", "Misc"]
+
+# Accepted spellings for each canonical column
+COLUMN_ALIASES = {
+    "item": ["item", "item_name", "material", "description", "item_/_service"],
+    "quantity": ["quantity", "qty", "change_qty"],
+    "unit": ["unit", "units"],
+    "operation": ["operation", "action", "type", "direction"],
+    "amount": ["amount", "amount_(₦)", "cost", "value"],
+    "category": ["category", "cat"],
+    "date": ["date", "day"],
+    "note": ["note", "notes", "remark", "receipt"],
+}
+
+OPERATION_MAP = {
+    "add": "add", "in": "add", "stock in": "add", "delivery": "add", "📥 stock in (delivery)": "add",
+    "remove": "remove", "out": "remove", "stock out": "remove", "usage": "remove", "📤 stock out (usage)": "remove",
+}
+
+# ==========================================
+# 📄 LOADING
+# ==========================================
+
+def load_table(source):
+    """Accepts a DataFrame, a CSV/XLSX path, or an uploaded file object (Streamlit UploadedFile)."""
+    if isinstance(source, pd.DataFrame):
+        df = source.copy()
+    else:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        ext = os.path.splitext(str(name))[1].lower()
+        if ext in (".xlsx", ".xls"):
+            df = pd.read_excel(source)
+        else:
+            df = pd.read_csv(source)
+
+    # Normalise headers: "Item Name" -> "item_name" -> canonical "item"
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    rename = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in df.columns and canonical not in rename.values():
+                rename[alias] = canonical
+                break
+    return df.rename(columns=rename).reset_index(drop=True)
+
+def _errors_frame(masks):
+    """[(bool mask, message)] -> DataFrame of (Row, Error), one line per failing check."""
+    parts = [pd.DataFrame({"Row": np.flatnonzero(mask) + 1, "Error": msg}) for mask, msg in masks if mask.any()]
+    if not parts:
+        return pd.DataFrame(columns=["Row", "Error"])
+    return pd.concat(parts, ignore_index=True).sort_values("Row", kind="stable").reset_index(drop=True)
+
+def _text(df, col, default=""):
+    if col not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[col].fillna(default).astype(str).str.strip()
+
+def _dates(df):
+    """Returns (YYYY-MM-DD strings, invalid mask). Blank dates default to today."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    raw = _text(df, "date")
+    raw = raw.where(raw != "", today)
+    # Fast ISO path first; only the leftovers go through the (slow) mixed-format parser
+    parsed = pd.to_datetime(raw, format="%Y-%m-%d", errors="coerce")
+    retry = parsed.isna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(raw[retry], format="mixed", dayfirst=True, errors="coerce")
+    return parsed.dt.strftime("%Y-%m-%d"), parsed.isna().to_numpy()
+
+def _unit_for(items):
+    """Same default units as the Update Stock form."""
+    return np.where(items.str.contains("Cement", case=False), "Bags",
+                    np.where(items.str.contains("Block", case=False), "Pcs", "Tons"))
+
+# ==========================================
+# 💸 EXPENSES
+# ==========================================
+
+def ingest_expenses(project, source):
+    """
+    Bulk-loads expense lines for a project.
+    Returns (rows_inserted, errors_df). Invalid rows are skipped, valid rows are
+    committed together in one transaction.
+    """
+    df = load_table(source)
+    items = _text(df, "item")
+    amounts = pd.to_numeric(df["amount"], errors="coerce") if "amount" in df.columns else pd.Series(np.nan, index=df.index)
+    cat_lookup = {c.lower(): c for c in EXPENSE_CATEGORIES}
+    categories = _text(df, "category", "Misc").str.lower().map(cat_lookup)
+    dates, bad_dates = _dates(df)
+    notes = _text(df, "note")
+
+    errors = _errors_frame([
+        ((items == "").to_numpy(), "Missing item"),
+        (amounts.isna().to_numpy(), "Amount is not a number"),
+        ((amounts < 0).to_numpy(), "Amount cannot be negative"),
+        (categories.isna().to_numpy(), f"Category must be one of {', '.join(EXPENSE_CATEGORIES)}"),
+        (bad_dates, "Unreadable date"),
+    ])
+    valid = ~df.index.isin(errors["Row"] - 1)
+    rows = list(zip([project] * int(valid.sum()), items[valid], amounts[valid].astype(float), categories[valid], dates[valid], notes[valid]))
+
+    if rows:
+        backend = db._backend()
+        conn = db._connect()
+        try:
+            with conn:
+                backend.begin_write(conn, f"expenses:{project}")
+                backend.bulk_insert(conn, "expenses", ["project_name", "item_name", "amount", "category", "date", "note"], rows)
+        finally:
+            conn.close()
+        invalidate(f"expenses:{project}")
+    return len(rows), errors
+
+# ==========================================
+# 📦 INVENTORY
+# ==========================================
+
+def _reject_overdrafts(keys, signed, start_balance):
+    """
+    Running balance per item in sheet order: a row that would take its item below
+    zero is rejected and the balance carries on without it. One pass over the sheet.
+    Returns a boolean mask of rejected rows.
+    """
+    rejected = np.zeros(len(signed), dtype=bool)
+    balance = {}
+    for i, (key, change, start) in enumerate(zip(keys, signed, start_balance)):
+        running = balance.get(key, start) + change
+        if running < -1e-9:
+            rejected[i] = True
+        else:
+            balance[key] = running
+    return rejected
+
+def ingest_inventory(project, source):
+    """
+    Bulk-loads stock movements (deliveries and usage) for a project.
+    Balances are updated with one UPSERT per item (net change) and every row is
+    appended to inventory_logs in date order, all inside one write transaction (BEGIN IMMEDIATE on SQLite).
+    The ledger must stay date-ordered for as-of balances and snapshots, so rows dated
+    before an item's latest ledger entry (or after today) are rejected.
+    Returns (rows_inserted, errors_df).
+    """
+    df = load_table(source)
+    items = _text(df, "item")
+    qty = pd.to_numeric(df["quantity"], errors="coerce") if "quantity" in df.columns else pd.Series(np.nan, index=df.index)
+    ops = _text(df, "operation", "add").str.lower().map(OPERATION_MAP)
+    units = _text(df, "unit")
+    units = units.where(units != "", pd.Series(_unit_for(items), index=df.index))
+    dates, bad_dates = _dates(df)
+
+    row_errors = [
+        ((items == "").to_numpy(), "Missing item"),
+        (qty.isna().to_numpy(), "Quantity is not a number"),
+        ((qty <= 0).to_numpy(), "Quantity must be greater than zero"),
+        (ops.isna().to_numpy(), "Operation must be IN/OUT (add/remove)"),
+        (bad_dates, "Unreadable date"),
+    ]
+    invalid = np.logical_or.reduce([m for m, _ in row_errors])
+    signed = np.where(ops == "remove", -1.0, 1.0) * qty.fillna(0).to_numpy()
+    signed[invalid] = 0.0
+
+    now_time = datetime.now().strftime("%H:%M")
+    backend = db._backend()
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        backend.begin_write(conn, f"inventory:{project}")
+        # Balances are read inside the write lock so the overdraft check can't race other writers
+        c.execute("SELECT item_name, quantity FROM inventory WHERE project_name = ?", (project,))
+        current = dict(c.fetchall())
+        start = items.map(current).fillna(0.0).to_numpy()
+        c.execute("SELECT item_name, MAX(date) FROM inventory_logs WHERE project_name = ? GROUP BY item_name", (project,))
+        latest = items.map(dict(c.fetchall())).fillna("")
+        day = dates.fillna("")
+        backdated = (day < latest).to_numpy() & ~invalid
+        future = (day > datetime.now().strftime("%Y-%m-%d")).to_numpy() & ~invalid
+        signed[backdated | future] = 0.0
+
+        # Overdrafts are checked in the order the rows will land in the ledger: by date, then sheet order
+        order = np.argsort(day.to_numpy(dtype=str), kind="stable")
+        overdraft = np.zeros(len(signed), dtype=bool)
+        overdraft[order] = _reject_overdrafts(items.to_numpy()[order], signed[order], start[order])
+        overdraft &= ~(invalid | backdated | future)
+        errors = _errors_frame(row_errors + [
+            (backdated, "Dated before this item's latest stock entry"),
+            (future, "Date is in the future"),
+            (overdraft, "Insufficient stock at this point in the sheet"),
+        ])
+        valid = ~(invalid | backdated | future | overdraft)
+
+        if valid.any():
+            keep = order[valid[order]]
+            batch = pd.DataFrame({"item": items.to_numpy()[keep], "change": signed[keep], "unit": units.to_numpy()[keep], "date": dates.to_numpy()[keep]})
+            net = batch.groupby("item", sort=False).agg(change=("change", "sum"), unit=("unit", "last"), date=("date", "max"))
+            c.executemany(
+                '''INSERT INTO inventory (project_name, item_name, quantity, unit, last_updated) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (project_name, item_name) DO UPDATE SET quantity = inventory.quantity + excluded.quantity, last_updated = excluded.last_updated''',
+                [(project, r.Index, float(r.change), r.unit, r.date) for r in net.itertuples()])
+            labels = np.where(batch["change"] > 0, "Stock IN", "Stock OUT")
+            backend.bulk_insert(conn, "inventory_logs", ["project_name", "item_name", "change_qty", "unit", "operation", "date", "timestamp"],
+                                zip([project] * len(batch), batch["item"], batch["change"].astype(float), batch["unit"], labels, batch["date"], [now_time] * len(batch)))
+            for item in net.index:
+                db._refresh_inventory_snapshots(c, project, item)
+        conn.commit()
+        invalidate(f"inventory:{project}")
+        return int(valid.sum()), errors
+    except Exception:
+        if conn.in_transaction: conn.rollback()
+        raise
+    finally:
+        conn.close()
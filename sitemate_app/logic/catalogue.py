@@ -0,0 +1,276 @@
+### (Offline material catalogue. Dataset/unified_construction_database.json is parsed
+### once into NumPy columns with an inverted token index and a category index, so
+### BOQ item names like "Iron Rods (12mm)" resolve to a catalogue SKU without Algolia.)
+
+import difflib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+CATALOGUE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "Dataset", "unified_construction_database.json"))
+
+STOPWORDS = {"of", "the", "and", "for", "with", "x", "per", "pcs", "piece"}
+FUZZY_CUTOFF = 0.8   # difflib ratio for typo / plural matches ("rods" -> "rod", "cemnt" -> "cement")
+
+_UNIT_JOIN = re.compile(r"(\d+(?:\.\d+)?)\s*-?\s*(inch|mm|kg|hp|m|a)\b")
+_TOKEN = re.compile(r"[a-z]+|\d+(?:\.\d+)?[a-z]*")
+
+def tokenize(text):
+    """'9-inch Vibrated Blocks' -> ['9inch', 'vibrated', 'block']"""
+    text = _UNIT_JOIN.sub(r"\1\2", str(text).lower())
+    tokens = []
+    for tok in _TOKEN.findall(text):
+        if tok in STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss") and tok[0].isalpha():
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+def _one_edit(a, b):
+    """True if `b` is one insertion, deletion, substitution or adjacent swap away from `a`."""
+    if abs(len(a) - len(b)) > 1 or a == b:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:] or (a[i + 2:] == b[i + 2:] and a[i:i + 2] == b[i:i + 2][::-1])
+    return a[i + 1:] == b[i:] if len(a) > len(b) else a[i:] == b[i + 1:]
+
+def close_matches(tok, vocabulary, n=2):
+    """
+    Typo candidates for a token that isn't in `vocabulary`: [(word, difflib ratio)], best first.
+    A typo is one edit away ("cemnt" -> "cement", not "water" -> "waste"), and size tokens
+    ("12mm", "9inch") never match fuzzily: a different number is a different product.
+    """
+    if any(ch.isdigit() for ch in tok):
+        return []
+    return [(word, difflib.SequenceMatcher(None, tok, word).ratio())
+            for word in difflib.get_close_matches(tok, vocabulary, n=n, cutoff=FUZZY_CUTOFF) if _one_edit(tok, word)]
+
+class MaterialCatalogue:
+    """
+    Columnar catalogue: one NumPy array per field (row i = one listing).
+    Categories, units, suppliers and locations are dictionary-encoded (codes + labels).
+    """
+
+    def __init__(self, records):
+        n = len(records)
+        self.size = n
+        self.sku = np.array([r.get("objectID", str(i)) for i, r in enumerate(records)], dtype=object)
+        self.name = np.array([r.get("name", "") for r in records], dtype=object)
+        self.price = np.array([float(r.get("price") or 0) for r in records], dtype=np.float64)
+        geo = [r.get("_geoloc") or {} for r in records]
+        self.lat = np.array([g.get("lat", np.nan) for g in geo], dtype=np.float64)
+        self.lng = np.array([g.get("lng", np.nan) for g in geo], dtype=np.float64)
+        self.category_codes, self.categories = self._encode([r.get("category", "") for r in records])
+        self.unit_codes, self.units = self._encode([r.get("unit", "") for r in records])
+        self.supplier_codes, self.suppliers = self._encode([r.get("supplier", "") for r in records])
+        self.location_codes, self.locations = self._encode([r.get("location", "") for r in records])
+        self.row_of_sku = {sku: i for i, sku in enumerate(self.sku)}
+
+        # Inverted indexes: token -> sorted row ids, category (lowercase) -> row ids
+        postings = {}
+        for i, name in enumerate(self.name):
+            for tok in set(tokenize(name)):
+                postings.setdefault(tok, []).append(i)
+        self.postings = {tok: np.array(rows, dtype=np.int32) for tok, rows in postings.items()}
+        self.vocabulary = sorted(self.postings)
+        self.idf = {tok: np.log(1 + n / len(rows)) for tok, rows in self.postings.items()}
+        self.category_rows = {label.lower(): np.flatnonzero(self.category_codes == code).astype(np.int32)
+                              for code, label in enumerate(self.categories)}
+        self._fuzzy_memo = {}
+
+    @staticmethod
+    def _encode(values):
+        labels, codes = np.unique(np.array(values, dtype=object).astype(str), return_inverse=True)
+        return codes.astype(np.int32), labels.tolist()
+
+    @classmethod
+    def from_json(cls, path=CATALOGUE_FILE):
+        """JSON array, or NDJSON (.ndjson/.jsonl, one listing per line) from the dataset generator."""
+        with open(path, encoding="utf-8") as f:
+            if path.lower().endswith((".ndjson", ".jsonl")):
+                return cls([json.loads(line) for line in f if line.strip()])
+            return cls(json.load(f))
+
+    # ==========================================
+    # 🔎 LOOKUPS
+    # ==========================================
+
+    def row(self, i):
+        """Listing i as a dict (same keys as the JSON file)."""
+        return {
+            "objectID": self.sku[i], "name": self.name[i], "category": self.categories[self.category_codes[i]],
+            "price": float(self.price[i]), "unit": self.units[self.unit_codes[i]],
+            "supplier": self.suppliers[self.supplier_codes[i]], "location": self.locations[self.location_codes[i]],
+            "_geoloc": {"lat": float(self.lat[i]), "lng": float(self.lng[i])},
+        }
+
+    def by_sku(self, sku):
+        i = self.row_of_sku.get(sku)
+        return None if i is None else self.row(i)
+
+    def in_category(self, category):
+        return self.category_rows.get(category.lower(), np.empty(0, dtype=np.int32))
+
+    def _expand(self, tok):
+        """[(word, weight)]: the exact token at full weight, else typo matches weighted by their ratio (memoised)."""
+        if tok in self.postings:
+            return [(tok, 1.0)]
+        if tok not in self._fuzzy_memo:
+            self._fuzzy_memo[tok] = close_matches(tok, self.vocabulary)
+        return self._fuzzy_memo[tok]
+
+    def _score(self, query, category=None):
+        """Raw IDF-weighted overlap per row, plus the query's total weight."""
+        tokens = tokenize(query)
+        scores = np.zeros(self.size, dtype=np.float64)
+        total = 0.0
+        for tok in tokens:
+            matches = self._expand(tok)
+            cat_rows = next((self.category_rows[t] for t in [tok] + [m for m, _ in matches] if t in self.category_rows), None)
+            if matches:
+                # The query word counts in full; a typo match only earns its ratio of it
+                total += max(self.idf[m] for m, _ in matches)
+                for m, weight in matches:
+                    scores[self.postings[m]] += weight * self.idf[m]
+            elif cat_rows is None:
+                total += np.log(1 + self.size)  # Unknown word: counts against every row
+            if cat_rows is not None:
+                # Naming the category ("Cement", "Roofing") favours its listings over
+                # items that only mention the word ("POP Cement" is Roofing).
+                cat_idf = np.log(1 + self.size / max(len(cat_rows), 1))
+                if not matches:
+                    total += cat_idf
+                    scores[cat_rows] += cat_idf
+                else:
+                    scores[cat_rows] += 0.5 * cat_idf
+        if category:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self.in_category(category)] = True
+            scores[~mask] = 0.0
+        return scores, total
+
+    def _ranked(self, query, category=None, limit=5):
+        if not self.size or not tokenize(query):
+            return [], 0.0
+        scores, total = self._score(query, category)
+        hits = np.flatnonzero(scores)
+        top = hits[np.lexsort((self.price[hits], -scores[hits]))][:limit]
+        return [(int(i), float(scores[i])) for i in top], total
+
+    def search(self, query, category=None, limit=5):
+        """
+        Ranks listings by IDF-weighted token overlap with `query`.
+        Returns [(row, score)] best first; score is the matched share of the query (0-1).
+        """
+        ranked, total = self._ranked(query, category, limit)
+        return [(i, float(min(raw / total, 1.0))) for i, raw in ranked]
+
+    def resolve(self, item_name, category=None, min_score=0.5):
+        """BOQ item name -> best matching listing dict (with 'score'), or None."""
+        results = self.search(item_name, category=category, limit=1)
+        if not results or results[0][1] < min_score:
+            return None
+        i, score = results[0]
+        return dict(self.row(i), score=round(float(score), 3))
+
+    def matching_rows(self, query, min_score=0.5):
+        """Every listing matching at least `min_score` of the query (e.g. all cement listings)."""
+        if not self.size or not tokenize(query):
+            return np.empty(0, dtype=np.int64)
+        scores, total = self._score(query)
+        return np.flatnonzero(scores >= max(min_score * total, 1e-9))
+
+    def best_rows(self, query, min_score=0.5):
+        """The equally best-matching listings for a query (empty if nothing matches well enough)."""
+        if not self.size or not tokenize(query):
+            return np.empty(0, dtype=np.int64)
+        scores, total = self._score(query)
+        best = scores.max()
+        if best <= 0 or best / total < min_score:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(scores >= best - 1e-9)
+
+    def market_price(self, item_name, min_score=0.5):
+        """
+        Offline price for a BOQ item: median over the equally best-matching listings
+        (e.g. the three cement brands for "Cement"). Returns (price, label) or (0, item_name).
+        """
+        rows = self.best_rows(item_name, min_score)
+        if not len(rows):
+            return 0, item_name
+        if len(rows) == 1:
+            return float(self.price[rows[0]]), self.name[rows[0]]
+        category = self.categories[self.category_codes[rows[0]]]
+        return float(np.median(self.price[rows])), f"{category} ({len(rows)} listings)"
+
+# ==========================================
+# 📦 SHARED INSTANCE
+# ==========================================
+
+_instance = None
+_lock = threading.Lock()
+
+def get_catalogue():
+    """Process-wide catalogue, parsed on first use. None if the dataset file is missing."""
+    global _instance
+    if _instance is None:
+        with _lock:
+            if _instance is None:
+                try:
+                    _instance = MaterialCatalogue.from_json(CATALOGUE_FILE)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Catalogue unavailable: {e}")
+                    _instance = MaterialCatalogue([])
+    return _instance if _instance.size else None
+
+# ==========================================
+# 🏷️ MATERIAL NORMALIZATION
+# ==========================================
+
+# Trade words in supplier stock lists and BOQs that no listing name carries ("Paint", "Roofing Sheets")
+CATEGORY_KEYWORDS = {
+    "aggregate": "Aggregates", "sand": "Aggregates", "granite": "Aggregates", "gravel": "Aggregates", "laterite": "Aggregates",
+    "block": "Blocks", "brick": "Blocks", "cement": "Cement",
+    "steel": "Steel", "iron": "Steel", "rod": "Steel", "rebar": "Steel",
+    "roofing": "Roofing", "roof": "Roofing", "ceiling": "Roofing",
+    "finishing": "Finishing", "tile": "Finishing", "paint": "Finishing",
+    "plumbing": "Plumbing", "pipe": "Plumbing", "sanitary": "Plumbing",
+    "electrical": "Electrical", "cable": "Electrical", "wire": "Electrical",
+}
+
+# Trade phrases whose words would land in the wrong category one at a time (binding wire ties rebar)
+CATEGORY_PHRASES = {"binding wire": "Steel"}
+
+_normalized = {}
+
+def normalize_material(name):
+    """
+    Stock-list / BOQ name -> (material key, catalogue category or None), memoised.
+    'Iron Rods (12mm)' -> ('iron rod 12mm', 'Steel'). The category is the catalogue's own
+    (a category name, else the best-matching listing's), then CATEGORY_PHRASES and
+    CATEGORY_KEYWORDS; None for things no supplier stocks (labour, preliminaries).
+    """
+    tokens = tokenize(name)
+    key = " ".join(tokens)
+    if key not in _normalized:
+        category = None
+        catalogue = get_catalogue()
+        if catalogue is not None:
+            labels = {label.lower(): label for label in catalogue.categories}
+            category = labels.get(str(name).strip().lower())
+            if category is None and tokens:
+                listing = catalogue.resolve(name)
+                category = listing["category"] if listing else None
+        if category is None:
+            category = next((c for phrase, c in CATEGORY_PHRASES.items() if f" {phrase} " in f" {key} "), None)
+        if category is None:
+            category = next((CATEGORY_KEYWORDS[t] for t in tokens if t in CATEGORY_KEYWORDS), None)
+        _normalized[key] = category
+    return key, _normalized[key]
@@ -0,0 +1,33 @@
+### (Lazily created SDK clients. Heavy packages (groq, google-generativeai,
+### algoliasearch) are only imported the first time a feature needs them, and the
+### clients are cached as Streamlit resources so every session shares one instance.)
+
+import streamlit as st
+
+from logic.upstreams import upstream_override, upstream_url
+
+@st.cache_resource(show_spinner=False)
+def get_groq_client(api_key):
+    from groq import Groq
+    return Groq(api_key=api_key, base_url=upstream_url("groq"))
+
+@st.cache_resource(show_spinner=False)
+def get_genai(api_key):
+    """Returns the configured google.generativeai module."""
+    import google.generativeai as genai
+    endpoint = upstream_override("gemini")
+    if endpoint:
+        # Stand-in servers speak plain HTTP/JSON, not gRPC
+        genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+    else:
+        genai.configure(api_key=api_key)
+    return genai
+
+@st.cache_resource(show_spinner=False)
+def get_algolia_client(app_id, api_key):
+    # algoliasearch 2.x still uses the removed asyncio.coroutine decorator
+    import asyncio
+    if not hasattr(asyncio, 'coroutine'):
+        asyncio.coroutine = lambda x: x
+    from algoliasearch.search_client import SearchClient
+    return SearchClient.create(app_id, api_key)
@@ -1,6 +1,10 @@
 import requests
 import streamlit as st
 from logic.db_manager import get_db_suppliers 
+from logic.catalogue import get_catalogue
+from logic.upstreams import upstream_url
+from logic.geo_index import haversine_km, logistics_uplift, site_coordinates, nearest_stockist, nearest_suppliers
+from logic.tracing import traced
 
 # ========================================================
 # 1️⃣ STATIC MOCK DATABASE (Default Suppliers)
@@ -42,14 +46,35 @@ FALLBACK_PRICES = {
 # ========================================================
 # 3️⃣ HELPER FUNCTIONS (Hybrid Logic)
 # ========================================================
-def get_suppliers_for_location(location):
-    """Returns combined list of Static and Registered Suppliers."""
+def apply_logistics(base_price, item_name, location, origin=None):
+    """Adds haulage from the supplier (`origin` lat/lng) to the site, priced by distance."""
+    logistics_note = ""
+    price = base_price
+    site = site_coordinates(location)
+    if site and origin:
+        distance = float(haversine_km(origin[0], origin[1], site[0], site[1]))
+        uplift = logistics_uplift(distance)
+        if uplift > 0:
+            price = base_price * (1 + uplift)
+            logistics_note = f" (Inc. {uplift:.0%} Logistics, {distance:.0f} km)"
+        
+    price = round(price / 100) * 100
+    return price, f"{item_name}{logistics_note}"
+
+def get_suppliers_for_location(location, material=None):
+    """Returns combined list of Static, Nearby Catalogue and Registered Suppliers."""
     
     # 1. Start with Static Suppliers
     # Use .get() with a default empty list to prevent crashes if location matches nothing
     suppliers = STATIC_SUPPLIERS.get(location, []).copy()
     
-    # 2. Add Live Registered Suppliers from DB
+    # 2. Catalogue depots near the site (markup = distance-based logistics)
+    known = {s["name"] for s in suppliers}
+    for sup in nearest_suppliers(location, material=material):
+        if sup["name"] not in known:
+            suppliers.append(dict(sup, rating="⭐⭐⭐⭐"))
+    
+    # 3. Add Live Registered Suppliers from DB
     try:
         db_suppliers = get_db_suppliers(location)
         if db_suppliers:
@@ -60,11 +85,13 @@ def get_suppliers_for_location(location):
         
     return suppliers
 
+@traced("pricing.get_live_price")
 def get_live_price(query, location):
     """
     Hybrid Fetcher:
     1. Tries Algolia API first (Real Data).
-    2. If API fails, looks up FALLBACK_PRICES (Hardcoded Data).
+    2. If API fails, resolves the item in the local catalogue (Dataset JSON).
+    3. Last resort: FALLBACK_PRICES (Hardcoded Data).
     """
     price = 0
     name_desc = query
@@ -76,7 +103,7 @@ def get_live_price(query, location):
             API_KEY = st.secrets["ALGOLIA_API_KEY"]
             INDEX_NAME = st.secrets.get("ALGOLIA_INDEX_NAME", "construction_materials")
             
-            url = f"https://{APP_ID}-dsn.algolia.net/1/indexes/{INDEX_NAME}/query"
+            url = f"{upstream_url('algolia', app_id=APP_ID)}/1/indexes/{INDEX_NAME}/query"
             headers = {
                 "X-Algolia-Application-Id": APP_ID,
                 "X-Algolia-API-Key": API_KEY,
@@ -96,26 +123,23 @@ def get_live_price(query, location):
                     best_match = data['hits'][0]
                     base_price = best_match.get('price', 0)
                     item_name = best_match.get('name', query)
+                    geo = best_match.get('_geoloc') or {}
+                    origin = (geo['lat'], geo['lng']) if 'lat' in geo and 'lng' in geo else nearest_stockist(query, location)
                     
-                    # Apply Logistics Logic
-                    logistics_note = ""
-                    if "Lekki" in location or "Lagos" in location:
-                        price = base_price * 1.15
-                        logistics_note = " (Inc. 15% Transport)"
-                    elif "Abuja" in location:
-                        price = base_price * 1.25
-                        logistics_note = " (Inc. 25% Logistics)"
-                    else:
-                        price = base_price
-                        
-                    price = round(price / 100) * 100
-                    name_desc = f"{item_name}{logistics_note}"
-                    return price, name_desc
+                    # Apply Logistics Logic (distance from the supplier to site)
+                    return apply_logistics(base_price, item_name, location, origin)
     except Exception:
         # Silently fail to fallback if internet/API is down
         pass
 
-    # --- METHOD B: FALLBACK TO DICTIONARY ---
+    # --- METHOD B: LOCAL CATALOGUE (Offline, full dataset) ---
+    catalogue = get_catalogue()
+    if catalogue is not None:
+        base_price, item_name = catalogue.market_price(query)
+        if base_price > 0:
+            return apply_logistics(base_price, item_name, location, nearest_stockist(query, location))
+
+    # --- METHOD C: FALLBACK TO DICTIONARY ---
     if price == 0:
         loc_data = FALLBACK_PRICES.get(location, FALLBACK_PRICES["Lekki, Lagos"])
         
@@ -1,45 +1,124 @@
-# --- COMPATIBILITY PATCH (Fixes asyncio error on Python 3.10+) ---
-import asyncio
-if not hasattr(asyncio, 'coroutine'):
-    asyncio.coroutine = lambda x: x
-# -----------------------------------------------------------------
-
-import sqlite3
 import pandas as pd
 import json
 from datetime import datetime
 from io import StringIO
 import streamlit as st
 
-# --- ALGOLIA INTEGRATION ---
-# Now it is safe to import because we patched asyncio
-from algoliasearch.search_client import SearchClient
-
-ALGOLIA_READY = False
-try:
-    if "ALGOLIA_APP_ID" in st.secrets and "ALGOLIA_API_KEY" in st.secrets:
-        client = SearchClient.create(st.secrets["ALGOLIA_APP_ID"], st.secrets["ALGOLIA_API_KEY"])
-        index_suppliers = client.init_index("sitemate_suppliers")
-        index_projects = client.init_index("sitemate_projects")
-        
-        # Configure settings for better relevance
-        index_suppliers.set_settings({'searchableAttributes': ['company_name', 'materials', 'location']})
-        index_projects.set_settings({'searchableAttributes': ['name', 'location', 'materials_needed']})
-        
-        ALGOLIA_READY = True
-        print("✅ Algolia Connected Successfully")
-    else:
+from logic.query_cache import cached_query, invalidate, set_context, set_max_age
+from logic.storage import get_backend
+from logic.read_replica import get_replica
+from logic.clients import get_algolia_client
+from logic.catalogue import CATEGORY_PHRASES, normalize_material
+from logic.geo_index import site_coordinates
+
+# --- ALGOLIA INTEGRATION (LAZY) ---
+# The search client is created on first use and shared across sessions.
+# Index settings are NOT pushed on import; run once per deploy:
+#   python -m logic.bootstrap --deploy
+SUPPLIER_INDEX = "sitemate_suppliers"
+PROJECT_INDEX = "sitemate_projects"
+SEARCH_SETTINGS = {
+    SUPPLIER_INDEX: {'searchableAttributes': ['company_name', 'materials', 'location']},
+    PROJECT_INDEX: {'searchableAttributes': ['name', 'location', 'materials_needed']},
+}
+
+# Search backend state. "unchecked" (scripts/CLI) connects on first use; the app's
+# bootstrap moves it through "connecting" -> "ok" / "degraded" / "disabled", and
+# until it is "ok" every search falls back to SQLite without touching the network.
+_search_status = {"state": "unchecked", "detail": ""}
+
+def set_search_status(state, detail=""):
+    _search_status.update(state=state, detail=detail)
+
+def get_search_status():
+    return dict(_search_status)
+
+def _search_credentials():
+    try:
+        if "ALGOLIA_APP_ID" in st.secrets and "ALGOLIA_API_KEY" in st.secrets:
+            return st.secrets["ALGOLIA_APP_ID"], st.secrets["ALGOLIA_API_KEY"]
+    except Exception:
+        pass  # No secrets.toml at all
+    return None
+
+def _search_index(name):
+    """Returns an Algolia index, or None when search is unavailable (callers fall back to SQLite)."""
+    if _search_status["state"] not in ("unchecked", "ok"):
+        return None
+    credentials = _search_credentials()
+    if credentials is None:
+        set_search_status("disabled", "Algolia keys not found in secrets.toml")
         print("⚠️ Algolia keys not found in secrets.toml")
-except Exception as e:
-    print(f"⚠️ Algolia Connection Error: {e}")
-    # We do NOT stop the app here. We let it run on SQLite fallback.
+        return None
+    try:
+        return get_algolia_client(*credentials).init_index(name)
+    except Exception as e:
+        set_search_status("degraded", str(e))
+        print(f"⚠️ Algolia Connection Error: {e}")
+        return None
+
+def check_search_backend():
+    """One network round-trip to Algolia. Returns (state, detail) for set_search_status()."""
+    credentials = _search_credentials()
+    if credentials is None:
+        return "disabled", "Algolia keys not found in secrets.toml"
+    try:
+        get_algolia_client(*credentials).list_indices()
+        return "ok", ""
+    except Exception as e:
+        return "degraded", str(e)
+
+def configure_search_indexes():
+    """Deploy-time step: pushes SEARCH_SETTINGS to both indexes."""
+    for name, settings in SEARCH_SETTINGS.items():
+        index = _search_index(name)
+        if index is None:
+            return False
+        index.set_settings(settings)
+    print("✅ Algolia index settings applied")
+    return True
 
-# --- SQLITE CONFIG ---
+# --- STORAGE CONFIG ---
+# SQLite file by default; SITEMATE_DATABASE_URL switches to PostgreSQL (see logic/storage.py)
 DB_FILE = "sitemate_projects.db"
+BUSY_TIMEOUT = 30      # Seconds a SQLite writer waits for the lock instead of failing with 'database is locked'
+SNAPSHOT_EVERY = 200   # Inventory ledger rows between balance snapshots
+# Every change-log writer also takes this lock, so event ids commit in id order and a reader's
+# "id > cursor" never skips one (PostgreSQL sequences don't promise that; SQLite has one writer anyway).
+EVENTS_LOCK = "events"
+
+def _backend():
+    return get_backend(DB_FILE)
+
+def _connect(named_rows=False, snapshot=False):
+    """
+    Connection from the configured backend. named_rows=True: rows are also addressable by column name.
+    snapshot=True: read-only connection to the dashboard snapshot (up to read_replica.MAX_STALENESS
+    seconds behind, never blocks writers); the primary when there is no snapshot.
+    """
+    replica = get_replica(_backend()) if snapshot else None
+    if replica is not None:
+        return replica.connect(named_rows)
+    return _backend().connect(named_rows)
+
+def _snapshot_version():
+    """Cache version for snapshot reads: a cached result lives no longer than the copy it was read from."""
+    replica = get_replica(_backend())
+    return replica.version() if replica is not None else None
+
+def snapshot_as_of():
+    """Wall-clock time (HH:MM:SS) the dashboard snapshot reflects, or None when reads hit the primary."""
+    replica = get_replica(_backend())
+    return replica.stats()["as_of"] if replica is not None else None
+
+# Cached reads are keyed per database (benchmarks / batch export repoint DB_FILE)
+set_context(lambda: _backend().cache_key)
+set_max_age(lambda: _backend().cache_max_age)
 
 def init_db():
     """Initializes the database with all 8 tables."""
-    conn = sqlite3.connect(DB_FILE)
+    backend = _backend()
+    conn = _connect()
     c = conn.cursor()
     
     tables = [
@@ -47,20 +126,167 @@ def init_db():
         '''CREATE TABLE IF NOT EXISTS suppliers (id INTEGER PRIMARY KEY AUTOINCREMENT, company_name TEXT, location TEXT, phone TEXT, email TEXT, materials TEXT, rating REAL DEFAULT 5.0, timestamp TEXT)''',
         '''CREATE TABLE IF NOT EXISTS bids (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, supplier_name TEXT, amount REAL, phone TEXT, status TEXT DEFAULT 'Pending', timestamp TEXT)''',
         '''CREATE TABLE IF NOT EXISTS expenses (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, item_name TEXT, amount REAL, category TEXT, date TEXT, note TEXT)''',
-        '''CREATE TABLE IF NOT EXISTS inventory (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, item_name TEXT, quantity REAL, unit TEXT, last_updated TEXT)''',
+        '''CREATE TABLE IF NOT EXISTS inventory (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, item_name TEXT, quantity REAL CHECK (quantity >= 0), unit TEXT, last_updated TEXT)''',
         '''CREATE TABLE IF NOT EXISTS inventory_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, item_name TEXT, change_qty REAL, unit TEXT, operation TEXT, date TEXT, timestamp TEXT)''',
         '''CREATE TABLE IF NOT EXISTS site_photos (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, image_path TEXT, caption TEXT, timestamp TEXT)''',
         '''CREATE TABLE IF NOT EXISTS site_diary (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, date TEXT, weather TEXT, labor_count TEXT, work_done TEXT, issues TEXT, timestamp TEXT)'''
     ]
     
     for query in tables:
+        c.execute(backend.ddl(query))
+    
+    # Inventory ledger: one balance row per item, guarded against going negative
+    # (on SQLite a trigger covers databases created before the CHECK constraint existed),
+    # plus periodic balance snapshots so as-of-date queries never scan the full log.
+    ledger = [
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_item ON inventory (project_name, item_name)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_logs_item ON inventory_logs (project_name, item_name, id)",
+        '''CREATE TABLE IF NOT EXISTS inventory_snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, item_name TEXT, log_id INTEGER, as_of_date TEXT, quantity REAL)''',
+        "CREATE INDEX IF NOT EXISTS idx_inventory_snapshots_item ON inventory_snapshots (project_name, item_name, log_id)",
+    ]
+    for query in ledger:
+        c.execute(backend.ddl(query))
+    if backend.name == "sqlite":
+        c.execute("""CREATE TRIGGER IF NOT EXISTS trg_inventory_non_negative BEFORE UPDATE OF quantity ON inventory
+                     WHEN NEW.quantity < 0 BEGIN SELECT RAISE(ABORT, 'Insufficient Stock!'); END""")
+    
+    # BOQ variance (logic/variance_engine.py): ledger/expense names matched to BOQ items, and
+    # per-day consumption folded in incrementally from the last ledger / expense id seen.
+    variance = [
+        '''CREATE TABLE IF NOT EXISTS item_mappings (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, source TEXT, raw_name TEXT, boq_item TEXT, score REAL, manual INTEGER DEFAULT 0)''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_item_mappings ON item_mappings (project_name, source, raw_name)",
+        '''CREATE TABLE IF NOT EXISTS variance_daily (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, boq_item TEXT, date TEXT, used_qty REAL DEFAULT 0, delivered_qty REAL DEFAULT 0, spent REAL DEFAULT 0)''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_variance_daily ON variance_daily (project_name, boq_item, date)",
+        '''CREATE TABLE IF NOT EXISTS variance_state (project_name TEXT PRIMARY KEY, boq_hash TEXT, last_log_id INTEGER DEFAULT 0, last_expense_id INTEGER DEFAULT 0)''',
+    ]
+    for query in variance:
+        c.execute(backend.ddl(query))
+    
+    # Earned value (logic/evm_engine.py): baseline phases with their current % complete, the
+    # progress entries that moved them, and running EV / AC totals per project.
+    evm = [
+        '''CREATE TABLE IF NOT EXISTS evm_baseline (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, seq INTEGER, phase TEXT, start_date TEXT, end_date TEXT, budget REAL, pct_complete REAL DEFAULT 0)''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_evm_baseline ON evm_baseline (project_name, phase)",
+        '''CREATE TABLE IF NOT EXISTS evm_progress (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, date TEXT, phase TEXT, pct REAL, source TEXT, note TEXT, timestamp TEXT)''',
+        "CREATE INDEX IF NOT EXISTS idx_evm_progress ON evm_progress (project_name, id)",
+        '''CREATE TABLE IF NOT EXISTS evm_state (project_name TEXT PRIMARY KEY, bac REAL, ev REAL DEFAULT 0, ac REAL DEFAULT 0, last_expense_id INTEGER DEFAULT 0, baselined_at TEXT)''',
+        "CREATE INDEX IF NOT EXISTS idx_expenses_cursor ON expenses (project_name, id)",
+    ]
+    for query in evm:
+        c.execute(backend.ddl(query))
+    
+    # Tendering (logic/bid_engine.py): optional close time / sealed flag per project, bid ranking
+    # reads one project's bids with each supplier's rating looked up by name.
+    if not backend.has_column(conn, "bids", "delivery_days"):
+        c.execute("ALTER TABLE bids ADD COLUMN delivery_days INTEGER")
+    tendering = [
+        '''CREATE TABLE IF NOT EXISTS tenders (project_name TEXT PRIMARY KEY, closes_at TEXT, sealed INTEGER DEFAULT 0, timestamp TEXT)''',
+        "CREATE INDEX IF NOT EXISTS idx_bids_project ON bids (project_name, status, amount)",
+        "CREATE INDEX IF NOT EXISTS idx_suppliers_name ON suppliers (company_name)",
+    ]
+    for query in tendering:
+        c.execute(backend.ddl(query))
+    # One accepted bid per project, enforced by the database too (skipped while older data still has doubles)
+    c.execute("SELECT 1 FROM bids WHERE status = 'Accepted' GROUP BY project_name HAVING COUNT(*) > 1 LIMIT 1")
+    if c.fetchone() is None:
+        c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_bids_single_award ON bids (project_name) WHERE status = 'Accepted'")
+    
+    # Supplier matching (logic/supplier_matching.py): one row per supplier x stocked material with its
+    # catalogue category, supplier base coordinates, and each supplier's new-tender inbox.
+    for column in ["lat", "lng"]:
+        if not backend.has_column(conn, "suppliers", column):
+            c.execute(f"ALTER TABLE suppliers ADD COLUMN {column} REAL")
+    matching = [
+        '''CREATE TABLE IF NOT EXISTS supplier_materials (supplier_id INTEGER, material TEXT, category TEXT, PRIMARY KEY (supplier_id, material))''',
+        "CREATE INDEX IF NOT EXISTS idx_supplier_materials_category ON supplier_materials (category, supplier_id)",
+        "CREATE INDEX IF NOT EXISTS idx_supplier_materials_material ON supplier_materials (material, supplier_id)",
+        '''CREATE TABLE IF NOT EXISTS tender_notifications (id INTEGER PRIMARY KEY AUTOINCREMENT, supplier_id INTEGER, project_name TEXT, score REAL, coverage REAL, distance_km REAL, created_at TEXT, read_at TEXT)''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_tender_notifications ON tender_notifications (supplier_id, project_name)",
+        "CREATE INDEX IF NOT EXISTS idx_tender_notifications_project ON tender_notifications (project_name)",
+    ]
+    for query in matching:
+        c.execute(backend.ddl(query))
+    index_supplier_materials(conn)  # Suppliers registered before the junction table existed
+    for phrase, category in CATEGORY_PHRASES.items():  # Rows indexed before the phrase was known
+        c.execute("UPDATE supplier_materials SET category = ? WHERE material = ? AND (category IS NULL OR category <> ?)", (category, phrase, category))
+
+    # Change log (logic/event_feed.py): tenders saved, bids placed and bid status changes, written in
+    # the same transaction as the change; live feeds read the rows past their last event id.
+    events = [
+        '''CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, project_name TEXT, supplier_name TEXT, payload TEXT, created_at TEXT)''',
+        "CREATE INDEX IF NOT EXISTS idx_events_project ON events (project_name, id)",
+    ]
+    for query in events:
+        c.execute(backend.ddl(query))
+
+    # Keyset pagination indexes (newest-first per project / supplier)
+    page_indexes = [
+        "CREATE INDEX IF NOT EXISTS idx_expenses_page ON expenses (project_name, date, id)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_logs_page ON inventory_logs (project_name, date, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_site_diary_page ON site_diary (project_name, date, id)",
+        "CREATE INDEX IF NOT EXISTS idx_site_photos_page ON site_photos (project_name, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_bids_supplier_page ON bids (supplier_name, timestamp, id)",
+    ]
+    for query in page_indexes:
         c.execute(query)
     
+    # Planned budget is stored alongside the BOQ so KPIs don't have to parse boq_json.
+    # Older rows are backfilled from the JSON once (DataFrame.to_json layout: {"Total Cost": {"0": ...}}).
+    if not backend.has_column(conn, "projects", "planned_total"):
+        c.execute(backend.ddl("ALTER TABLE projects ADD COLUMN planned_total REAL"))
+    if backend.name == "sqlite":
+        c.execute("""UPDATE projects SET planned_total = (SELECT TOTAL(value) FROM json_each(boq_json, '$."Total Cost"'))
+                     WHERE planned_total IS NULL AND json_valid(boq_json)""")
+    
     conn.commit()
     conn.close()
 
-# Ensure DB is initialized
-init_db()
+
+# ==========================================
+# 📡 CHANGE LOG
+# ==========================================
+
+def _log_event(c, kind, project_name, supplier_name=None, **payload):
+    """Appends a change-log row inside the caller's transaction (which holds EVENTS_LOCK). Returns its id."""
+    c.execute("INSERT INTO events (kind, project_name, supplier_name, payload, created_at) VALUES (?, ?, ?, ?, ?) RETURNING id",
+              (kind, project_name, supplier_name, json.dumps(payload), datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    return c.fetchone()[0]
+
+def _publish(event_id):
+    from logic.event_feed import publish  # event_feed reads through this module
+    publish(event_id)
+
+def get_latest_event_id():
+    """Newest change-log id (0 when empty). Reads the primary key's last entry only."""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute("SELECT MAX(id) FROM events")
+    row = c.fetchone()
+    conn.close()
+    return int(row[0] or 0)
+
+def get_events_since(after_id, up_to_id, project_name=None, supplier_name=None, limit=200):
+    """
+    Change-log rows with after_id < id <= up_to_id, oldest first, payload decoded:
+    a project's bids and award (project_name), or a supplier's feed (supplier_name: every saved
+    tender, status changes on its own bids and awards of tenders it bid on), or everything.
+    """
+    where, params = ["id > ?", "id <= ?"], [after_id, up_to_id]
+    if project_name is not None:
+        where.append("project_name = ? AND kind IN ('bid', 'award')")
+        params.append(project_name)
+    if supplier_name is not None:
+        where.append("""(kind = 'tender' OR (kind = 'bid_status' AND supplier_name = ?)
+                         OR (kind = 'award' AND project_name IN (SELECT project_name FROM bids WHERE supplier_name = ?)))""")
+        params += [supplier_name, supplier_name]
+    conn = _connect()
+    c = conn.cursor()
+    c.execute(f"SELECT id, kind, project_name, supplier_name, payload, created_at FROM events WHERE {' AND '.join(where)} ORDER BY id LIMIT ?",
+              params + [limit])
+    rows = c.fetchall()
+    conn.close()
+    return [{"id": r[0], "kind": r[1], "project_name": r[2], "supplier_name": r[3], "created_at": r[5], **json.loads(r[4] or "{}")}
+            for r in rows]
 
 # ==========================================
 # 🏗️ PROJECT FUNCTIONS (HYBRID)
@@ -68,16 +294,25 @@ init_db()
 
 def save_project(name, location, soil, boq_df):
     if boq_df is None or boq_df.empty: return False, "Cannot save empty project."
-    conn = sqlite3.connect(DB_FILE)
+    backend = _backend()
+    conn = _connect()
     c = conn.cursor()
     try:
-        # 1. SQLite Write (Source of Truth)
-        c.execute('INSERT OR REPLACE INTO projects (name, location, soil, boq_json, timestamp) VALUES (?, ?, ?, ?, ?)', 
-                  (name, location, soil, boq_df.to_json(), datetime.now().strftime("%Y-%m-%d %H:%M")))
+        # 1. SQLite Write (Source of Truth), logged as a tender event for live feeds
+        planned_total = float(boq_df['Total Cost'].sum()) if 'Total Cost' in boq_df.columns else 0.0
+        backend.begin_write(conn, EVENTS_LOCK)
+        c.execute('''INSERT INTO projects (name, location, soil, boq_json, timestamp, planned_total) VALUES (?, ?, ?, ?, ?, ?)
+                     ON CONFLICT (name) DO UPDATE SET location = excluded.location, soil = excluded.soil, boq_json = excluded.boq_json,
+                                                      timestamp = excluded.timestamp, planned_total = excluded.planned_total''',
+                  (name, location, soil, boq_df.to_json(), datetime.now().strftime("%Y-%m-%d %H:%M"), planned_total))
+        event_id = _log_event(c, "tender", name, location=location, est_value=planned_total, items=len(boq_df))
         conn.commit()
+        invalidate("projects", f"project:{name}")
+        _publish(event_id)
         
         # 2. Algolia Sync (Search Index)
-        if ALGOLIA_READY:
+        index_projects = _search_index(PROJECT_INDEX)
+        if index_projects is not None:
             try:
                 # Extract key data for searchability
                 total_val = float(boq_df['Total Cost'].sum())
@@ -104,14 +339,18 @@ def save_project(name, location, soil, boq_df):
     except Exception as e: return False, f"Error: {e}"
     finally: conn.close()
 
+@cached_query("projects")
 def get_all_projects():
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT name, timestamp FROM projects ORDER BY timestamp DESC")
-    return c.fetchall()
+    rows = c.fetchall()
+    conn.close()
+    return rows
 
+@cached_query("project:{name}")
 def load_project_data(name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT location, soil, boq_json FROM projects WHERE name=?", (name,))
     row = c.fetchone()
@@ -123,14 +362,18 @@ def load_project_data(name):
     return None, None, None
 
 def delete_project(name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("DELETE FROM projects WHERE name=?", (name,))
+    for table in ["variance_state", "variance_daily", "item_mappings", "evm_state", "evm_baseline", "evm_progress", "tenders", "tender_notifications"]:
+        c.execute(f"DELETE FROM {table} WHERE project_name = ?", (name,))
     conn.commit()
     conn.close()
+    invalidate("projects", f"project:{name}", "notifications")
     
     # Remove from Algolia too
-    if ALGOLIA_READY:
+    index_projects = _search_index(PROJECT_INDEX)
+    if index_projects is not None:
         try:
             index_projects.delete_object(name.replace(" ", "_"))
         except: pass
@@ -140,16 +383,22 @@ def delete_project(name):
 # ==========================================
 
 def register_supplier(name, location, phone, email, materials_list):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     try:
-        # 1. Save to SQLite
-        c.execute('INSERT INTO suppliers (company_name, location, phone, email, materials, timestamp) VALUES (?, ?, ?, ?, ?, ?)', 
-                  (name, location, phone, email, json.dumps(materials_list), datetime.now().strftime("%Y-%m-%d")))
+        # 1. Save to SQLite (stock list indexed by material / category for tender matching)
+        lat, lng = site_coordinates(location) or (None, None)
+        c.execute('INSERT INTO suppliers (company_name, location, phone, email, materials, timestamp, lat, lng) VALUES (?, ?, ?, ?, ?, ?, ?, ?) RETURNING id',
+                  (name, location, phone, email, json.dumps(materials_list), datetime.now().strftime("%Y-%m-%d"), lat, lng))
+        supplier_id = c.fetchone()[0]
+        c.executemany("INSERT INTO supplier_materials (supplier_id, material, category) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+                      _supplier_material_rows(supplier_id, materials_list))
         conn.commit()
+        invalidate("suppliers")
         
         # 2. Sync to Algolia
-        if ALGOLIA_READY:
+        index_suppliers = _search_index(SUPPLIER_INDEX)
+        if index_suppliers is not None:
             try:
                 record = {
                     "objectID": email, # Unique ID
@@ -170,12 +419,53 @@ def register_supplier(name, location, phone, email, materials_list):
     except: return False
     finally: conn.close()
 
+def _supplier_material_rows(supplier_id, materials_list):
+    """(supplier_id, material key, category) per distinct stocked material."""
+    rows = {}
+    for material in materials_list or []:
+        key, category = normalize_material(material)
+        if key:
+            rows.setdefault(key, (supplier_id, key, category))
+    return list(rows.values())
+
+def index_supplier_materials(conn):
+    """
+    Fills supplier_materials from the suppliers.materials JSON (and missing base coordinates from
+    the location name) for every supplier without junction rows yet: databases from before the
+    table existed, and bulk loads. Empty stock lists have nothing to index and are skipped, so
+    startup doesn't re-read them every time. Caller commits. Returns the number of suppliers looked at.
+    """
+    c = conn.cursor()
+    c.execute("""SELECT id, location, materials, lat FROM suppliers s
+                 WHERE COALESCE(materials, '[]') NOT IN ('[]', '')
+                   AND NOT EXISTS (SELECT 1 FROM supplier_materials m WHERE m.supplier_id = s.id)""")
+    pending = c.fetchall()
+    rows, coords = [], []
+    for supplier_id, location, materials, lat in pending:
+        try:
+            materials_list = json.loads(materials or "[]")
+        except ValueError:
+            materials_list = []
+        rows += _supplier_material_rows(supplier_id, materials_list if isinstance(materials_list, list) else [])
+        xy = site_coordinates(location) if lat is None else None
+        if xy is not None:
+            coords.append((xy[0], xy[1], supplier_id))
+    if rows:
+        _backend().bulk_insert(conn, "supplier_materials", ["supplier_id", "material", "category"], rows)
+    if coords:
+        c.executemany("UPDATE suppliers SET lat = ?, lng = ? WHERE id = ?", coords)
+    if rows or coords:
+        invalidate("suppliers")
+    return len(pending)
+
+@cached_query("suppliers")
 def get_db_suppliers(location):
     """Fetches suppliers. Uses Algolia if available, falls back to SQLite."""
     suppliers = []
     
     # A. TRY ALGOLIA FIRST (Fast, Typo-Tolerant)
-    if ALGOLIA_READY:
+    index_suppliers = _search_index(SUPPLIER_INDEX)
+    if index_suppliers is not None:
         try:
             # Algolia search
             res = index_suppliers.search(location) 
@@ -192,10 +482,9 @@ def get_db_suppliers(location):
             print("Algolia search failed, falling back to SQL.")
 
     # B. FALLBACK TO SQLITE (Reliable)
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
+    conn = _connect(named_rows=True)
     c = conn.cursor()
-    c.execute("SELECT * FROM suppliers WHERE location LIKE ?", (f"%{location}%",))
+    c.execute("SELECT * FROM suppliers WHERE LOWER(location) LIKE LOWER(?)", (f"%{location}%",))
     rows = c.fetchall()
     conn.close()
     
@@ -205,9 +494,10 @@ def get_db_suppliers(location):
     
     return suppliers
 
+@cached_query("suppliers")
 def get_all_supplier_names():
     """Fetches list of all registered suppliers for the dropdown."""
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT company_name FROM suppliers")
     rows = c.fetchall()
@@ -215,18 +505,57 @@ def get_all_supplier_names():
     return [r[0] for r in rows] if rows else ["Mubarak Cement (Demo)"]
 
 def update_bid_status(bid_id, new_status):
-    """Updates a bid to 'Accepted' or 'Rejected'."""
-    conn = sqlite3.connect(DB_FILE)
+    """
+    Updates a bid to 'Accepted' or 'Rejected'. Accepting awards the tender: in one transaction the
+    bid is accepted and every other pending bid on the project is rejected. Returns False (nothing
+    changed) if the bid isn't pending, the project already has an accepted bid, or its tender is
+    sealed and not yet closed.
+    """
+    backend = _backend()
+    conn = _connect()
     c = conn.cursor()
-    c.execute("UPDATE bids SET status = ? WHERE id = ?", (new_status, bid_id))
-    conn.commit()
-    conn.close()
+    try:
+        c.execute("SELECT project_name, supplier_name FROM bids WHERE id = ?", (bid_id,))
+        row = c.fetchone()
+        if row is None:
+            conn.rollback()
+            return False
+        project_name = row[0]
+        backend.begin_write(conn, (f"bids:{project_name}", EVENTS_LOCK))
+        c.execute("SELECT status FROM bids WHERE id = ?", (bid_id,))
+        if c.fetchone()[0] != "Pending":
+            conn.rollback()
+            return False
+        if new_status == "Accepted":
+            now = datetime.now().strftime("%Y-%m-%d %H:%M")
+            # Sealed only until closes_at: a NULL close time never blocks (same rule as bid_engine.tender_status)
+            c.execute("""SELECT 1 FROM bids WHERE project_name = ? AND status = 'Accepted'
+                         UNION ALL SELECT 1 FROM tenders WHERE project_name = ? AND sealed = 1 AND closes_at IS NOT NULL AND closes_at > ?""",
+                      (project_name, project_name, now))
+            if c.fetchone() is not None:
+                conn.rollback()
+                return False
+            c.execute("UPDATE bids SET status = CASE WHEN id = ? THEN 'Accepted' ELSE 'Rejected' END WHERE project_name = ? AND status = 'Pending'",
+                      (bid_id, project_name))
+            # One event for the whole award; each bidder's feed reads it as its own outcome
+            event_id = _log_event(c, "award", project_name, row[1], bid_id=bid_id)
+        else:
+            c.execute("UPDATE bids SET status = ? WHERE id = ?", (new_status, bid_id))
+            event_id = _log_event(c, "bid_status", project_name, row[1], bid_id=bid_id, status=new_status)
+        conn.commit()
+    except Exception:
+        if conn.in_transaction: conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate("bids", f"bids:{project_name}")
+    _publish(event_id)
     return True
 
+@cached_query("bids", "bids:supplier:{supplier_name}", scope="session")
 def get_supplier_bids(supplier_name):
     """Gets all bids made by a specific supplier to show them the status."""
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
+    conn = _connect(named_rows=True)
     c = conn.cursor()
     c.execute("SELECT * FROM bids WHERE supplier_name = ? ORDER BY timestamp DESC", (supplier_name,))
     rows = c.fetchall()
@@ -237,12 +566,14 @@ def get_supplier_bids(supplier_name):
 # 💰 BIDDING ENGINE (ALGOLIA POWERED)
 # ==========================================
 
+@cached_query("projects", version=_snapshot_version)
 def get_open_tenders(location_query):
     """Finds projects using Algolia for 'Job Board' search logic."""
     tenders = []
     
     # A. TRY ALGOLIA
-    if ALGOLIA_READY:
+    index_projects = _search_index(PROJECT_INDEX)
+    if index_projects is not None:
         try:
             res = index_projects.search(location_query)
             for hit in res['hits']:
@@ -256,10 +587,10 @@ def get_open_tenders(location_query):
         except:
             pass
 
-    # B. FALLBACK TO SQLITE
-    conn = sqlite3.connect(DB_FILE)
+    # B. FALLBACK TO SQLITE (job-board browsing is served from the snapshot)
+    conn = _connect(snapshot=True)
     c = conn.cursor()
-    c.execute("SELECT name, timestamp, boq_json FROM projects WHERE location LIKE ? ORDER BY timestamp DESC", (f"%{location_query}%",))
+    c.execute("SELECT name, timestamp, boq_json FROM projects WHERE LOWER(location) LIKE LOWER(?) ORDER BY timestamp DESC", (f"%{location_query}%",))
     rows = c.fetchall()
     conn.close()
     
@@ -273,93 +604,177 @@ def get_open_tenders(location_query):
             
     return tenders
 
-def submit_bid(project_name, supplier_name, amount, phone):
-    conn = sqlite3.connect(DB_FILE)
+def submit_bid(project_name, supplier_name, amount, phone, delivery_days=None):
+    """Places a bid. Returns False once the tender's close time has passed or a bid has been accepted."""
+    backend = _backend()
+    conn = _connect()
     c = conn.cursor()
     try:
-        c.execute("INSERT INTO bids (project_name, supplier_name, amount, phone, timestamp) VALUES (?, ?, ?, ?, ?)",
-                  (project_name, supplier_name, amount, phone, datetime.now().strftime("%Y-%m-%d %H:%M")))
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        # Same lock as update_bid_status, so no bid lands after the award
+        backend.begin_write(conn, (f"bids:{project_name}", EVENTS_LOCK))
+        c.execute("""SELECT 1 FROM tenders WHERE project_name = ? AND closes_at <= ?
+                     UNION ALL SELECT 1 FROM bids WHERE project_name = ? AND status = 'Accepted'""", (project_name, now, project_name))
+        if c.fetchone() is not None:
+            conn.rollback()
+            return False
+        c.execute("INSERT INTO bids (project_name, supplier_name, amount, phone, timestamp, delivery_days) VALUES (?, ?, ?, ?, ?, ?) RETURNING id",
+                  (project_name, supplier_name, amount, phone, now, delivery_days))
+        event_id = _log_event(c, "bid", project_name, supplier_name, bid_id=c.fetchone()[0], amount=float(amount), delivery_days=delivery_days)
         conn.commit()
+        invalidate(f"bids:{project_name}", f"bids:supplier:{supplier_name}")
+        _publish(event_id)
         return True
     except: return False
     finally: conn.close()
 
+@cached_query("bids", "bids:{project_name}")
 def get_bids_for_project(project_name):
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
+    conn = _connect(named_rows=True)
     c = conn.cursor()
     c.execute("SELECT * FROM bids WHERE project_name = ? ORDER BY amount ASC", (project_name,))
-    return c.fetchall()
+    rows = c.fetchall()
+    conn.close()
+    return rows
 
 # ==========================================
 # 🚧 EXECUTION (SQLITE ONLY - TRANSACTIONAL)
 # ==========================================
 
 def log_expense(project, item, amount, category, note):
-    conn = sqlite3.connect(DB_FILE)
+    backend = _backend()
+    conn = _connect()
     c = conn.cursor()
     try:
+        backend.begin_write(conn, f"expenses:{project}")  # Ids commit in order: variance_engine reads on from the last one
         c.execute("INSERT INTO expenses (project_name, item_name, amount, category, date, note) VALUES (?, ?, ?, ?, ?, ?)",
                   (project, item, amount, category, datetime.now().strftime("%Y-%m-%d"), note))
         conn.commit()
+        invalidate(f"expenses:{project}")
         return True
     except: return False
     finally: conn.close()
 
+@cached_query("expenses:{project_name}")
 def get_project_expenses(project_name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT * FROM expenses WHERE project_name = ?", (project_name,))
+    rows = c.fetchall()
+    conn.close()
     cols = ["id", "project", "item", "amount", "category", "date", "note"]
-    return pd.DataFrame(c.fetchall(), columns=cols)
+    return pd.DataFrame(rows, columns=cols)
+
+def _refresh_inventory_snapshots(c, project, item):
+    """Writes a balance snapshot every SNAPSHOT_EVERY ledger rows since the last one."""
+    c.execute("SELECT log_id, quantity FROM inventory_snapshots WHERE project_name = ? AND item_name = ? ORDER BY log_id DESC LIMIT 1", (project, item))
+    row = c.fetchone()
+    last_log_id, base_qty = row if row else (0, 0.0)
+    c.execute('''INSERT INTO inventory_snapshots (project_name, item_name, log_id, as_of_date, quantity)
+                 SELECT ?, ?, id, date, ? + running FROM (
+                     SELECT id, date,
+                            SUM(change_qty) OVER (ORDER BY id) AS running,
+                            ROW_NUMBER() OVER (ORDER BY id) AS rn
+                     FROM inventory_logs WHERE project_name = ? AND item_name = ? AND id > ?)
+                 WHERE rn % ? = 0''',
+              (project, item, base_qty, project, item, last_log_id, SNAPSHOT_EVERY))
 
 def update_inventory(project, item, quantity, unit, operation):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
+    """
+    Applies a stock movement atomically: the balance changes in-place
+    (quantity = quantity +/- ?) inside the backend's write transaction
+    (BEGIN IMMEDIATE on SQLite), so concurrent storekeepers can never lose
+    an update, and the ledger row is written in the same transaction.
+    """
     now_date = datetime.now().strftime("%Y-%m-%d")
     now_time = datetime.now().strftime("%H:%M")
+    if operation == 'add':
+        log_qty = quantity; op_label = "Stock IN"
+    elif operation == 'remove':
+        log_qty = -quantity; op_label = "Stock OUT"
+    else:
+        return False, f"Unknown operation: {operation}"
+    
+    backend = _backend()
+    conn = _connect()
+    c = conn.cursor()
     try:
-        c.execute("SELECT quantity FROM inventory WHERE project_name = ? AND item_name = ?", (project, item))
-        row = c.fetchone()
-        current_qty = row[0] if row else 0.0
-        
+        backend.begin_write(conn, f"inventory:{project}")
         if operation == 'add':
-            new_qty = current_qty + quantity
-            log_qty = quantity; op_label = "Stock IN"
-        elif operation == 'remove':
-            new_qty = current_qty - quantity
-            if new_qty < 0: return False, "Insufficient Stock!"
-            log_qty = -quantity; op_label = "Stock OUT"
-        
-        if row:
-            c.execute("UPDATE inventory SET quantity = ?, last_updated = ? WHERE project_name = ? AND item_name = ?", 
-                      (new_qty, now_date, project, item))
+            c.execute('''INSERT INTO inventory (project_name, item_name, quantity, unit, last_updated) VALUES (?, ?, ?, ?, ?)
+                         ON CONFLICT (project_name, item_name) DO UPDATE SET quantity = inventory.quantity + excluded.quantity, last_updated = excluded.last_updated
+                         RETURNING quantity''', (project, item, quantity, unit, now_date))
         else:
-            if operation == 'remove': return False, "Item not in inventory!"
-            c.execute("INSERT INTO inventory (project_name, item_name, quantity, unit, last_updated) VALUES (?, ?, ?, ?, ?)",
-                      (project, item, quantity, unit, now_date))
+            c.execute("UPDATE inventory SET quantity = quantity - ?, last_updated = ? WHERE project_name = ? AND item_name = ? RETURNING quantity",
+                      (quantity, now_date, project, item))
+        row = c.fetchone()
+        if row is None:
+            conn.rollback()
+            return False, "Item not in inventory!"
+        new_qty = int(row[0]) if float(row[0]).is_integer() else row[0]  # SQLite may hand back 50, PostgreSQL 50.0
         
         c.execute('INSERT INTO inventory_logs (project_name, item_name, change_qty, unit, operation, date, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)', 
                   (project, item, log_qty, unit, op_label, now_date, now_time))
+        _refresh_inventory_snapshots(c, project, item)
         
         conn.commit()
+        invalidate(f"inventory:{project}")
         return True, f"Stock updated. New Balance: {new_qty} {unit}"
-    except Exception as e: return False, str(e)
+    except backend.IntegrityError:
+        # CHECK / trigger fired: the removal would take the balance below zero
+        if conn.in_transaction: conn.rollback()
+        return False, "Insufficient Stock!"
+    except Exception as e:
+        if conn.in_transaction: conn.rollback()
+        return False, str(e)
     finally: conn.close()
 
+@cached_query("inventory:{project_name}")
+def get_inventory_balance_as_of(project_name, item_name, as_of_date):
+    """
+    Ledger-derived balance at the end of `as_of_date` (YYYY-MM-DD).
+    Starts from the nearest snapshot and only sums the ledger rows between it
+    and the next snapshot (at most SNAPSHOT_EVERY rows).
+    """
+    conn = _connect()
+    c = conn.cursor()
+    c.execute("SELECT log_id, quantity FROM inventory_snapshots WHERE project_name = ? AND item_name = ? AND as_of_date <= ? ORDER BY log_id DESC LIMIT 1",
+              (project_name, item_name, as_of_date))
+    row = c.fetchone()
+    start_id, base_qty = row if row else (0, 0.0)
+    c.execute("SELECT MIN(log_id) FROM inventory_snapshots WHERE project_name = ? AND item_name = ? AND log_id > ?",
+              (project_name, item_name, start_id))
+    next_id = c.fetchone()[0]
+    query = "SELECT COALESCE(SUM(change_qty), 0) FROM inventory_logs WHERE project_name = ? AND item_name = ? AND id > ? AND date <= ?"
+    params = [project_name, item_name, start_id, as_of_date]
+    if next_id is not None:
+        # Ledger dates are append-ordered, so nothing past the next snapshot can be on/before as_of_date
+        query += " AND id <= ?"
+        params.append(next_id)
+    c.execute(query, params)
+    delta = c.fetchone()[0]
+    conn.close()
+    return base_qty + delta
+
+@cached_query("inventory:{project_name}")
 def get_project_inventory(project_name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT item_name, quantity, unit, last_updated FROM inventory WHERE project_name = ?", (project_name,))
+    rows = c.fetchall()
+    conn.close()
     cols = ["Item", "Quantity", "Unit", "Last Updated"]
-    return pd.DataFrame(c.fetchall(), columns=cols)
+    return pd.DataFrame(rows, columns=cols)
 
+@cached_query("inventory:{project_name}")
 def get_inventory_logs(project_name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT date, timestamp, item_name, operation, change_qty, unit FROM inventory_logs WHERE project_name = ? ORDER BY date DESC, timestamp DESC", (project_name,))
+    rows = c.fetchall()
+    conn.close()
     cols = ["Date", "Time", "Item", "Action", "Change", "Unit"]
-    return pd.DataFrame(c.fetchall(), columns=cols)
+    return pd.DataFrame(rows, columns=cols)
 
 def log_site_photo(project, image_bytes, caption):
     import os
@@ -369,22 +784,26 @@ def log_site_photo(project, image_bytes, caption):
     path = f"{folder}/{filename}"
     with open(path, "wb") as f: f.write(image_bytes)
         
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("INSERT INTO site_photos (project_name, image_path, caption, timestamp) VALUES (?, ?, ?, ?)",
               (project, path, caption, datetime.now().strftime("%Y-%m-%d %H:%M")))
     conn.commit()
     conn.close()
+    invalidate(f"photos:{project}")
     return True
 
+@cached_query("photos:{project_name}")
 def get_site_photos(project_name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT image_path, caption, timestamp FROM site_photos WHERE project_name = ? ORDER BY timestamp DESC", (project_name,))
-    return c.fetchall()
+    rows = c.fetchall()
+    conn.close()
+    return rows
 
 def log_site_diary(project, weather, workers_dict, work_done, issues):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     date_str = datetime.now().strftime("%Y-%m-%d")
     try:
@@ -393,19 +812,210 @@ def log_site_diary(project, weather, workers_dict, work_done, issues):
         c.execute('INSERT INTO site_diary (project_name, date, weather, labor_count, work_done, issues, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)', 
                   (project, date_str, weather, json.dumps(workers_dict), work_done, issues, datetime.now().strftime("%H:%M")))
         conn.commit()
+        invalidate(f"diary:{project}")
         return True, "Site Diary Submitted Successfully!"
     except Exception as e: return False, str(e)
     finally: conn.close()
 
+@cached_query("diary:{project_name}")
 def get_site_diary(project_name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
     c = conn.cursor()
     c.execute("SELECT date, weather, labor_count, work_done, issues FROM site_diary WHERE project_name = ? ORDER BY date DESC", (project_name,))
     rows = c.fetchall()
     conn.close()
+    return _diary_frame(rows)
+
+def _diary_frame(rows):
     data = []
     for r in rows:
         labor = json.loads(r[2]) if r[2] else {}
         labor_str = ", ".join([f"{k}: {v}" for k, v in labor.items() if v > 0])
         data.append({"Date": r[0], "Weather": r[1], "Labor": labor_str, "Work Done": r[3], "Issues": r[4]})
-    return pd.DataFrame(data)
\ No newline at end of file
+    return pd.DataFrame(data)
+
+# ==========================================
+# 📑 PAGINATED & AGGREGATE READS
+# ==========================================
+# Each *_page() function returns (page, next_cursor). Pass next_cursor back in
+# to get the following (older) page; it is None on the last page. Cursors are
+# keyset tuples such as (date, id), so page N costs the same as page 1.
+
+PAGE_SIZE = 50
+
+def _keyset_page(select, table, owner_col, owner, order_cols, cursor=None, limit=PAGE_SIZE,
+                 date_col=None, start_date=None, end_date=None):
+    """Newest-first page of `table` rows for one project/supplier. order_cols must end with 'id'."""
+    where = [f"{owner_col} = ?"]
+    params = [owner]
+    if date_col and start_date:
+        where.append(f"{date_col} >= ?"); params.append(str(start_date))
+    if date_col and end_date:
+        where.append(f"{date_col} <= ?"); params.append(str(end_date))
+    if cursor:
+        where.append(f"({', '.join(order_cols)}) < ({', '.join('?' * len(order_cols))})")
+        params.extend(cursor)
+    order = ", ".join(f"{col} DESC" for col in order_cols)
+    query = f"SELECT {select}, {', '.join(order_cols)} FROM {table} WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ?"
+    params.append(limit + 1)
+
+    conn = _connect()
+    c = conn.cursor()
+    c.execute(query, params)
+    rows = c.fetchall()
+    conn.close()
+
+    n_keys = len(order_cols)
+    next_cursor = tuple(rows[limit - 1][-n_keys:]) if len(rows) > limit else None
+    return [r[:-n_keys] for r in rows[:limit]], next_cursor
+
+@cached_query("expenses:{project_name}", scope="session")
+def get_project_expenses_page(project_name, cursor=None, limit=PAGE_SIZE, start_date=None, end_date=None):
+    rows, next_cursor = _keyset_page("id, project_name, item_name, amount, category, date, note", "expenses", "project_name", project_name,
+                                     ["date", "id"], cursor, limit, "date", start_date, end_date)
+    cols = ["id", "project", "item", "amount", "category", "date", "note"]
+    return pd.DataFrame(rows, columns=cols), next_cursor
+
+@cached_query("inventory:{project_name}", scope="session")
+def get_inventory_logs_page(project_name, cursor=None, limit=PAGE_SIZE, start_date=None, end_date=None):
+    rows, next_cursor = _keyset_page("date, timestamp, item_name, operation, change_qty, unit", "inventory_logs", "project_name", project_name,
+                                     ["date", "timestamp", "id"], cursor, limit, "date", start_date, end_date)
+    cols = ["Date", "Time", "Item", "Action", "Change", "Unit"]
+    return pd.DataFrame(rows, columns=cols), next_cursor
+
+@cached_query("diary:{project_name}", scope="session")
+def get_site_diary_page(project_name, cursor=None, limit=PAGE_SIZE, start_date=None, end_date=None):
+    rows, next_cursor = _keyset_page("date, weather, labor_count, work_done, issues", "site_diary", "project_name", project_name,
+                                     ["date", "id"], cursor, limit, "date", start_date, end_date)
+    return _diary_frame(rows), next_cursor
+
+@cached_query("photos:{project_name}", scope="session")
+def get_site_photos_page(project_name, cursor=None, limit=12):
+    return _keyset_page("image_path, caption, timestamp", "site_photos", "project_name", project_name,
+                        ["timestamp", "id"], cursor, limit)
+
+@cached_query("bids", "bids:supplier:{supplier_name}", scope="session")
+def get_supplier_bids_page(supplier_name, cursor=None, limit=PAGE_SIZE):
+    rows, next_cursor = _keyset_page("id, project_name, supplier_name, amount, phone, status, timestamp", "bids", "supplier_name", supplier_name,
+                                     ["timestamp", "id"], cursor, limit)
+    cols = ["id", "project_name", "supplier_name", "amount", "phone", "status", "timestamp"]
+    return [dict(zip(cols, r)) for r in rows], next_cursor
+
+def _period_expr(by):
+    """Period bucket expression for aggregate queries ('day', 'week', 'month'), or None."""
+    if by == "week":
+        return _backend().week_expr("date")
+    return {"day": "date", "month": "substr(date, 1, 7)"}.get(by)
+
+@cached_query("expenses:{project_name}", version=_snapshot_version)
+def get_expense_totals(project_name, by="category", start_date=None, end_date=None):
+    """Spend totals grouped in SQLite. by: 'category', 'item', 'day', 'week' or 'month'."""
+    group = _period_expr(by) or {"category": "category", "item": "item_name"}.get(by)
+    if group is None: raise ValueError(f"Unsupported grouping: {by}")
+    query = f"SELECT {group} AS bucket, SUM(amount), COUNT(*) FROM expenses WHERE project_name = ?"
+    params = [project_name]
+    if start_date: query += " AND date >= ?"; params.append(str(start_date))
+    if end_date: query += " AND date <= ?"; params.append(str(end_date))
+    query += " GROUP BY bucket ORDER BY bucket"
+    conn = _connect(snapshot=True)
+    c = conn.cursor()
+    c.execute(query, params)
+    rows = c.fetchall()
+    conn.close()
+    return pd.DataFrame(rows, columns=[by, "amount", "entries"])
+
+@cached_query("inventory:{project_name}", version=_snapshot_version)
+def get_inventory_movement_totals(project_name, by="item", start_date=None, end_date=None):
+    """Stock IN / OUT totals grouped in SQLite. by: 'item', 'day', 'week' or 'month'."""
+    group = _period_expr(by) or ("item_name" if by == "item" else None)
+    if group is None: raise ValueError(f"Unsupported grouping: {by}")
+    query = f"""SELECT {group} AS bucket,
+                       SUM(CASE WHEN change_qty > 0 THEN change_qty ELSE 0 END),
+                       SUM(CASE WHEN change_qty < 0 THEN -change_qty ELSE 0 END),
+                       COUNT(*)
+                FROM inventory_logs WHERE project_name = ?"""
+    params = [project_name]
+    if start_date: query += " AND date >= ?"; params.append(str(start_date))
+    if end_date: query += " AND date <= ?"; params.append(str(end_date))
+    query += " GROUP BY bucket ORDER BY bucket"
+    conn = _connect(snapshot=True)
+    c = conn.cursor()
+    c.execute(query, params)
+    rows = c.fetchall()
+    conn.close()
+    return pd.DataFrame(rows, columns=[by, "stock_in", "stock_out", "movements"])
+
+@cached_query("project:{project_name}", "expenses:{project_name}", "inventory:{project_name}", "diary:{project_name}")
+def get_project_fingerprint(project_name):
+    """Cheap change-detector for a project's site data: (count, max id) per table."""
+    conn = _connect()
+    c = conn.cursor()
+    parts = []
+    for table in ["expenses", "inventory_logs", "site_diary", "inventory"]:
+        c.execute(f"SELECT COUNT(*), MAX(id) FROM {table} WHERE project_name = ?", (project_name,))
+        parts.extend(c.fetchone())
+    c.execute("SELECT timestamp FROM projects WHERE name = ?", (project_name,))
+    row = c.fetchone()
+    conn.close()
+    return tuple(parts) + (row[0] if row else None,)
+
+# ==========================================
+# 📈 PROJECT METRICS (DASHBOARD KPIs)
+# ==========================================
+# Everything the dashboard header and charts need, computed with a handful of
+# aggregate queries against the read snapshot (see logic/read_replica.py). Cached
+# through query_cache and expired by the project's writes or a newer snapshot.
+
+def _compute_project_metrics(project_name):
+    conn = _connect(snapshot=True)
+    c = conn.cursor()
+    c.execute("SELECT planned_total FROM projects WHERE name = ?", (project_name,))
+    row = c.fetchone()
+    planned = (row[0] or 0.0) if row else 0.0
+
+    c.execute("SELECT COALESCE(SUM(amount), 0.0), COUNT(*), MIN(date), MAX(date) FROM expenses WHERE project_name = ?", (project_name,))
+    spent, entries, first_date, last_date = c.fetchone()
+
+    c.execute("SELECT category, COALESCE(SUM(amount), 0.0) FROM expenses WHERE project_name = ? GROUP BY category ORDER BY 2 DESC", (project_name,))
+    by_category = pd.DataFrame(c.fetchall(), columns=["category", "amount"])
+
+    c.execute(f"SELECT {_period_expr('week')} AS week, COALESCE(SUM(amount), 0.0) FROM expenses WHERE project_name = ? GROUP BY week ORDER BY week", (project_name,))
+    weekly = pd.DataFrame(c.fetchall(), columns=["week", "amount"])
+
+    c.execute("SELECT item_name, quantity, unit FROM inventory WHERE project_name = ? ORDER BY quantity DESC", (project_name,))
+    stock = pd.DataFrame(c.fetchall(), columns=["Item", "Quantity", "Unit"])
+    conn.close()
+
+    # Burn rate: spend per week between the first expense and today (at least one week)
+    weeks = 1.0
+    if first_date:
+        try: weeks = max((datetime.now() - datetime.strptime(first_date, "%Y-%m-%d")).days / 7, 1.0)
+        except ValueError: pass
+    burn_rate = spent / weeks if entries else 0.0
+    remaining = planned - spent
+
+    return {
+        "planned": planned,
+        "spent": spent,
+        "remaining": remaining,
+        "pct_used": (spent / planned * 100) if planned else 0.0,
+        "expense_entries": entries,
+        "first_expense": first_date,
+        "last_expense": last_date,
+        "burn_rate_weekly": burn_rate,
+        "runway_weeks": (remaining / burn_rate) if burn_rate > 0 and remaining > 0 else None,
+        "stock_items": len(stock),
+        "out_of_stock": int((stock["Quantity"] <= 0).sum()),
+        "spend_by_category": by_category,
+        "weekly_burn": weekly,
+        "stock": stock,
+    }
+
+@cached_query("project:{project_name}", "expenses:{project_name}", "inventory:{project_name}", version=_snapshot_version)
+def get_project_metrics(project_name):
+    """
+    Dashboard KPIs for a project: planned vs spent, spend by category, weekly burn
+    rate and current stock levels. Cost is independent of history length (indexed
+    aggregates), and repeat calls are served from the cache until the next write.
+    """
+    return _compute_project_metrics(project_name)
@@ -0,0 +1,109 @@
+### (Live tender and bid feed. db_manager appends every saved tender, placed bid and bid status
+### change to the events table inside the writing transaction, then publishes the new id here.
+### Each session keeps the last event id it has shown. A poll compares that with the latest id
+### (one cached MAX(id) shared by every session, expired at once by local writes), and only when
+### it moved is there one read of the rows in between: deltas, never whole lists.)
+
+import threading
+
+import streamlit as st
+
+import logic.db_manager as db
+from logic.bid_engine import tender_status
+from logic.query_cache import cached_query, invalidate
+
+POLL_SECONDS = 5       # st.fragment(run_every=...) for the live blocks
+SYNC_SECONDS = 2       # Events written by other processes (workers, scripts) are seen within this
+EVENT_BATCH = 200      # Rows read per poll at most (the cursor catches up over the next polls)
+MAX_FEED_LINES = 8
+
+_latest = 0
+_changed = threading.Condition()
+
+# ==========================================
+# 📣 PUB / SUB
+# ==========================================
+
+def publish(event_id):
+    """Called by db_manager once a change-log write has committed: wakes waiters, expires the cursor."""
+    global _latest
+    with _changed:
+        _latest = max(_latest, int(event_id))
+        _changed.notify_all()
+    invalidate("events")
+
+def wait_for_events(after_id, timeout=None):
+    """Blocks until this process publishes an event newer than `after_id` (or `timeout` seconds). Returns the newest id published."""
+    with _changed:
+        _changed.wait_for(lambda: _latest > after_id, timeout)
+        return _latest
+
+@cached_query("events", ttl=SYNC_SECONDS)
+def latest_event_id():
+    """The feed head: newest committed event id."""
+    return db.get_latest_event_id()
+
+def events_since(cursor, project_name=None, supplier_name=None):
+    """(events after `cursor` for this feed, new cursor). No query unless something was committed since."""
+    head = latest_event_id()
+    if head <= cursor:
+        return [], cursor
+    events = db.get_events_since(cursor, head, project_name, supplier_name, limit=EVENT_BATCH)
+    return events, head if len(events) < EVENT_BATCH else events[-1]["id"]
+
+# ==========================================
+# 📝 FEED LINES
+# ==========================================
+
+def describe_bid_event(event):
+    """Marketplace line for a project's bid activity (amounts withheld while a sealed tender is open)."""
+    supplier = event["supplier_name"]
+    if event["kind"] == "bid":
+        if tender_status(event["project_name"])["is_hidden"]:
+            return f"🔒 Sealed bid received from **{supplier}**"
+        days = f" · {event['delivery_days']} days" if event.get("delivery_days") else ""
+        return f"🆕 **{supplier}** bid ₦{event['amount']:,.0f}{days}"
+    return f"🏆 Tender awarded to **{supplier}**"
+
+def describe_supplier_event(event, supplier_name):
+    """Supplier Portal line for `supplier_name`: tenders saved anywhere, and the outcome of its own bids."""
+    project = event["project_name"]
+    if event["kind"] == "tender":
+        return f"📢 Tender **{project}** open in {event['location']} (est. ₦{event['est_value']:,.0f}, {event['items']} items)"
+    if event["kind"] == "award" and event["supplier_name"] == supplier_name:
+        return f"✅ Your bid on **{project}** was accepted!"
+    if event["kind"] == "award":
+        return f"🏁 **{project}** was awarded to another supplier"
+    return f"❌ Your bid on **{project}** was not successful"
+
+# ==========================================
+# 🔴 LIVE BLOCKS
+# ==========================================
+
+def _feed(key, describe, project_name, supplier_name):
+    state = st.session_state.setdefault(f"feed_{key}", {"cursor": None, "lines": []})
+    if state["cursor"] is None:
+        state["cursor"] = latest_event_id()  # Start from now; history lives in the page itself
+    else:
+        events, state["cursor"] = events_since(state["cursor"], project_name, supplier_name)
+        lines = [describe(event) for event in events]
+        for line in lines[-3:]:
+            st.toast(line)
+        state["lines"] = (lines[::-1] + state["lines"])[:MAX_FEED_LINES]
+    if state["lines"]:
+        with st.container(border=True):
+            c1, c2 = st.columns([4, 1])
+            c1.caption("🔴 Live updates (newest first)")
+            if c2.button("🔄 Refresh", key=f"feed_refresh_{key}", help="Reload the page with these changes"):
+                state["lines"] = []
+                st.rerun()
+            for line in state["lines"]:
+                st.markdown(line)
+
+def live_bid_feed(project_name):
+    """New bids and awards on a project, polled every POLL_SECONDS without rerunning the rest of the page."""
+    st.fragment(_feed, run_every=POLL_SECONDS)(f"bids_{project_name}", describe_bid_event, project_name, None)
+
+def live_supplier_feed(supplier_name):
+    """New tenders and this supplier's bid outcomes, polled every POLL_SECONDS without rerunning the rest of the page."""
+    st.fragment(_feed, run_every=POLL_SECONDS)(f"supplier_{supplier_name}", lambda event: describe_supplier_event(event, supplier_name), None, supplier_name)
@@ -0,0 +1,303 @@
+### (Earned value per project. A baseline is stored once per project: the timeline engine's phases,
+### with the planned total spread over them by duration. Planned value is read off it by date.
+### Earned value is a running total: each diary or photo-estimated progress entry adds
+### budget x change in % complete for the phases it moves. Actual cost is folded in from the
+### expenses added since the last sync. CPI/SPI for a whole portfolio therefore come from
+### evm_state and the baseline rows, without replaying any project's history.)
+
+import re
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+import logic.db_manager as db
+from logic.query_cache import cached_query, invalidate
+from logic.timeline_engine import calculate_project_timeline
+from logic.variance_engine import UNPLANNED, match_item
+
+AT_RISK_INDEX = 0.9   # CPI or SPI below this is "At Risk"; below 1.0 is "Watch"
+PORTFOLIO_TTL = 30    # Max age (s) of the cached portfolio ranking; expenses on any site move it
+
+STATUS_AT_RISK, STATUS_WATCH, STATUS_ON_TRACK = "🔴 At Risk", "🟠 Watch", "🟢 On Track"
+
+# ==========================================
+# 📌 BASELINE
+# ==========================================
+
+def set_baseline(project_name, start_date=None):
+    """
+    Freezes the schedule and budget the project is measured against: the timeline engine's phases
+    from `start_date` (default today), with the planned total spread over them by duration.
+    Re-baselining keeps the % complete of phases that keep their name. Returns the number of phases.
+    """
+    _, _, boq = db.load_project_data(project_name)
+    if boq is None or boq.empty or "Item" not in boq.columns:
+        return 0
+    phases = calculate_project_timeline(boq, start_date)
+    if phases.empty:
+        return 0
+    days = np.array([(end - start).days for start, end in zip(phases["Start"], phases["End"])], dtype=float)
+    bac = float(pd.to_numeric(boq.get("Total Cost", 0.0), errors="coerce").fillna(0.0).sum())
+    budgets = bac * days / days.sum()
+
+    backend = db._backend()
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        backend.begin_write(conn, f"evm:{project_name}")
+        c.execute("SELECT phase, pct_complete FROM evm_baseline WHERE project_name = ?", (project_name,))
+        kept = dict(c.fetchall())
+        c.execute("DELETE FROM evm_baseline WHERE project_name = ?", (project_name,))
+        rows = [(project_name, seq, phase, str(start), str(end), float(budget), float(kept.get(phase, 0.0)))
+                for seq, (phase, start, end, budget) in enumerate(zip(phases["Phase"], phases["Start"], phases["End"], budgets))]
+        c.executemany("INSERT INTO evm_baseline (project_name, seq, phase, start_date, end_date, budget, pct_complete) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        ev = sum(budget * pct / 100 for *_, budget, pct in rows)
+        # Actual cost and its expense cursor survive a re-baseline; only the plan changes
+        c.execute('''INSERT INTO evm_state (project_name, bac, ev, ac, last_expense_id, baselined_at) VALUES (?, ?, ?, 0, 0, ?)
+                     ON CONFLICT (project_name) DO UPDATE SET bac = excluded.bac, ev = excluded.ev, baselined_at = excluded.baselined_at''',
+                  (project_name, bac, ev, datetime.now().strftime("%Y-%m-%d %H:%M")))
+        conn.commit()
+    except Exception:
+        if conn.in_transaction: conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate("evm", f"evm:{project_name}")
+    return len(rows)
+
+@cached_query("evm:{project_name}")
+def get_baseline(project_name):
+    """The project's baseline phases with their current % complete (empty before set_baseline)."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT phase, start_date, end_date, budget, pct_complete FROM evm_baseline WHERE project_name = ? ORDER BY seq", (project_name,))
+    rows = c.fetchall()
+    conn.close()
+    return pd.DataFrame(rows, columns=["Phase", "Start", "End", "Budget", "% Complete"])
+
+# ==========================================
+# 🏗️ PROGRESS (EARNED VALUE)
+# ==========================================
+
+def _advance(pcts, index, pct):
+    """Phases run in sequence: progress on phase `index` means every earlier phase is finished."""
+    return [100.0 if i < index else float(pct) if i == index else old for i, old in enumerate(pcts)]
+
+def _phase_index(phases, starts, phase, on):
+    """Baseline phase for a progress entry: by name (fuzzy, e.g. the vision engine's "Foundation"), else the one scheduled on `on`."""
+    if phase:
+        if phase in phases:
+            return phases.index(phase)
+        matched, _ = match_item(phase, phases)
+        if matched != UNPLANNED:
+            return phases.index(matched)
+    started = [i for i, start in enumerate(starts) if start <= on]
+    return started[-1] if started else 0
+
+def record_progress(project_name, pct, phase=None, source="diary", note=""):
+    """
+    Logs "`phase` is `pct`% complete" (phase None = the phase scheduled for today) and moves the
+    project's earned value by budget x change in % complete, in one transaction.
+    source: "diary" (site manager) or "vision" (estimated from a site photo). Returns (ok, message).
+    """
+    pct = min(max(float(pct), 0.0), 100.0)
+    today = date.today().strftime("%Y-%m-%d")
+    backend = db._backend()
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        backend.begin_write(conn, f"evm:{project_name}")
+        c.execute("SELECT phase, start_date, budget, pct_complete FROM evm_baseline WHERE project_name = ? ORDER BY seq", (project_name,))
+        baseline = c.fetchall()
+        if not baseline:
+            conn.rollback()
+            return False, "Set a baseline for this project first."
+        phases = [row[0] for row in baseline]
+        index = _phase_index(phases, [row[1] for row in baseline], phase, today)
+        old = [row[3] for row in baseline]
+        new = _advance(old, index, pct)
+        changed = [(n, project_name, p) for p, o, n in zip(phases, old, new) if n != o]
+        delta = sum(row[2] * (n - o) / 100 for row, o, n in zip(baseline, old, new))
+
+        c.executemany("UPDATE evm_baseline SET pct_complete = ? WHERE project_name = ? AND phase = ?", changed)
+        c.execute("INSERT INTO evm_progress (project_name, date, phase, pct, source, note, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                  (project_name, today, phases[index], pct, source, note, datetime.now().strftime("%H:%M")))
+        c.execute("UPDATE evm_state SET ev = ev + ? WHERE project_name = ?", (delta, project_name))
+        conn.commit()
+    except Exception:
+        if conn.in_transaction: conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate("evm", f"evm:{project_name}")
+    return True, f"{phases[index]}: {pct:.0f}% complete"
+
+def parse_vision_progress(text):
+    """(stage, pct) from analyze_site_progress output ("**Stage:** ..." / "**Progress:** 40%"), or None."""
+    found = re.search(r"\*\*Progress:\*\*\s*(\d+(?:\.\d+)?)\s*%", text or "")
+    if not found:
+        return None
+    stage = re.search(r"\*\*Stage:\*\*\s*([^\n*]+)", text)
+    return (stage.group(1).strip() if stage else None), min(float(found.group(1)), 100.0)
+
+# ==========================================
+# 💸 ACTUAL COST (INCREMENTAL)
+# ==========================================
+
+def sync_costs(project_names=None):
+    """
+    Adds expenses logged since each project's last sync to evm_state.ac (every baselined project
+    when None): one grouped query over the new rows only. Runs under the projects' expense write
+    locks, so no expense can commit behind the cursor. Returns the number of expense rows folded in.
+    """
+    backend = db._backend()
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        if project_names is None:
+            c.execute("SELECT project_name FROM evm_state")
+            project_names = [row[0] for row in c.fetchall()]
+            scope, params = "", ()
+        else:
+            scope, params = f"WHERE s.project_name IN ({', '.join('?' * len(project_names))})", tuple(project_names)
+        if not project_names:
+            conn.rollback()
+            return 0
+        backend.begin_write(conn, tuple(f"expenses:{p}" for p in project_names))
+        c.execute(f'''SELECT s.project_name, SUM(e.amount), MAX(e.id), COUNT(*) FROM evm_state s
+                      JOIN expenses e ON e.project_name = s.project_name AND e.id > s.last_expense_id
+                      {scope} GROUP BY s.project_name''', params)
+        new = c.fetchall()
+        c.executemany("UPDATE evm_state SET ac = ac + ?, last_expense_id = ? WHERE project_name = ?",
+                      [(float(total or 0.0), int(last_id), name) for name, total, last_id, _ in new])
+        conn.commit()
+        return sum(count for *_, count in new)
+    except Exception:
+        if conn.in_transaction: conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# ==========================================
+# 📊 INDICES & RANKING
+# ==========================================
+
+def _planned_value(baseline, as_of):
+    """PV per project on `as_of`: each phase's budget x share of its scheduled days elapsed."""
+    start = pd.to_datetime(baseline["start_date"])
+    days = (pd.to_datetime(baseline["end_date"]) - start).dt.days.clip(lower=1)
+    elapsed = ((pd.Timestamp(as_of) - start).dt.days / days).clip(0, 1)
+    return (baseline["budget"] * elapsed).groupby(baseline["project_name"]).sum()
+
+def _indices(state, baseline, as_of):
+    """Earned value table (one row per project) from evm_state rows and baseline phases."""
+    df = state.set_index("project_name").join(_planned_value(baseline, as_of).rename("pv"))
+    df["pv"] = df["pv"].fillna(0.0)
+    cpi = df["ev"] / df["ac"].where(df["ac"] > 0)
+    spi = df["ev"] / df["pv"].where(df["pv"] > 0)
+    # EAC = BAC / CPI; before any cost or progress, the remaining work is assumed to run at budget
+    eac = (df["bac"] / cpi.where(cpi > 0)).fillna(df["ac"] + df["bac"] - df["ev"])
+    bac = df["bac"].where(df["bac"] > 0)
+    risk = ((eac / bac - 1).clip(lower=0) + (1 - spi).clip(lower=0)).fillna(0.0)
+    worst = pd.concat([cpi, spi], axis=1).min(axis=1)
+    status = np.select([worst < AT_RISK_INDEX, worst < 1.0], [STATUS_AT_RISK, STATUS_WATCH], STATUS_ON_TRACK)
+    return pd.DataFrame({
+        "Project": df.index,
+        "BAC": df["bac"].to_numpy(),
+        "PV": df["pv"].to_numpy(),
+        "EV": df["ev"].to_numpy(),
+        "AC": df["ac"].to_numpy(),
+        "CV": (df["ev"] - df["ac"]).to_numpy(),
+        "SV": (df["ev"] - df["pv"]).to_numpy(),
+        "CPI": cpi.to_numpy(),
+        "SPI": spi.to_numpy(),
+        "EAC": eac.to_numpy(),
+        "% Complete": (df["ev"] / bac * 100).to_numpy(),
+        "% Planned": (df["pv"] / bac * 100).to_numpy(),
+        "Risk": risk.to_numpy(),
+        "Status": status,
+    })
+
+def _read(project_names=None):
+    """(evm_state rows, baseline phases) for the given projects, or every baselined project."""
+    scope, params = "", ()
+    if project_names is not None:
+        scope, params = f"WHERE project_name IN ({', '.join('?' * len(project_names))})", tuple(project_names)
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute(f"SELECT project_name, bac, ev, ac FROM evm_state {scope}", params)
+    state = pd.DataFrame(c.fetchall(), columns=["project_name", "bac", "ev", "ac"])
+    c.execute(f"SELECT project_name, start_date, end_date, budget FROM evm_baseline {scope}", params)
+    baseline = pd.DataFrame(c.fetchall(), columns=["project_name", "start_date", "end_date", "budget"])
+    conn.close()
+    return state.astype({"bac": float, "ev": float, "ac": float}), baseline.astype({"budget": float})
+
+@cached_query("project:{project_name}", "expenses:{project_name}", "evm:{project_name}")
+def project_evm(project_name, as_of=None):
+    """
+    BAC, PV, EV, AC, CV, SV, CPI, SPI, EAC, % complete / planned, risk and status for one project
+    on `as_of` ('YYYY-MM-DD', default today), or None before a baseline is set.
+    """
+    sync_costs([project_name])
+    state, baseline = _read([project_name])
+    if state.empty:
+        return None
+    return _indices(state, baseline, as_of or date.today()).iloc[0].to_dict()
+
+@cached_query("projects", "evm", ttl=PORTFOLIO_TTL)
+def portfolio_risk(as_of=None):
+    """
+    Every baselined project's earned value row, riskiest first. Risk = projected cost overrun
+    (EAC / BAC - 1) + schedule slip (1 - SPI), each floored at 0. Cost is brought up to date
+    incrementally; nothing is recomputed from a project's full history.
+    """
+    sync_costs()
+    report = _indices(*_read(), as_of or date.today())
+    return report.sort_values(["Risk", "Project"], ascending=[False, True], ignore_index=True)
+
+@cached_query("project:{project_name}", "expenses:{project_name}", "evm:{project_name}")
+def evm_curve(project_name):
+    """Cumulative PV, EV and AC per day from the baseline start to today (or the baseline end), for an S-curve."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT phase, start_date, end_date, budget FROM evm_baseline WHERE project_name = ? ORDER BY seq", (project_name,))
+    baseline = pd.DataFrame(c.fetchall(), columns=["phase", "start_date", "end_date", "budget"])
+    c.execute("SELECT date, phase, pct FROM evm_progress WHERE project_name = ? ORDER BY id", (project_name,))
+    progress = c.fetchall()
+    c.execute("SELECT date, SUM(amount) FROM expenses WHERE project_name = ? GROUP BY date", (project_name,))
+    spend = pd.Series(dict(c.fetchall()), dtype=float)
+    conn.close()
+    if baseline.empty:
+        return pd.DataFrame(columns=["Date", "PV", "EV", "AC"])
+
+    baseline["budget"] = baseline["budget"].astype(float)
+    start = pd.to_datetime(baseline["start_date"]).min()
+    end = max(pd.to_datetime(baseline["end_date"]).max(), pd.Timestamp(date.today()))
+    days = pd.date_range(start, end, freq="D")
+    phase_start = pd.to_datetime(baseline["start_date"]).to_numpy()[:, None]
+    phase_days = np.maximum((pd.to_datetime(baseline["end_date"]) - pd.to_datetime(baseline["start_date"])).dt.days.to_numpy(), 1)[:, None]
+    elapsed = np.clip((days.to_numpy()[None, :] - phase_start) / np.timedelta64(1, "D") / phase_days, 0, 1)
+    pv = (baseline["budget"].to_numpy()[:, None] * elapsed).sum(axis=0)
+
+    # Replay progress entries to get EV at the end of each day they were logged
+    phases, budgets, pcts, ev_by_day = baseline["phase"].tolist(), baseline["budget"].to_numpy(), [0.0] * len(baseline), {}
+    for day, phase, pct in progress:
+        if phase in phases:
+            pcts = _advance(pcts, phases.index(phase), pct)
+            ev_by_day[day] = float(np.dot(budgets, pcts) / 100)
+    ev = pd.Series(ev_by_day, dtype=float)
+    ev.index = pd.to_datetime(ev.index)
+    ev = ev.groupby(level=0).last()
+    spend.index = pd.to_datetime(spend.index, errors="coerce")
+
+    today = pd.Timestamp(date.today())
+    curve = pd.DataFrame({
+        "Date": days,
+        "PV": pv,
+        "EV": ev.reindex(ev.index.union(days)).ffill().reindex(days).fillna(0.0).to_numpy(),
+        "AC": spend.groupby(level=0).sum().reindex(days, fill_value=0.0).cumsum().to_numpy()
+              + spend[spend.index < start].sum(),
+    })
+    curve.loc[curve["Date"] > today, ["EV", "AC"]] = np.nan  # Only the plan extends into the future
+    return curve
@@ -1,7 +1,10 @@
-from groq import Groq
 import streamlit as st
 import pandas as pd
 
+from logic.clients import get_groq_client
+from logic.tracing import traced
+
+@traced("llm.qs_audit", "client")
 def verify_project_budget(boq_df, location):
     """
     Sends the BOQ to Groq AI (Llama 3.3) for a 'Senior QS' Audit.
@@ -14,7 +17,7 @@ def verify_project_budget(boq_df, location):
             return "❌ Error: GROQ_API_KEY not found in secrets."
             
         # 2. Configure Client
-        client = Groq(api_key=api_key)
+        client = get_groq_client(api_key)
         
         # 3. Convert BOQ to string for AI analysis
         boq_summary = boq_df.to_string(index=False)
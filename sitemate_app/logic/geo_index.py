@@ -0,0 +1,163 @@
+### (Spatial lookups for suppliers and catalogue listings. A flat grid of
+### ~11 km cells over sorted NumPy arrays stands in for a KD-tree: a radius query
+### only touches the cells it overlaps, then filters by exact haversine distance.)
+
+import math
+import threading
+
+import numpy as np
+
+from logic.catalogue import get_catalogue
+from logic.weather_engine import LOCATIONS
+
+EARTH_RADIUS_KM = 6371.0
+CELL_DEG = 0.1                # Grid cell size (~11 km of latitude)
+SUPPLIER_RADIUS_KM = 20.0     # Default "nearby supplier" radius
+
+# Distance-based delivery cost (replaces the flat 15% Lagos / 25% Abuja uplift)
+LOGISTICS_FREE_KM = 20        # Local deliveries are priced into the depot price
+LOGISTICS_RATE_PER_KM = 0.0015  # +0.15% of the material price per km beyond that
+LOGISTICS_CAP = 0.25          # Long hauls never add more than 25%
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance; any argument may be a NumPy array."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def logistics_uplift(distance_km):
+    """Fractional price uplift for hauling material `distance_km` to site."""
+    return float(min(max(distance_km - LOGISTICS_FREE_KM, 0) * LOGISTICS_RATE_PER_KM, LOGISTICS_CAP))
+
+def proximity_score(distance_km):
+    """0-1 per distance: 1 within the free-delivery radius, 0 once haulage reaches the cap (NaN stays NaN)."""
+    haulage = np.clip((np.asarray(distance_km, dtype=float) - LOGISTICS_FREE_KM) * LOGISTICS_RATE_PER_KM, 0, LOGISTICS_CAP)
+    return 1 - haulage / LOGISTICS_CAP
+
+def site_coordinates(location):
+    """(lat, lng) for a known site name, else None."""
+    coords = LOCATIONS.get(location)
+    return (coords["lat"], coords["lon"]) if coords else None
+
+class GeoIndex:
+    """
+    Points sorted by grid cell key (row * n_cols + col). Every latitude row of the
+    query box is one contiguous slice, found with two binary searches.
+    Longitudes do not wrap at +/-180 (fine for Nigeria / West Africa).
+    """
+
+    def __init__(self, lat, lng, cell_deg=CELL_DEG):
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lng))
+        self.cell = cell_deg
+        self.n_cols = int(math.ceil(360 / cell_deg)) + 1
+        keys = self._row(lat[valid]) * self.n_cols + self._col(lng[valid])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.ids = valid[order]           # Position in the caller's arrays
+        self.lat = lat[self.ids]
+        self.lng = lng[self.ids]
+        self.size = len(lat)
+
+    def _row(self, lat):
+        return np.floor((np.asarray(lat) + 90) / self.cell).astype(np.int64)
+
+    def _col(self, lng):
+        return np.floor((np.asarray(lng) + 180) / self.cell).astype(np.int64)
+
+    def _candidates(self, lat, lng, radius_km):
+        dlat = radius_km / 111.2
+        dlng = min(radius_km / (111.2 * max(math.cos(math.radians(lat)), 0.01)), 180)
+        rows = np.arange(self._row(max(lat - dlat, -90)), self._row(min(lat + dlat, 90)) + 1)
+        c0, c1 = max(int(self._col(lng - dlng)), 0), min(int(self._col(lng + dlng)), self.n_cols - 1)
+        starts = np.searchsorted(self.keys, rows * self.n_cols + c0, side="left")
+        ends = np.searchsorted(self.keys, rows * self.n_cols + c1, side="right")
+        spans = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+
+    def query(self, lat, lng, radius_km=SUPPLIER_RADIUS_KM, k=None, mask=None):
+        """
+        Points within `radius_km`, nearest first (at most `k`).
+        `mask` is an optional boolean array over the original points.
+        Returns (ids, distances_km).
+        """
+        pos = self._candidates(lat, lng, radius_km)
+        if mask is not None and len(pos):
+            pos = pos[mask[self.ids[pos]]]
+        dist = haversine_km(lat, lng, self.lat[pos], self.lng[pos])
+        keep = dist <= radius_km
+        pos, dist = pos[keep], dist[keep]
+        if k is not None and len(dist) > k:
+            part = np.argpartition(dist, k)[:k]
+            pos, dist = pos[part], dist[part]
+        order = np.argsort(dist, kind="stable")
+        return self.ids[pos[order]], dist[order]
+
+    def nearest(self, lat, lng, k=1, mask=None, max_km=2000.0):
+        """k nearest points regardless of radius (widens the search until k are found)."""
+        radius = self.cell * 111.2
+        while True:
+            ids, dist = self.query(lat, lng, radius, k=k, mask=mask)
+            if len(ids) >= k or radius >= max_km:
+                return ids, dist
+            radius = min(radius * 2, max_km)
+
+# ==========================================
+# 🏪 CATALOGUE SUPPLIERS
+# ==========================================
+
+_index = None
+_lock = threading.Lock()
+
+def get_listing_index():
+    """GeoIndex over catalogue listings (one point per supplier x item), built on first use."""
+    global _index
+    catalogue = get_catalogue()
+    if catalogue is None:
+        return None
+    with _lock:
+        if _index is None:
+            _index = GeoIndex(catalogue.lat, catalogue.lng)
+    return _index
+
+def nearest_suppliers(site, material=None, k=5, radius_km=SUPPLIER_RADIUS_KM):
+    """
+    k nearest catalogue suppliers to `site` (location name or (lat, lng)), optionally
+    only those stocking `material`. Each result carries distance_km and the
+    distance-based logistics uplift. Returns [] when the site or catalogue is unknown.
+    """
+    coords = site_coordinates(site) if isinstance(site, str) else site
+    catalogue, index = get_catalogue(), get_listing_index()
+    if coords is None or index is None:
+        return []
+    mask = None
+    if material:
+        mask = np.zeros(catalogue.size, dtype=bool)
+        mask[catalogue.matching_rows(material)] = True
+    ids, dist = index.query(coords[0], coords[1], radius_km, mask=mask)
+    # First (nearest) listing per supplier
+    _, first = np.unique(catalogue.supplier_codes[ids], return_index=True)
+    results = []
+    for j in sorted(first, key=lambda j: dist[j])[:k]:
+        row = catalogue.row(ids[j])
+        uplift = logistics_uplift(dist[j])
+        results.append({
+            "name": row["supplier"], "location": row["location"], "item": row["name"],
+            "price": row["price"], "distance_km": round(float(dist[j]), 1),
+            "logistics": uplift, "markup": round(1 + uplift, 4),
+        })
+    return results
+
+def nearest_stockist(material, site):
+    """(lat, lng) of the closest listing that best matches `material`, or None."""
+    coords = site_coordinates(site) if isinstance(site, str) else site
+    catalogue = get_catalogue()
+    if coords is None or catalogue is None:
+        return None
+    rows = catalogue.best_rows(material)
+    rows = rows[np.isfinite(catalogue.lat[rows])]
+    if not len(rows):
+        return None
+    i = rows[np.argmin(haversine_km(coords[0], coords[1], catalogue.lat[rows], catalogue.lng[rows]))]
+    return float(catalogue.lat[i]), float(catalogue.lng[i])
@@ -1,5 +1,6 @@
 import pandas as pd
 import math
+from logic.tracing import traced
 
 # --- STANDARD LAGOS/NIGERIA LABOR RATES (2026 ESTIMATES) ---
 RATES = {
@@ -9,6 +10,7 @@ RATES = {
     "CARPENTER_DAY_RATE": 8500,  # Formwork carpenter
 }
 
+@traced("engine.labor", "engine")
 def calculate_labor_cost(material_df):
     """
     Analyzes the Material Dataframe and estimates Labor costs 
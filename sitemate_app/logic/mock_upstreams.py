@@ -0,0 +1,326 @@
+### (Local stand-ins for Groq, Gemini, Algolia, Open-Meteo and Paystack. One threaded
+### HTTP server answers each API's routes with its real response shape, with injectable
+### latency, 429/5xx error rates and per-service throughput limits, so the app can be
+### load-tested and benchmarked offline.)
+###
+### Usage (from sitemate_app/):
+###   python -m logic.mock_upstreams --port 8900 --latency groq=900:300 --error-rate 0.02 --rps algolia=50
+###   SITEMATE_UPSTREAM_URL=http://127.0.0.1:8900 streamlit run app.py
+### The app still needs (dummy) API keys in secrets.toml; the stand-ins accept any key.
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Typical production behaviour: (mean latency ms, jitter ms). No errors or limits by default.
+DEFAULT_LATENCY = {
+    "groq": (900, 300),
+    "gemini": (1800, 600),
+    "algolia": (35, 15),
+    "open_meteo": (150, 50),
+    "paystack": (400, 150),
+}
+
+# Canned completion for the structural prompt (prose, then the ||| BOQ ||| block the agent parses)
+AGENT_REPLY = """### 🏗️ Engineering Assessment
+For a 4-bedroom duplex on this soil, use a 675mm x 225mm strip foundation with 3 No. Y12 runners.
+Blockwork: 9-inch vibrated blocks below DPC, 6-inch for partitions.
+
+### JSON
+|||
+{"Cement": 420, "Sharp Sand": 6, "Granite": 4, "12mm Iron Rod": 180, "9-inch Vibrated Block": 5200}
+|||"""
+
+AUDIT_REPLY = """**REALISM CHECK:** Prices are within 5% of current market averages.
+**MISSING ITEMS:** Binding wire, DPC membrane.
+**RISK SCORE:** 82%
+**VERDICT:** VERIFIED"""
+
+VISION_REPLY = """**Stage:** Superstructure (Block Work)
+**Progress:** 45%
+**Observation:** Scaffold lacks toe boards on the north elevation."""
+
+# ==========================================
+# 🎛️ FAULT INJECTION
+# ==========================================
+
+def _service_profile(latency, error_rate=0.0, rps=None):
+    return {"latency": tuple(latency), "error_rate": error_rate, "rps": rps}
+
+def _hex_id(ctx, bits):
+    with ctx["lock"]:
+        return f"{ctx['rng'].getrandbits(bits):0{bits // 4}x}"
+
+class _TokenBucket:
+    """Allows `rps` requests per second with bursts up to `rps`; extra calls are refused (429)."""
+
+    def __init__(self, rps):
+        self.rps = rps
+        self.tokens = float(rps)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rps, self.tokens + (now - self.updated) * self.rps)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+def _error_body(service, status):
+    """Each API's own error envelope."""
+    message = "Rate limit reached" if status == 429 else "Upstream temporarily unavailable"
+    if service == "groq":
+        return {"error": {"message": message, "type": "rate_limit_exceeded" if status == 429 else "internal_server_error"}}
+    if service == "gemini":
+        return {"error": {"code": status, "message": message, "status": "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"}}
+    if service == "algolia":
+        return {"message": message, "status": status}
+    if service == "open_meteo":
+        return {"error": True, "reason": message}
+    return {"status": False, "message": message}
+
+# ==========================================
+# 📡 RESPONSES
+# ==========================================
+
+def _groq_chat(ctx, body, match, query):
+    prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+    content = AGENT_REPLY if "|||" in prompt else AUDIT_REPLY
+    return 200, {
+        "id": f"chatcmpl-{_hex_id(ctx, 48)}", "object": "chat.completion", "created": int(time.time()),
+        "model": body.get("model", "llama-3.3-70b-versatile"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(prompt) + len(content)) // 4},
+    }
+
+def _groq_transcription(ctx, body, match, query):
+    return 200, {"text": "I want to build a 4 bedroom duplex in Lekki with a perimeter fence."}
+
+def _gemini_generate(ctx, body, match, query):
+    return 200, {
+        "candidates": [{"content": {"parts": [{"text": VISION_REPLY}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": 300, "candidatesTokenCount": 40, "totalTokenCount": 340},
+        "modelVersion": match.group("model"),
+    }
+
+def _algolia_query(ctx, body, match, query):
+    """Hits come from the offline catalogue, so prices and _geoloc look like the real index."""
+    from logic.catalogue import get_catalogue
+    catalogue = get_catalogue()
+    text = body.get("query", "")
+    per_page = int(body.get("hitsPerPage", 20))
+    hits = [] if catalogue is None else [catalogue.row(i) for i, _ in catalogue.search(text, limit=per_page)]
+    return 200, {"hits": hits, "nbHits": len(hits), "page": 0, "nbPages": 1, "hitsPerPage": per_page,
+                 "processingTimeMS": 1, "query": text, "params": f"query={text}&hitsPerPage={per_page}", "index": match.group("index")}
+
+def _open_meteo_forecast(ctx, body, match, query):
+    lat = float(query.get("latitude", ["6.45"])[0])
+    lng = float(query.get("longitude", ["3.39"])[0])
+    rng = random.Random(f"{lat:.2f},{lng:.2f},{date.today()}")  # Stable per site and day
+    days = [(date.today() + timedelta(days=d)).isoformat() for d in range(7)]
+    rain = [round(max(rng.gauss(2, 4), 0), 1) for _ in days]
+    return 200, {
+        "latitude": lat, "longitude": lng, "timezone": query.get("timezone", ["GMT"])[0], "elevation": 40.0,
+        "current_weather": {"temperature": round(rng.uniform(23, 35), 1), "windspeed": round(rng.uniform(2, 18), 1),
+                            "winddirection": rng.randint(0, 359), "weathercode": rng.choice([0, 1, 2, 3, 61, 80, 95]),
+                            "is_day": 1, "time": f"{days[0]}T12:00"},
+        "daily": {"time": days, "precipitation_sum": rain, "rain_sum": rain},
+    }
+
+def _paystack_initialize(ctx, body, match, query):
+    access_code = _hex_id(ctx, 40)
+    return 200, {"status": True, "message": "Authorization URL created",
+                 "data": {"authorization_url": f"https://checkout.paystack.com/{access_code}",
+                          "access_code": access_code, "reference": body.get("reference", access_code)}}
+
+# (method, path pattern, service, handler). Paths never collide, so every API can share one base URL.
+ROUTES = [
+    ("POST", re.compile(r"^/openai/v1/chat/completions$"), "groq", _groq_chat),
+    ("POST", re.compile(r"^/openai/v1/audio/transcriptions$"), "groq", _groq_transcription),
+    ("POST", re.compile(r"^/v1beta/models/(?P<model>[^/:]+):generateContent$"), "gemini", _gemini_generate),
+    ("POST", re.compile(r"^/1/indexes/(?P<index>[^/]+)/query$"), "algolia", _algolia_query),
+    ("GET", re.compile(r"^/v1/forecast$"), "open_meteo", _open_meteo_forecast),
+    ("POST", re.compile(r"^/transaction/initialize$"), "paystack", _paystack_initialize),
+]
+
+# ==========================================
+# 🖥️ SERVER
+# ==========================================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass  # Keep load-test output readable; use /__stats instead
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        ctx = self.server.ctx
+        if url.path == "/__stats":
+            return self._send(200, stats(self.server))
+        if url.path == "/__reset" and method == "POST":
+            reset_stats(self.server)
+            return self._send(200, {"reset": True})
+
+        route = next(((svc, fn, m) for verb, pattern, svc, fn in ROUTES if verb == method and (m := pattern.match(url.path))), None)
+        if route is None:
+            return self._send(404, {"message": f"No stand-in for {method} {url.path}", "status": 404})
+        service, handler, match = route
+        profile = ctx["profiles"][service]
+        start = time.perf_counter()
+
+        bucket = ctx["buckets"].get(service)
+        if bucket is not None and not bucket.take():
+            status, payload, headers = 429, _error_body(service, 429), {"Retry-After": "1"}
+        else:
+            mean, jitter = profile["latency"]
+            with ctx["lock"]:
+                delay = max(ctx["rng"].gauss(mean, jitter), 0) * ctx["latency_scale"] / 1000
+                roll = ctx["rng"].random()
+                failure = ctx["rng"].choice([429, 500, 502, 503])
+            time.sleep(delay)
+            if roll < profile["error_rate"]:
+                status, payload = failure, _error_body(service, failure)
+                headers = {"Retry-After": "1"} if failure == 429 else None
+            else:
+                body = json.loads(raw) if raw and "json" in self.headers.get("Content-Type", "") else {}
+                status, payload = handler(ctx, body, match, parse_qs(url.query))
+                headers = None
+        self._send(status, payload, headers)
+        _record(self.server, service, status, time.perf_counter() - start)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+def _record(server, service, status, seconds):
+    with server.ctx["lock"]:
+        s = server.ctx["stats"].setdefault(service, {"requests": 0, "ok": 0, "throttled": 0, "errors": 0, "total_ms": 0.0})
+        s["requests"] += 1
+        s["total_ms"] += seconds * 1000
+        if status == 200:
+            s["ok"] += 1
+        elif status == 429:
+            s["throttled"] += 1
+        else:
+            s["errors"] += 1
+
+def stats(server):
+    """Per-service request counts and mean server-side latency."""
+    with server.ctx["lock"]:
+        return {svc: dict(s, mean_ms=round(s["total_ms"] / s["requests"], 1)) for svc, s in server.ctx["stats"].items()}
+
+def reset_stats(server):
+    with server.ctx["lock"]:
+        server.ctx["stats"].clear()
+
+def start_mock_server(host="127.0.0.1", port=0, latency=None, error_rate=None, rps=None, latency_scale=1.0, seed=None):
+    """
+    Starts the stand-ins on a daemon thread and returns the server (base URL in server.url).
+    latency: {service: (mean_ms, jitter_ms)}, error_rate: {service: 0-1}, rps: {service: limit}
+    override the defaults per service. latency_scale=0 removes the artificial latency.
+    """
+    latency, error_rate, rps = latency or {}, error_rate or {}, rps or {}
+    profiles = {svc: _service_profile(latency.get(svc, default), error_rate.get(svc, 0.0), rps.get(svc))
+                for svc, default in DEFAULT_LATENCY.items()}
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.ctx = {
+        "profiles": profiles,
+        "buckets": {svc: _TokenBucket(p["rps"]) for svc, p in profiles.items() if p["rps"]},
+        "latency_scale": latency_scale, "rng": random.Random(seed), "lock": threading.Lock(), "stats": {},
+    }
+    server.url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="sitemate-mock-upstreams", daemon=True).start()
+    return server
+
+DUMMY_SECRETS = 'GROQ_API_KEY = "mock"\nGOOGLE_API_KEY = "mock"\nALGOLIA_APP_ID = "MOCK"\nALGOLIA_API_KEY = "mock"\n'
+
+def use_stand_ins(server):
+    """
+    Points this process at the stand-ins: every upstream base URL, plus dummy keys
+    (st.secrets reads ./.streamlit/secrets.toml, so this chdirs into a scratch directory -
+    call it before Streamlit is first imported). Returns the scratch directory.
+    """
+    os.environ["SITEMATE_UPSTREAM_URL"] = server.url
+    workdir = tempfile.mkdtemp(prefix="sitemate_upstreams_")
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+        f.write(DUMMY_SECRETS)
+    os.chdir(workdir)
+    return workdir
+
+# ==========================================
+# 🧰 CLI
+# ==========================================
+
+def _per_service(values, cast):
+    """['groq=0.1', '0.02'] -> {'groq': 0.1, <every other service>: 0.02}"""
+    default, result = None, {}
+    for value in values or []:
+        name, _, setting = value.rpartition("=")
+        if not name:
+            default = cast(setting)
+        elif name not in DEFAULT_LATENCY:
+            raise SystemExit(f"Unknown service '{name}' (choose from {', '.join(DEFAULT_LATENCY)})")
+        else:
+            result[name] = cast(setting)
+    if default is not None:
+        result = {svc: result.get(svc, default) for svc in DEFAULT_LATENCY}
+    return result
+
+def _latency(setting):
+    mean, _, jitter = setting.partition(":")
+    return float(mean), float(jitter or 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-ins for SiteMate's external APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", action="append", help="[service=]mean_ms[:jitter_ms], repeatable")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplies every latency (0 = instant)")
+    parser.add_argument("--error-rate", action="append", help="[service=]fraction answered with 429/5xx, repeatable")
+    parser.add_argument("--rps", action="append", help="[service=]requests/second before 429s, repeatable")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.host, args.port, _per_service(args.latency, _latency), _per_service(args.error_rate, float),
+                               _per_service(args.rps, float), args.latency_scale, args.seed)
+    print(f"🧪 Mock upstreams on {server.url}  (export SITEMATE_UPSTREAM_URL={server.url})")
+    for svc, p in server.ctx["profiles"].items():
+        limit = f"{p['rps']:g} rps" if p["rps"] else "unlimited"
+        print(f"  {svc:<11} {p['latency'][0] * args.latency_scale:6.0f} ms ±{p['latency'][1] * args.latency_scale:<5.0f} "
+              f"errors {p['error_rate']:.0%}  {limit}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ from logic.visualizer import render_strip_foundation, render_pad_foundation
 # Import the new modules
 from logic.prompts import get_structural_prompt
 from logic.utils import extract_json_from_text, clean_ai_text
+from logic.upstreams import upstream_url
+from logic.tracing import traced
 
 def fetch_market_context(location):
     """Gets prices for the prompt context."""
@@ -25,7 +27,7 @@ def query_groq_direct(prompt):
     """Talks to the AI."""
     try:
         api_key = st.secrets["GROQ_API_KEY"]
-        url = "https://api.groq.com/openai/v1/chat/completions"
+        url = f"{upstream_url('groq')}/openai/v1/chat/completions"
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
         payload = {
             "model": "llama-3.3-70b-versatile", 
@@ -42,6 +44,7 @@ def query_groq_direct(prompt):
     except Exception as e:
         return f"❌ Connection Error: {e}"
 
+@traced("agent.turn")
 def get_agent_response(user_input, location, soil_type):
     """Main Orchestrator function called by app.py."""
     
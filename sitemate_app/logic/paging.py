@@ -0,0 +1,28 @@
+### (Streamlit controls for the keyset-paginated *_page() reads in db_manager.
+### Only one page of rows is fetched per rerun; the cursor history lives in session_state.)
+
+import streamlit as st
+
+def fetch_page(key, fetch, *args, **kwargs):
+    """
+    Calls `fetch(*args, cursor=..., **kwargs)` for the page currently selected under `key`.
+    Include anything that changes the result set (project, filters) in `key` so it restarts at page 1.
+    Returns (page, next_cursor); pass next_cursor to page_controls().
+    """
+    stack = st.session_state.setdefault(f"cursors_{key}", [None])
+    return fetch(*args, cursor=stack[-1], **kwargs)
+
+def page_controls(key, next_cursor):
+    """Newer / Older buttons under a paginated table."""
+    stack = st.session_state.setdefault(f"cursors_{key}", [None])
+    b1, b2, b3 = st.columns([1, 1, 3])
+    with b1:
+        if st.button("⬅️ Newer", key=f"newer_{key}", disabled=len(stack) == 1):
+            stack.pop()
+            st.rerun()
+    with b2:
+        if st.button("Older ➡️", key=f"older_{key}", disabled=next_cursor is None):
+            stack.append(next_cursor)
+            st.rerun()
+    with b3:
+        st.caption(f"Page {len(stack)}")
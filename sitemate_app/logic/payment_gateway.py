@@ -1,11 +1,13 @@
 import requests
 
+from logic.upstreams import upstream_url
+
 # Use Paystack Test Keys (Free to get from paystack.com)
 PAYSTACK_SECRET = "sk_test_xxxxxxxxxxxxxxxxxxxxxxxx" 
 
 def initialize_payment(email, amount_naira, reference):
     """Generates a Paystack Checkout Link."""
-    url = "https://api.paystack.co/transaction/initialize"
+    url = f"{upstream_url('paystack')}/transaction/initialize"
     headers = {
         "Authorization": f"Bearer {PAYSTACK_SECRET}",
         "Content-Type": "application/json"
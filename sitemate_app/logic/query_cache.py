@@ -0,0 +1,180 @@
+### (Read-through cache for db_manager queries with tag-based write invalidation.
+### Reads are keyed by (function, args); writes bump the version of the tags they
+### touch, e.g. log_expense -> "expenses:<project>", so stale entries are never served.)
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from logic.tracing import record_payload, span
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # Older Streamlit / plain scripts
+    get_script_run_ctx = lambda: None
+
+MAX_SHARED_ENTRIES = 512   # LRU bound for the cross-session tier
+MAX_SESSION_ENTRIES = 128  # Per browser session
+DEFAULT_TTL = 300          # Seconds; safety net for writes made by other processes
+
+_shared = OrderedDict()    # key -> (value, tag stamp, created)
+_tag_versions = {}         # tag -> int, bumped on every write that touches it
+_stats = {}                # function name -> {"hits": n, "misses": n}
+_lock = threading.Lock()
+_context = lambda: None    # Extra key component, e.g. the active database file
+_max_age = lambda: None    # Cap on every entry's age (seconds), e.g. when other nodes write to the same database
+
+# ==========================================
+# 🏷️ TAGS
+# ==========================================
+
+def invalidate(*tags):
+    """Marks every cached read carrying any of these tags as stale (both tiers)."""
+    with _lock:
+        for tag in tags:
+            _tag_versions[tag] = _tag_versions.get(tag, 0) + 1
+
+def invalidate_all():
+    """Drops the shared tier and bumps every tag (session tiers age out on their own)."""
+    with _lock:
+        _shared.clear()
+        for tag in _tag_versions:
+            _tag_versions[tag] += 1
+        _tag_versions["*"] = _tag_versions.get("*", 0) + 1
+
+def set_context(func):
+    """Registers a zero-arg callable whose value is added to every cache key."""
+    global _context
+    _context = func
+
+def set_max_age(func):
+    """
+    Registers a zero-arg callable returning the longest any entry may be served (None = no cap).
+    invalidate() only reaches this process, so a database shared by several app nodes needs a
+    short cap for their writes to show up here.
+    """
+    global _max_age
+    _max_age = func
+
+def _stamp(tags):
+    # "*" is included so invalidate_all() also expires entries whose tags were never written
+    return tuple(_tag_versions.get(t, 0) for t in tags) + (_tag_versions.get("*", 0),)
+
+# ==========================================
+# 🗄️ STORES
+# ==========================================
+
+def _session_store():
+    """Per-session OrderedDict, or None outside a Streamlit script run."""
+    if get_script_run_ctx() is None:
+        return None
+    import streamlit as st
+    return st.session_state.setdefault("_query_cache", OrderedDict())
+
+def _copy_out(value):
+    """Callers get their own DataFrames so in-place edits can't corrupt the cache."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy_out(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, tuple):
+        return tuple(_copy_out(v) for v in value)
+    return value
+
+def _count(name, field):
+    counters = _stats.setdefault(name, {"hits": 0, "misses": 0})
+    counters[field] += 1
+
+# ==========================================
+# 🎀 DECORATOR
+# ==========================================
+
+def cached_query(*tags, scope="shared", ttl=DEFAULT_TTL, version=None):
+    """
+    Caches a read function by (function, args).
+
+    tags:  templates formatted with the call's arguments, e.g. "expenses:{project_name}".
+           Any write calling invalidate("expenses:Lekki Duplex") expires the entry.
+    scope: "shared" (one copy for every session in this process) or "session"
+           (per-user reads such as a supplier's own bids, or paginated views).
+    ttl:   max age in seconds (None = until invalidated), capped by set_max_age.
+    version: zero-arg callable; entries also expire when its value changes (e.g. the
+           generation of the snapshot a read was served from, see read_replica).
+    """
+    def decorator(func):
+        sig = inspect.signature(func)
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(f"query.{name}", "db", **{"cache.scope": scope}) as s:
+                value, hit = lookup(args, kwargs)
+                s["attributes"]["cache.hit"] = hit
+                record_payload(s, value)
+                return value
+
+        def lookup(args, kwargs):
+            try:
+                key = (_context(), name, args, tuple(sorted(kwargs.items())))
+                hash(key)
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                resolved = [t.format(**bound.arguments) for t in tags]
+            except (TypeError, KeyError):
+                return func(*args, **kwargs), False  # Unhashable / unformattable args: don't cache
+
+            store = _session_store() if scope == "session" else None
+            if store is None:
+                store = _shared
+            limit = MAX_SESSION_ENTRIES if store is not _shared else MAX_SHARED_ENTRIES
+            current = version() if version is not None else None
+            cap = _max_age()
+            max_age = ttl if cap is None else min(cap, ttl if ttl is not None else cap)
+
+            with _lock:
+                stamp = _stamp(resolved) + (current,)
+                entry = store.get(key)
+                if entry is not None and entry[1] == stamp and (max_age is None or time.monotonic() - entry[2] < max_age):
+                    store.move_to_end(key)
+                    _count(name, "hits")
+                    return _copy_out(entry[0]), True
+                _count(name, "misses")
+
+            # The stamp is taken before the query runs, so a write that lands
+            # mid-query leaves this entry already stale.
+            value = func(*args, **kwargs)
+            with _lock:
+                store[key] = (value, stamp, time.monotonic())
+                store.move_to_end(key)
+                while len(store) > limit:
+                    store.popitem(last=False)
+            return _copy_out(value), False
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+# ==========================================
+# 📊 STATS
+# ==========================================
+
+def cache_stats():
+    """Hit ratio per cached function, most-called first."""
+    with _lock:
+        rows = [(name, c["hits"], c["misses"]) for name, c in _stats.items()]
+        shared_size = len(_shared)
+    df = pd.DataFrame(rows, columns=["function", "hits", "misses"])
+    df["calls"] = df["hits"] + df["misses"]
+    df["hit_ratio"] = (df["hits"] / df["calls"]).round(3)
+    df.attrs["shared_entries"] = shared_size
+    return df.sort_values("calls", ascending=False, ignore_index=True)
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
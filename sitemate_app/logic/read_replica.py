@@ -0,0 +1,151 @@
+### (Snapshot read path for dashboard queries (job board, KPI header, spend/stock aggregates).
+### On SQLite, a reader holds a SHARED lock for the length of its query and writers queue
+### behind it; heavy aggregates therefore slow down bids, expenses and stock moves. Here those
+### reads go to a read-only copy of the database made with the SQLite backup API instead.
+###
+### Staleness is bounded: a snapshot is replaced once it is older than MAX_STALENESS seconds
+### and the primary file has changed since it was taken. Each copy is a new immutable file, so
+### readers never take a lock on the primary and never see a half-refreshed copy.
+### SITEMATE_REPLICA_STALENESS=0 turns the snapshot off (reads hit the primary). PostgreSQL
+### readers don't block writers (MVCC), so there the primary is always used.)
+
+import atexit
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from logic.storage import SQLiteBackend
+from logic.tracing import span
+
+STALENESS_VAR = "SITEMATE_REPLICA_STALENESS"
+MAX_STALENESS = float(os.environ.get(STALENESS_VAR, 5))  # Seconds a dashboard read may lag the primary
+
+class SnapshotReplica:
+    """Read-only, periodically refreshed copy of one SQLite database."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.dir = tempfile.mkdtemp(prefix="sitemate_replica_")
+        self.generation = 0        # Bumped every time a new copy is published
+        self.path = None           # Current snapshot file
+        self.taken = 0.0           # monotonic() when the current copy was last known to match the primary
+        self.taken_at = None       # Wall-clock time of the same moment, for "as of" captions
+        self.refreshes = 0
+        self.last_copy_ms = 0.0
+        self._source_stamp = None  # (mtime, size) of the primary's files when the copy was taken
+        self._retired = []         # Old copies still open somewhere (Windows can't unlink those yet)
+        self._lock = threading.Lock()
+        atexit.register(shutil.rmtree, self.dir, True)
+
+    def __repr__(self):
+        return f"snapshot of {self.backend!r} (generation {self.generation})"
+
+    def _stamp(self):
+        """Changes whenever a transaction commits (main file, or the -wal file in WAL mode)."""
+        stamp = []
+        for suffix in ("", "-wal"):
+            try:
+                st = os.stat(self.backend.path + suffix)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _refresh(self):
+        """Copies the primary into a new snapshot file and makes it current. Caller holds _lock."""
+        stamp = self._stamp()  # Taken before the copy: a commit that races it just triggers another refresh
+        if self.path is not None and stamp == self._source_stamp:
+            self.taken, self.taken_at = time.monotonic(), time.time()  # Nothing committed since: still exact
+            return
+        path = os.path.join(self.dir, f"snapshot-{self.generation + 1}.db")
+        with span("replica.refresh", "db", **{"db.system": "sqlite", "replica.generation": self.generation + 1}) as s:
+            start = time.perf_counter()
+            source = sqlite3.connect(self.backend.path, timeout=self.backend.timeout)
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target)  # One step: the primary is read-locked only for the copy itself
+            finally:
+                target.close()
+                source.close()
+            self.last_copy_ms = (time.perf_counter() - start) * 1000
+            s["attributes"]["db.bytes"] = os.path.getsize(path)
+
+        if self.path is not None:
+            self._retired.append(self.path)
+        self.path, self._source_stamp = path, stamp
+        self.taken, self.taken_at = time.monotonic(), time.time()
+        self.generation += 1
+        self.refreshes += 1
+        self._sweep()
+
+    def _sweep(self):
+        # The copy retired just now is kept: a reader may have its path but not have opened it yet
+        for old in self._retired[:-1]:
+            try:
+                os.remove(old)
+                self._retired.remove(old)
+            except OSError:
+                pass  # Still open by a reader; retried on the next refresh
+
+    def current(self):
+        """
+        Path of a snapshot no older than MAX_STALENESS (refreshing it if needed).
+        While one thread refreshes, others keep reading the previous copy instead of waiting.
+        """
+        if self.path is None or time.monotonic() - self.taken > MAX_STALENESS:
+            if self._lock.acquire(blocking=self.path is None):
+                try:
+                    if self.path is None or time.monotonic() - self.taken > MAX_STALENESS:
+                        self._refresh()
+                finally:
+                    self._lock.release()
+        return self.path
+
+    def connect(self, named_rows=False):
+        # immutable=1: the file never changes once published, so SQLite skips locking entirely
+        conn = sqlite3.connect(f"file:{self.current()}?mode=ro&immutable=1", uri=True, factory=self.backend.factory)
+        if named_rows:
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    def version(self):
+        """Snapshot generation (after any due refresh); cached replica reads are keyed on it."""
+        self.current()
+        return self.generation
+
+    def stats(self):
+        return {
+            "database": repr(self.backend),
+            "generation": self.generation,
+            "age_s": round(time.monotonic() - self.taken, 2) if self.path else None,
+            "as_of": time.strftime("%H:%M:%S", time.localtime(self.taken_at)) if self.taken_at else None,
+            "refreshes": self.refreshes,
+            "last_copy_ms": round(self.last_copy_ms, 1),
+            "bytes": os.path.getsize(self.path) if self.path else 0,
+        }
+
+# ==========================================
+# ⚙️ SELECTION
+# ==========================================
+
+_replicas = {}
+_replicas_lock = threading.Lock()
+
+def get_replica(backend):
+    """The snapshot replica for `backend`, or None when reads should go to the primary."""
+    if MAX_STALENESS <= 0 or not isinstance(backend, SQLiteBackend):
+        return None
+    replica = _replicas.get(backend.cache_key)
+    if replica is None or replica.backend is not backend:
+        with _replicas_lock:
+            replica = _replicas.get(backend.cache_key)
+            if replica is None or replica.backend is not backend:
+                replica = _replicas[backend.cache_key] = SnapshotReplica(backend)
+    return replica
+
+def replica_stats():
+    """One dict per replica in this process (Performance panel)."""
+    return [r.stats() for r in list(_replicas.values())]
@@ -1,9 +1,16 @@
 from fpdf import FPDF
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import re
+from logic.tracing import traced
 
 # --- HELPER: TEXT SANITIZER ---
+# One translation table + precompiled patterns, shared by the per-cell and per-column paths
+CHAR_MAP = str.maketrans({"₦": "N", "’": "'", "–": "-", "“": '"', "”": '"'})
+BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
+HEADER_PATTERN = re.compile(r'### ')
+
 def clean_text(text):
     """
     Sanitizes text for FPDF to prevent encoding errors.
@@ -12,17 +19,32 @@ def clean_text(text):
     if not isinstance(text, str): return str(text)
     
     # Replace known problem characters
-    text = text.replace("₦", "N").replace("’", "'").replace("–", "-").replace("“", '"').replace("”", '"')
+    text = text.translate(CHAR_MAP)
     
     # Remove Markdown bold markers (**text**)
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
+    text = BOLD_PATTERN.sub(r'\1', text)
     
     # Remove header markers (###)
-    text = re.sub(r'### ', '', text)
+    text = HEADER_PATTERN.sub('', text)
     
     # Encode to latin-1 to make FPDF happy (strips unsupported unicode)
     return text.encode('latin-1', 'ignore').decode('latin-1')
 
+def clean_column(series, max_len=None):
+    """
+    Vectorized clean_text() for a whole DataFrame column.
+    Markdown passes only run when the column actually contains markers.
+    """
+    s = series.astype(str).str.translate(CHAR_MAP)
+    if s.str.contains("**", regex=False).any():
+        s = s.str.replace(BOLD_PATTERN, r'\1', regex=True)
+    if s.str.contains("### ", regex=False).any():
+        s = s.str.replace("### ", "", regex=False)
+    s = s.str.encode('latin-1', 'ignore').str.decode('latin-1')
+    if max_len:
+        s = s.str[:max_len]
+    return s
+
 # --- PDF CLASS ---
 class PDF(FPDF):
     def header(self):
@@ -36,7 +58,69 @@ class PDF(FPDF):
         self.set_text_color(128)
         self.cell(0, 10, f'Generated by SiteMate Pro AI - Page {self.page_no()}', 0, 0, 'C')
 
+# --- TABLE RENDERING LAYER ---
+# Column spec: (header, width, align, values)
+#   values: a pre-sanitized/pre-formatted sequence (see clean_column / format_column)
+def format_column(series, fmt):
+    """Formats a numeric column once, e.g. format_column(df['amount'], '{:,.2f}')."""
+    return [fmt.format(v) for v in series.to_numpy()]
+
+def render_table(pdf, columns, row_height=8, header_fill=(230, 230, 230), header_text=(0, 0, 0),
+                 header_font_size=9, font_size=9, cell_colors=None, header_align=None):
+    """
+    Draws a bordered table from pre-formatted column arrays.
+    - Column widths/alignments are resolved once, not per row.
+    - Rows are paged manually so the header repeats at the top of every page.
+    - cell_colors: optional {column_index: sequence of (r, g, b)} for per-row text colour.
+    """
+    headers = [c[0] for c in columns]
+    widths = [c[1] for c in columns]
+    aligns = [c[2] for c in columns]
+    header_aligns = header_align or [a if a else 'L' for a in aligns]
+    values = [np.asarray(c[3], dtype=object) for c in columns]
+    n_rows = len(values[0]) if values else 0
+    last = len(columns) - 1
+
+    def draw_header():
+        pdf.set_fill_color(*header_fill)
+        pdf.set_text_color(*header_text)
+        pdf.set_font("Arial", "B", header_font_size)
+        for i, head in enumerate(headers):
+            pdf.cell(widths[i], row_height, head, 1, 1 if i == last else 0, header_aligns[i], 1)
+        pdf.set_text_color(0)
+        pdf.set_font("Arial", size=font_size)
+
+    draw_header()
+    # Row data as a list of tuples (zip over NumPy columns is much faster than iterrows)
+    rows = list(zip(*values))
+    cell = pdf.cell
+    current_color = (0, 0, 0)
+    start = 0
+    while start < n_rows:
+        fit = int((pdf.page_break_trigger - pdf.get_y()) // row_height)
+        if fit <= 0:
+            pdf.add_page()
+            draw_header()
+            current_color = (0, 0, 0)
+            continue
+        stop = min(n_rows, start + fit)
+        for r in range(start, stop):
+            row = rows[r]
+            for i in range(last + 1):
+                if cell_colors and i in cell_colors:
+                    color = cell_colors[i][r]
+                    if color != current_color:
+                        pdf.set_text_color(*color)
+                        current_color = color
+                elif current_color != (0, 0, 0):
+                    pdf.set_text_color(0)
+                    current_color = (0, 0, 0)
+                cell(widths[i], row_height, row[i], 1, 1 if i == last else 0, aligns[i])
+        start = stop
+    pdf.set_text_color(0)
+
 # --- 1. BOQ / ESTIMATE REPORT ---
+@traced("pdf.boq", "pdf")
 def generate_pdf_report(user_query, location, soil_type, ai_text, boq_dataframe, report_type="Standard"):
     pdf = PDF()
     pdf.add_page()
@@ -79,30 +163,14 @@ def generate_pdf_report(user_query, location, soil_type, ai_text, boq_dataframe,
         pdf.cell(0, 10, header_text, 0, 1, 'L', fill=True)
         pdf.ln(2)
         
-        pdf.set_font("Arial", "B", 9)
-        pdf.set_fill_color(255, 140, 0) # Orange Header
-        pdf.set_text_color(255) # White Text
-        
-        pdf.cell(80, 8, "Item Description", 1, 0, 'L', 1)
-        pdf.cell(20, 8, "Qty", 1, 0, 'C', 1)
-        pdf.cell(40, 8, "Unit Cost (N)", 1, 0, 'R', 1)
-        pdf.cell(50, 8, "Total (N)", 1, 1, 'R', 1)
-        
-        pdf.set_font("Arial", size=9)
-        pdf.set_text_color(0) # Black Text
-        total_cost = 0
-        
-        for _, row in boq_dataframe.iterrows():
-            item = clean_text(str(row['Item']))[:40]
-            qty = str(row['Qty'])
-            unit = f"{row['Unit Price']:,.0f}"
-            total = f"{row['Total Cost']:,.0f}"
-            
-            pdf.cell(80, 8, item, 1)
-            pdf.cell(20, 8, qty, 1, 0, 'C')
-            pdf.cell(40, 8, unit, 1, 0, 'R')
-            pdf.cell(50, 8, total, 1, 1, 'R')
-            total_cost += row['Total Cost']
+        # Orange header, white text
+        render_table(pdf, [
+            ("Item Description", 80, '', clean_column(boq_dataframe['Item'], 40)),
+            ("Qty", 20, 'C', boq_dataframe['Qty'].astype(str)),
+            ("Unit Cost (N)", 40, 'R', format_column(boq_dataframe['Unit Price'], "{:,.0f}")),
+            ("Total (N)", 50, 'R', format_column(boq_dataframe['Total Cost'], "{:,.0f}")),
+        ], header_fill=(255, 140, 0), header_text=(255, 255, 255))
+        total_cost = boq_dataframe['Total Cost'].sum()
             
         pdf.set_font("Arial", "B", 10)
         pdf.cell(140, 8, "GRAND TOTAL ESTIMATE", 1, 0, 'R')
@@ -119,6 +187,7 @@ def generate_pdf_report(user_query, location, soil_type, ai_text, boq_dataframe,
     return pdf.output(dest='S').encode('latin-1')
 
 # --- 2. EXPENSE REPORT ---
+@traced("pdf.expense", "pdf")
 def generate_expense_pdf(project_name, planned_total, expense_df):
     pdf = PDF()
     pdf.add_page()
@@ -158,23 +227,14 @@ def generate_expense_pdf(project_name, planned_total, expense_df):
     pdf.cell(0, 10, "2. DAILY EXPENSE LOG", 0, 1, 'L', fill=True)
     pdf.ln(2)
 
-    pdf.set_fill_color(230, 230, 230)
-    pdf.set_font("Arial", "B", 9)
-    pdf.cell(25, 8, "Date", 1, 0, 'C', 1)
-    pdf.cell(30, 8, "Category", 1, 0, 'L', 1)
-    pdf.cell(60, 8, "Item Description", 1, 0, 'L', 1)
-    pdf.cell(35, 8, "Amount (N)", 1, 0, 'R', 1)
-    pdf.cell(40, 8, "Note", 1, 1, 'L', 1)
-
-    pdf.set_font("Arial", size=9)
-    if not expense_df.empty:
-        expense_df = expense_df.sort_values(by="date", ascending=False)
-        for _, row in expense_df.iterrows():
-            pdf.cell(25, 8, str(row['date']), 1)
-            pdf.cell(30, 8, clean_text(str(row['category'])), 1)
-            pdf.cell(60, 8, clean_text(str(row['item']))[:30], 1)
-            pdf.cell(35, 8, f"{row['amount']:,.2f}", 1, 0, 'R')
-            pdf.cell(40, 8, clean_text(str(row['note']))[:20], 1, 1)
+    expense_df = expense_df.sort_values(by="date", ascending=False)
+    render_table(pdf, [
+        ("Date", 25, '', expense_df['date'].astype(str)),
+        ("Category", 30, '', clean_column(expense_df['category'])),
+        ("Item Description", 60, '', clean_column(expense_df['item'], 30)),
+        ("Amount (N)", 35, 'R', format_column(expense_df['amount'], "{:,.2f}")),
+        ("Note", 40, '', clean_column(expense_df['note'], 20)),
+    ], header_align=['C', 'L', 'L', 'R', 'L'])
 
     pdf.ln(20)
     pdf.set_font("Arial", "B", 10)
@@ -184,6 +244,7 @@ def generate_expense_pdf(project_name, planned_total, expense_df):
     return pdf.output(dest='S').encode('latin-1')
 
 # --- 3. INVENTORY REPORT ---
+@traced("pdf.inventory", "pdf")
 def generate_inventory_pdf(project_name, inventory_df, history_df):
     pdf = PDF()
     pdf.add_page()
@@ -202,22 +263,13 @@ def generate_inventory_pdf(project_name, inventory_df, history_df):
     pdf.cell(0, 10, "1. CURRENT STOCK LEVELS", 0, 1, 'L', fill=True)
     pdf.ln(2)
     
-    pdf.set_fill_color(230, 230, 230)
-    pdf.set_text_color(0)
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(80, 8, "Material Item", 1, 0, 'L', 1)
-    pdf.cell(40, 8, "Current Qty", 1, 0, 'C', 1)
-    pdf.cell(30, 8, "Unit", 1, 0, 'C', 1)
-    pdf.cell(40, 8, "Last Updated", 1, 1, 'C', 1)
-
-    pdf.set_font("Arial", size=10)
-    if not inventory_df.empty:
-        for _, row in inventory_df.iterrows():
-            pdf.cell(80, 8, clean_text(str(row['Item'])), 1)
-            pdf.cell(40, 8, f"{row['Quantity']:.1f}", 1, 0, 'C')
-            pdf.cell(30, 8, clean_text(str(row['Unit'])), 1, 0, 'C')
-            pdf.cell(40, 8, str(row['Last Updated']), 1, 1, 'C')
-    else:
+    render_table(pdf, [
+        ("Material Item", 80, '', clean_column(inventory_df['Item'])),
+        ("Current Qty", 40, 'C', format_column(inventory_df['Quantity'], "{:.1f}")),
+        ("Unit", 30, 'C', clean_column(inventory_df['Unit'])),
+        ("Last Updated", 40, 'C', inventory_df['Last Updated'].astype(str)),
+    ], header_font_size=10, font_size=10)
+    if inventory_df.empty:
         pdf.cell(0, 10, "No stock data available.", 1, 1, 'C')
     
     pdf.ln(10)
@@ -229,34 +281,19 @@ def generate_inventory_pdf(project_name, inventory_df, history_df):
     pdf.cell(0, 10, "2. DAILY TRANSACTION LOG (IN/OUT)", 0, 1, 'L', fill=True)
     pdf.ln(2)
 
-    pdf.set_fill_color(230, 230, 230)
-    pdf.set_text_color(0)
-    pdf.set_font("Arial", "B", 9)
-    pdf.cell(25, 8, "Date", 1, 0, 'C', 1)
-    pdf.cell(20, 8, "Time", 1, 0, 'C', 1)
-    pdf.cell(60, 8, "Item", 1, 0, 'L', 1)
-    pdf.cell(35, 8, "Action", 1, 0, 'C', 1)
-    pdf.cell(25, 8, "Change", 1, 0, 'R', 1)
-    pdf.cell(25, 8, "Unit", 1, 1, 'C', 1)
-
-    pdf.set_font("Arial", size=9)
-    if not history_df.empty:
-        for _, row in history_df.iterrows():
-            pdf.cell(25, 8, str(row['Date']), 1)
-            pdf.cell(20, 8, str(row['Time']), 1)
-            pdf.cell(60, 8, clean_text(str(row['Item']))[:30], 1)
-            
-            op = str(row['Action'])
-            if "IN" in op: pdf.set_text_color(0, 128, 0)
-            else: pdf.set_text_color(200, 0, 0)
-            pdf.cell(35, 8, op, 1, 0, 'C')
-            
-            change = f"{row['Change']:+.1f}"
-            pdf.cell(25, 8, change, 1, 0, 'R')
-            
-            pdf.set_text_color(0)
-            pdf.cell(25, 8, clean_text(str(row['Unit'])), 1, 1, 'C')
-    else:
+    # Stock IN rows in green, Stock OUT in red (Action + Change columns)
+    actions = history_df['Action'].astype(str)
+    is_in = actions.str.contains("IN", regex=False).to_numpy()
+    row_colors = [(0, 128, 0) if flag else (200, 0, 0) for flag in is_in]
+    render_table(pdf, [
+        ("Date", 25, '', history_df['Date'].astype(str)),
+        ("Time", 20, '', history_df['Time'].astype(str)),
+        ("Item", 60, '', clean_column(history_df['Item'], 30)),
+        ("Action", 35, 'C', actions),
+        ("Change", 25, 'R', format_column(history_df['Change'], "{:+.1f}")),
+        ("Unit", 25, 'C', clean_column(history_df['Unit'])),
+    ], header_align=['C', 'C', 'L', 'C', 'R', 'C'], cell_colors={3: row_colors, 4: row_colors})
+    if history_df.empty:
         pdf.cell(0, 10, "No transactions recorded yet.", 1, 1, 'C')
 
     pdf.ln(20)
@@ -267,6 +304,7 @@ def generate_inventory_pdf(project_name, inventory_df, history_df):
     return pdf.output(dest='S').encode('latin-1')
 
 # --- 4. SITE DIARY REPORT ---
+@traced("pdf.diary", "pdf")
 def generate_diary_pdf(project_name, diary_df):
     pdf = PDF()
     pdf.add_page()
@@ -284,31 +322,17 @@ def generate_diary_pdf(project_name, diary_df):
     pdf.cell(0, 10, "DAILY PROGRESS LOG", 0, 1, 'L', fill=True)
     pdf.ln(2)
 
-    pdf.set_fill_color(230, 230, 230)
-    pdf.set_text_color(0)
-    pdf.set_font("Arial", "B", 9)
-    
-    pdf.cell(25, 8, "Date", 1, 0, 'C', 1)
-    pdf.cell(25, 8, "Weather", 1, 0, 'C', 1)
-    pdf.cell(50, 8, "Labor Force", 1, 0, 'L', 1)
-    pdf.cell(50, 8, "Work Accomplished", 1, 0, 'L', 1)
-    pdf.cell(40, 8, "Issues/Delays", 1, 1, 'L', 1)
-
-    pdf.set_font("Arial", size=8)
-    if not diary_df.empty:
-        for _, row in diary_df.iterrows():
-            date = str(row['Date'])
-            weather = clean_text(str(row['Weather']))
-            labor = clean_text(str(row['Labor']))[:45]
-            work = clean_text(str(row['Work Done']))[:45]
-            issue = clean_text(str(row['Issues']))[:35]
-            
-            pdf.cell(25, 8, date, 1)
-            pdf.cell(25, 8, weather, 1)
-            pdf.cell(50, 8, labor, 1)
-            pdf.cell(50, 8, work, 1)
-            pdf.cell(40, 8, issue, 1, 1)
-    else:
+    if diary_df.empty:
+        # get_site_diary() returns a column-less frame when there are no entries
+        diary_df = pd.DataFrame(columns=["Date", "Weather", "Labor", "Work Done", "Issues"])
+    render_table(pdf, [
+        ("Date", 25, '', diary_df['Date'].astype(str)),
+        ("Weather", 25, '', clean_column(diary_df['Weather'])),
+        ("Labor Force", 50, '', clean_column(diary_df['Labor'], 45)),
+        ("Work Accomplished", 50, '', clean_column(diary_df['Work Done'], 45)),
+        ("Issues/Delays", 40, '', clean_column(diary_df['Issues'], 35)),
+    ], header_align=['C', 'C', 'L', 'L', 'L'], font_size=8)
+    if diary_df.empty:
         pdf.cell(0, 10, "No diary entries recorded.", 1, 1, 'C')
 
     pdf.ln(20)
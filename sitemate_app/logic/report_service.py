@@ -0,0 +1,174 @@
+### (Keeps PDF generation off the Streamlit render path: reports are built on demand,
+### cached by content hash, and rendered in a small background worker pool.)
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+# Report kind -> generator function in logic.report_generator.
+# Resolved on first render so FPDF isn't imported on app start.
+REPORT_BUILDERS = {
+    "boq": "generate_pdf_report",
+    "expense": "generate_expense_pdf",
+    "inventory": "generate_inventory_pdf",
+    "diary": "generate_diary_pdf",
+}
+
+MAX_CACHED_REPORTS = 64   # LRU bound (PDFs are ~10-500KB each)
+RENDER_WAIT_SECONDS = 15  # How long a click waits for the worker before showing "still rendering"
+
+_cache = OrderedDict()    # key -> pdf bytes
+_pending = {}             # key -> Future
+_errors = {}              # key -> error message
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sitemate-pdf")
+
+# ==========================================
+# 🔑 CONTENT HASHING
+# ==========================================
+
+def _hash_value(h, value):
+    """Feeds one generator argument into the running hash."""
+    if isinstance(value, pd.DataFrame):
+        h.update(b"df")
+        h.update("|".join(map(str, value.columns)).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        except TypeError:
+            # Unhashable cells (dicts/lists) - fall back to the JSON form
+            h.update(value.to_json().encode())
+    else:
+        h.update(repr(value).encode())
+
+def report_key(kind, *args, **kwargs):
+    """Stable cache key for a report: report kind + hash of every input."""
+    h = hashlib.sha1(kind.encode())
+    for arg in args:
+        _hash_value(h, arg)
+    for name in sorted(kwargs):
+        h.update(name.encode())
+        _hash_value(h, kwargs[name])
+    return f"{kind}:{h.hexdigest()}"
+
+# ==========================================
+# 🗄️ CACHE + WORKER
+# ==========================================
+
+def _store(key, pdf_bytes):
+    with _lock:
+        _cache[key] = pdf_bytes
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_REPORTS:
+            _cache.popitem(last=False)
+        _pending.pop(key, None)
+        _errors.pop(key, None)
+
+def _builder(kind):
+    from logic import report_generator
+    return getattr(report_generator, REPORT_BUILDERS[kind])
+
+def _render(key, kind, args, kwargs):
+    try:
+        pdf_bytes = _builder(kind)(*args, **kwargs)
+    except Exception as e:
+        with _lock:
+            _pending.pop(key, None)
+            _errors[key] = str(e)
+        raise
+    _store(key, pdf_bytes)
+    return pdf_bytes
+
+def get_cached_report(key):
+    """Returns the cached PDF bytes for a key, or None."""
+    with _lock:
+        pdf_bytes = _cache.get(key)
+        if pdf_bytes is not None:
+            _cache.move_to_end(key)
+        return pdf_bytes
+
+def get_report(kind, *args, **kwargs):
+    """Synchronous fetch: returns cached bytes or renders now (in the caller's thread)."""
+    key = report_key(kind, *args, **kwargs)
+    cached = get_cached_report(key)
+    if cached is not None:
+        return cached
+    return _render(key, kind, args, kwargs)
+
+def submit_report(kind, *args, **kwargs):
+    """Queues a report on the background worker. Returns its cache key."""
+    if kind not in REPORT_BUILDERS:
+        raise ValueError(f"Unknown report kind: {kind}")
+    return _submit(report_key(kind, *args, **kwargs), kind, args, kwargs)
+
+def _submit(key, kind, args, kwargs):
+    with _lock:
+        if key in _cache or key in _pending:
+            return key
+        _errors.pop(key, None)
+        _pending[key] = _executor.submit(_render, key, kind, tuple(args), kwargs)
+    return key
+
+def poll_report(key, timeout=0):
+    """Returns the PDF bytes if ready (optionally waiting up to `timeout` seconds), else None."""
+    cached = get_cached_report(key)
+    if cached is not None:
+        return cached
+    with _lock:
+        future = _pending.get(key)
+    if future is None:
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        # Timeout or render failure - caller checks report_error()
+        return None
+
+def report_error(key):
+    """Last render error for a key (None if it never failed)."""
+    with _lock:
+        return _errors.get(key)
+
+def is_pending(key):
+    with _lock:
+        return key in _pending
+
+# ==========================================
+# 🖥️ STREAMLIT HELPER
+# ==========================================
+
+def report_download_button(label, file_name, kind, *args, widget_key=None, type="secondary", use_container_width=False,
+                           loader=None, fingerprint=None, **kwargs):
+    """
+    Lazy replacement for `st.download_button(label, generate_x_pdf(...))`.
+    Shows a 'Prepare' button first; FPDF only runs when it is clicked (or if the
+    same report is already cached), so ordinary reruns never touch FPDF.
+
+    For large histories pass `loader` (a callable returning the generator args)
+    plus a cheap `fingerprint` of the data instead of the DataFrames themselves;
+    the data is then only fetched when the report is actually built.
+    """
+    if loader is not None:
+        key = report_key(kind, "loader", fingerprint)
+    else:
+        key = report_key(kind, *args, **kwargs)
+    widget_key = widget_key or key
+    pdf_bytes = get_cached_report(key)
+
+    if pdf_bytes is None:
+        requested = st.button(f"🖨️ Prepare {label.replace('📥 ', '')}", key=f"prep_{widget_key}", type=type, use_container_width=use_container_width)
+        if requested or is_pending(key):
+            if requested and not is_pending(key):
+                _submit(key, kind, loader() if loader is not None else args, kwargs)
+            with st.spinner("Rendering PDF..."):
+                pdf_bytes = poll_report(key, timeout=RENDER_WAIT_SECONDS if requested else 0)
+
+    if pdf_bytes is not None:
+        st.download_button(label, pdf_bytes, file_name, "application/pdf", key=f"dl_{widget_key}", type=type, use_container_width=use_container_width)
+    elif report_error(key):
+        st.error(f"PDF generation failed: {report_error(key)}")
+    elif is_pending(key):
+        st.caption("⏳ Still rendering in the background. It will be ready on the next refresh.")
@@ -0,0 +1,205 @@
+### (Tender-to-supplier matching. Stock lists live in the supplier_materials junction table, one row
+### per supplier x material with its catalogue category. They are loaded once per supplier change
+### into an inverted index (category -> supplier positions) over NumPy columns, so scoring a BOQ
+### against 100k suppliers is a few array operations: the share of the BOQ value each supplier
+### stocks, plus proximity to site. Saving a tender pushes it to the best matches' inboxes.)
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import logic.db_manager as db
+from logic.catalogue import normalize_material
+from logic.geo_index import haversine_km, proximity_score, site_coordinates
+from logic.query_cache import cached_query, invalidate
+
+COVERAGE_WEIGHT = 0.7       # Share of the BOQ value the supplier stocks...
+PROXIMITY_WEIGHT = 0.3      # ...and how close its base is (same haulage curve as bid ranking)
+NEUTRAL_PROXIMITY = 0.5     # Supplier base with no known coordinates
+NOTIFY_LIMIT = 50           # Suppliers alerted per new tender
+NOTIFY_MIN_COVERAGE = 0.3   # ...and only those stocking at least 30% of it by value
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# ==========================================
+# 🗂️ INVERTED INDEX
+# ==========================================
+
+class SupplierIndex:
+    """
+    Suppliers as NumPy columns (position i = one supplier, ordered by id) plus postings:
+    category -> sorted positions of the suppliers stocking it.
+    """
+
+    def __init__(self, suppliers, stock_ids, stock_categories):
+        self.size = len(suppliers)
+        self.ids = suppliers["id"].to_numpy(dtype=np.int64)
+        self.names = suppliers["company_name"].to_numpy(dtype=object)
+        self.locations = suppliers["location"].to_numpy(dtype=object)
+        self.phones = suppliers["phone"].to_numpy(dtype=object)
+        self.emails = suppliers["email"].to_numpy(dtype=object)
+        self.rating = pd.to_numeric(suppliers["rating"], errors="coerce").to_numpy(dtype=float)
+        self.lat = pd.to_numeric(suppliers["lat"], errors="coerce").to_numpy(dtype=float)
+        self.lng = pd.to_numeric(suppliers["lng"], errors="coerce").to_numpy(dtype=float)
+
+        stock_ids = np.asarray(stock_ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.ids, stock_ids), max(self.size - 1, 0))
+        known = (self.ids[pos] == stock_ids) if self.size else np.zeros(len(stock_ids), dtype=bool)
+        labels, codes = np.unique(np.asarray(stock_categories, dtype=object)[known].astype(str), return_inverse=True)
+        pos = pos[known]
+        order = np.lexsort((pos, codes))
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        self.postings = {label: np.unique(pos[order[bounds[j]:bounds[j + 1]]]) for j, label in enumerate(labels)}
+
+    def stocks(self, positions, category):
+        """Boolean per position: does that supplier stock `category`?"""
+        rows = self.postings.get(category)
+        if rows is None or not len(rows):
+            return np.zeros(len(positions), dtype=bool)
+        at = np.minimum(np.searchsorted(rows, positions), len(rows) - 1)
+        return rows[at] == positions
+
+    def match(self, needs, site_xy=None, k=10, radius_km=None):
+        """
+        Top-k suppliers for `needs` ({category: share of the BOQ value}), best first.
+        Returns (positions, coverage 0-1, distance km or NaN, score 0-1).
+        """
+        coverage = np.zeros(self.size)
+        for category, share in needs.items():
+            rows = self.postings.get(category)
+            if rows is not None:
+                coverage[rows] += share
+        pos = np.flatnonzero(coverage > 0)
+        if site_xy is not None:
+            distance = haversine_km(site_xy[0], site_xy[1], self.lat[pos], self.lng[pos])
+        else:
+            distance = np.full(len(pos), np.nan)
+        if radius_km is not None:
+            keep = ~(distance > radius_km)  # Unknown distance stays in
+            pos, distance = pos[keep], distance[keep]
+        coverage = np.minimum(coverage[pos], 1.0)
+        proximity = np.where(np.isnan(distance), NEUTRAL_PROXIMITY, proximity_score(distance))
+        score = COVERAGE_WEIGHT * coverage + PROXIMITY_WEIGHT * proximity
+        if len(score) > k:
+            part = np.argpartition(-score, k)[:k]
+            pos, coverage, distance, score = pos[part], coverage[part], distance[part], score[part]
+        order = np.lexsort((np.nan_to_num(distance, nan=np.inf), -score))
+        return pos[order], coverage[order], distance[order], score[order]
+
+@cached_query("suppliers")
+def get_supplier_index():
+    """SupplierIndex over every registered supplier (two queries; rebuilt when suppliers change)."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT id, company_name, location, phone, email, rating, lat, lng FROM suppliers ORDER BY id")
+    suppliers = pd.DataFrame(c.fetchall(), columns=["id", "company_name", "location", "phone", "email", "rating", "lat", "lng"])
+    c.execute("SELECT supplier_id, category FROM supplier_materials WHERE category IS NOT NULL")
+    stock = c.fetchall()
+    conn.close()
+    return SupplierIndex(suppliers, [r[0] for r in stock], [r[1] for r in stock])
+
+# ==========================================
+# 🎯 MATCHING
+# ==========================================
+
+def boq_needs(boq_df):
+    """{category: share of the BOQ value} over the items a supplier can stock (labour etc. left out)."""
+    if boq_df is None or boq_df.empty or "Item" not in boq_df.columns:
+        return {}
+    value = pd.to_numeric(boq_df["Total Cost"], errors="coerce").fillna(0) if "Total Cost" in boq_df.columns else pd.Series(0.0, index=boq_df.index)
+    lines = pd.DataFrame({"category": [normalize_material(item)[1] for item in boq_df["Item"]], "value": value.to_numpy(dtype=float)})
+    lines = lines.dropna(subset=["category"])
+    if lines.empty:
+        return {}
+    if lines["value"].sum() <= 0:
+        lines["value"] = 1.0  # Unpriced BOQ: every line counts the same
+    totals = lines.groupby("category")["value"].sum()
+    return (totals / totals.sum()).to_dict()
+
+def match_boq(boq_df, location, k=10, radius_km=None):
+    """
+    The k suppliers best placed to supply a BOQ at `location`, scored
+    COVERAGE_WEIGHT x (share of the BOQ value they stock) + PROXIMITY_WEIGHT x (1 within the
+    free-delivery radius, 0 where haulage hits the logistics cap). `radius_km` drops suppliers
+    further away than that (unknown bases are kept).
+    """
+    needs = boq_needs(boq_df)
+    index = get_supplier_index()
+    pos, coverage, distance, score = index.match(needs, site_coordinates(location), k, radius_km)
+    stocked = {category: index.stocks(pos, category) for category in needs}
+    return pd.DataFrame({
+        "Supplier ID": index.ids[pos],
+        "Supplier": index.names[pos],
+        "Location": index.locations[pos],
+        "Phone": index.phones[pos],
+        "Email": index.emails[pos],
+        "Rating": index.rating[pos],
+        "Distance km": np.round(distance, 1),
+        "Coverage %": np.round(coverage * 100, 1),
+        "Supplies": [", ".join(sorted(c for c in needs if stocked[c][j])) for j in range(len(pos))],
+        "Missing": [", ".join(sorted(c for c in needs if not stocked[c][j])) for j in range(len(pos))],
+        "Score": np.round(score, 4),
+    })
+
+def match_project(project_name, k=10, radius_km=None):
+    """match_boq for a saved project's BOQ and location (empty frame for an unknown project)."""
+    location, _, boq_df = db.load_project_data(project_name)
+    return match_boq(boq_df, location, k, radius_km)
+
+# ==========================================
+# 🔔 NEW-TENDER NOTIFICATIONS
+# ==========================================
+
+def notify_matching_suppliers(project_name, limit=NOTIFY_LIMIT, min_coverage=NOTIFY_MIN_COVERAGE):
+    """
+    Pushes a tender into the inbox of its best-matching suppliers. A supplier is alerted once
+    per project, so re-saving a BOQ only reaches newly matching suppliers.
+    Returns the number of suppliers newly alerted (0 when every match already had this tender).
+    """
+    matches = match_project(project_name, k=limit)
+    matches = matches[matches["Coverage %"] >= min_coverage * 100]
+    now = datetime.now().strftime(TIME_FORMAT)
+    rows = [(int(m["Supplier ID"]), project_name, float(m["Score"]), float(m["Coverage %"]) / 100,
+             None if np.isnan(m["Distance km"]) else float(m["Distance km"]), now) for m in matches.to_dict("records")]
+    if not rows:
+        return 0
+    conn = db._connect()
+    c = conn.cursor()
+    inserted = 0
+    try:
+        for row in rows:
+            c.execute('''INSERT INTO tender_notifications (supplier_id, project_name, score, coverage, distance_km, created_at)
+                         VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (supplier_id, project_name) DO NOTHING''', row)
+            inserted += max(c.rowcount, 0)  # 0 when the supplier was already alerted
+        conn.commit()
+    finally:
+        conn.close()
+    if inserted:
+        invalidate("notifications")
+    return inserted
+
+@cached_query("notifications", scope="session")
+def get_notifications(supplier_name, limit=20):
+    """A supplier's newest tender alerts (project, location, value, match score, read flag)."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute('''SELECT n.id, n.project_name, p.location, p.planned_total, n.score, n.coverage, n.distance_km, n.created_at, n.read_at
+                 FROM tender_notifications n JOIN suppliers s ON s.id = n.supplier_id
+                 LEFT JOIN projects p ON p.name = n.project_name
+                 WHERE s.company_name = ? ORDER BY n.id DESC LIMIT ?''', (supplier_name, limit))
+    rows = [dict(zip(["id", "project_name", "location", "est_value", "score", "coverage", "distance_km", "created_at", "read_at"], r))
+            for r in c.fetchall()]
+    conn.close()
+    return rows
+
+def mark_notifications_read(supplier_name):
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        c.execute('''UPDATE tender_notifications SET read_at = ?
+                     WHERE read_at IS NULL AND supplier_id IN (SELECT id FROM suppliers WHERE company_name = ?)''',
+                  (datetime.now().strftime(TIME_FORMAT), supplier_name))
+        conn.commit()
+    finally:
+        conn.close()
+    invalidate("notifications")
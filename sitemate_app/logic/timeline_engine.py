@@ -1,17 +1,20 @@
 import pandas as pd
 from datetime import date, timedelta
+from logic.tracing import traced
 
-def calculate_project_timeline(boq_df):
+@traced("engine.timeline", "engine")
+def calculate_project_timeline(boq_df, start_date=None):
     """
     Generates a project schedule based on material quantities.
     Returns a DataFrame suitable for a Gantt Chart.
+    start_date: first day of site work (default: today).
     """
     if boq_df is None or boq_df.empty:
         return pd.DataFrame()
 
     tasks = []
-    # Start the project "Today"
-    current_date = date.today()
+    # Start the project "Today" unless a start date is given
+    current_date = start_date or date.today()
 
     # --- PHASE 1: SITE PREPARATION (Fixed) ---
     # Every project needs clearing/setting out
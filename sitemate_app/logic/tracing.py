@@ -0,0 +1,288 @@
+### (Lightweight tracing. Spans for page renders, db statements, HTTP calls, PDFs and
+### engine runs are kept in an in-process ring buffer with their duration and payload
+### size. Field names follow OpenTelemetry, and export_jsonl() writes OTLP-style JSON lines.)
+###
+### Set SITEMATE_TRACING=0 to turn every span into a no-op.
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+MAX_SPANS = 20_000    # Ring buffer size (oldest spans drop off first)
+STATEMENT_CHARS = 200  # db.statement is truncated to this
+
+TRACING_ENABLED = os.environ.get("SITEMATE_TRACING", "1") != "0"
+
+_spans = deque(maxlen=MAX_SPANS)
+_lock = threading.Lock()
+_current = contextvars.ContextVar("sitemate_span", default=None)   # Innermost open span
+_request = contextvars.ContextVar("sitemate_request", default=None)
+
+# ==========================================
+# 📏 SPANS
+# ==========================================
+
+def _open(name, kind, attrs, parent):
+    return {
+        "name": name, "kind": kind,
+        "trace_id": parent["trace_id"] if parent else f"{random.getrandbits(128):032x}",
+        "span_id": f"{random.getrandbits(64):016x}",
+        "parent_id": parent["span_id"] if parent else None,
+        "start": time.time(), "duration_ms": 0.0, "status": "ok", "attributes": dict(attrs),
+        "_t0": time.perf_counter(),
+    }
+
+def _close(s):
+    s["duration_ms"] = (time.perf_counter() - s.pop("_t0")) * 1000
+    with _lock:
+        _spans.append(s)
+
+@contextlib.contextmanager
+def span(name, kind="internal", **attrs):
+    """
+    Times the block as a child of the current span. The yielded dict can be
+    annotated, e.g. s["attributes"]["payload.bytes"] = len(pdf).
+    Streamlit's stop/rerun signals are BaseExceptions and don't mark the span as failed.
+    """
+    if not TRACING_ENABLED:
+        yield {"attributes": {}}
+        return
+    s = _open(name, kind, attrs, _current.get())
+    token = _current.set(s)
+    try:
+        yield s
+    except Exception as e:
+        s["status"] = "error"
+        s["attributes"]["exception"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        _current.reset(token)
+        _close(s)
+
+def record_payload(s, result):
+    """Payload size of a traced call's return value (bytes for documents/text, rows for tables)."""
+    if not TRACING_ENABLED:
+        return
+    if isinstance(result, (bytes, bytearray, str)):
+        s["attributes"]["payload.bytes"] = len(result)
+    elif isinstance(result, pd.DataFrame):
+        s["attributes"]["payload.rows"] = len(result)
+    elif isinstance(result, list):
+        s["attributes"]["payload.rows"] = len(result)
+
+def traced(name=None, kind="internal"):
+    """
+    Decorator form of span(); records the result's size (bytes / rows) too.
+    Meant for millisecond-scale work - a span costs a few microseconds, which would
+    dominate pure arithmetic like the structural formulas.
+    """
+    def decorator(func):
+        if not TRACING_ENABLED:
+            return func
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind) as s:
+                result = func(*args, **kwargs)
+                record_payload(s, result)
+                return result
+        return wrapper
+    return decorator
+
+# ==========================================
+# 🧭 REQUESTS (one per script run)
+# ==========================================
+
+def begin_request(name, **attrs):
+    """
+    Opens the root span for a page render. Streamlit pages are flat scripts, so the
+    root can't be a `with` block; a run cut short by st.stop()/st.rerun() is simply
+    never closed and gets replaced here on the next run.
+    """
+    if not TRACING_ENABLED:
+        return
+    s = _open(name, "request", attrs, None)
+    _request.set(s)
+    _current.set(s)
+
+def annotate_request(name=None, **attrs):
+    """Renames / tags the open request once the page knows more (e.g. the selected tab)."""
+    s = _request.get()
+    if s is None:
+        return
+    if name:
+        s["name"] = name
+    s["attributes"].update(attrs)
+
+def end_request():
+    s = _request.get()
+    if s is None or "_t0" not in s:
+        return
+    _request.set(None)
+    _current.set(None)
+    _close(s)
+
+# ==========================================
+# 🔌 INSTRUMENTATION
+# ==========================================
+
+class TracedCursor(sqlite3.Cursor):
+    """One span per statement; fetch time is added to the statement that produced the rows."""
+
+    def _traced(self, run, sql, **attrs):
+        verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else "SQL"
+        with span(f"sql.{verb}", "db", **{"db.system": "sqlite", "db.statement": " ".join(sql.split())[:STATEMENT_CHARS]}, **attrs) as s:
+            self._span = s
+            return run()
+
+    def execute(self, sql, parameters=()):
+        return self._traced(lambda: super(TracedCursor, self).execute(sql, parameters), sql)
+
+    def executemany(self, sql, seq_of_parameters):
+        rows = seq_of_parameters if isinstance(seq_of_parameters, (list, tuple)) else list(seq_of_parameters)
+        return self._traced(lambda: super(TracedCursor, self).executemany(sql, rows), sql, **{"db.batch_size": len(rows)})
+
+    def _fetch(self, fetch):
+        start = time.perf_counter()
+        rows = fetch()
+        s = getattr(self, "_span", None)
+        if s is not None and "duration_ms" in s:
+            s["duration_ms"] += (time.perf_counter() - start) * 1000
+            s["attributes"]["payload.rows"] = s["attributes"].get("payload.rows", 0) + (len(rows) if isinstance(rows, list) else rows is not None)
+        return rows
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def fetchmany(self, size=None):
+        return self._fetch(lambda: super(TracedCursor, self).fetchmany(size or self.arraysize))
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def executescript(self, sql_script):
+        return self._traced(lambda: super(TracedCursor, self).executescript(sql_script), sql_script)
+
+class TracedConnection(sqlite3.Connection):
+    """
+    sqlite3.connect(..., factory=TracedConnection). The C-level Connection.execute*() shortcuts
+    build a plain cursor without calling cursor(), so they are routed through it here:
+    BEGIN IMMEDIATE lock waits and PRAGMA checks become spans like any other statement.
+    """
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracedCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+def instrument_requests():
+    """Wraps requests.Session.send (what requests.get/post use) in an http.<upstream> span. Idempotent."""
+    import requests
+    from logic.upstreams import upstream_name
+
+    if getattr(requests.Session.send, "_sitemate_traced", False):
+        return
+    original = requests.Session.send
+
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        attrs = {"http.request.method": request.method, "server.address": url.hostname, "url.path": url.path}
+        with span(f"http.{upstream_name(request.url)}", "client", **attrs) as s:
+            response = original(self, request, **kwargs)
+            s["attributes"]["http.response.status_code"] = response.status_code
+            if not kwargs.get("stream"):
+                s["attributes"]["payload.bytes"] = len(response.content)
+            if response.status_code >= 400:
+                s["status"] = "error"
+            return response
+
+    send._sitemate_traced = True
+    requests.Session.send = send
+
+# ==========================================
+# 📊 ANALYSIS & EXPORT
+# ==========================================
+
+def recent_spans(limit=None):
+    with _lock:
+        spans = list(_spans)
+    return spans[-limit:] if limit else spans
+
+def clear():
+    with _lock:
+        _spans.clear()
+
+def span_summary():
+    """Latency percentiles and payload sizes per span name, most total time first."""
+    spans = recent_spans()
+    columns = ["span", "kind", "count", "p50_ms", "p95_ms", "max_ms", "total_ms", "avg_bytes", "avg_rows", "errors"]
+    if not spans:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame({
+        "span": [s["name"] for s in spans], "kind": [s["kind"] for s in spans],
+        "ms": [s["duration_ms"] for s in spans],
+        "bytes": [s["attributes"].get("payload.bytes", np.nan) for s in spans],
+        "rows": [s["attributes"].get("payload.rows", np.nan) for s in spans],
+        "error": [s["status"] == "error" for s in spans],
+    })
+    out = df.groupby(["span", "kind"]).agg(
+        count=("ms", "size"), p50_ms=("ms", "median"), p95_ms=("ms", lambda x: np.percentile(x, 95)),
+        max_ms=("ms", "max"), total_ms=("ms", "sum"), avg_bytes=("bytes", "mean"), avg_rows=("rows", "mean"), errors=("error", "sum"),
+    ).reset_index()
+    return out.round(2).sort_values("total_ms", ascending=False, ignore_index=True)[columns]
+
+def slowest_requests(n=10):
+    """The n slowest page renders in the buffer, with their costliest child span."""
+    spans = recent_spans()
+    roots = sorted((s for s in spans if s["kind"] == "request"), key=lambda s: s["duration_ms"], reverse=True)[:n]
+    columns = ["trace_id", "request", "started", "duration_ms", "spans", "slowest_child", "child_ms"]
+    rows = []
+    for root in roots:
+        children = [s for s in spans if s["trace_id"] == root["trace_id"] and s is not root]
+        top = max(children, key=lambda s: s["duration_ms"], default=None)
+        rows.append((root["trace_id"], root["name"], time.strftime("%H:%M:%S", time.localtime(root["start"])),
+                     round(root["duration_ms"], 1), len(children), top["name"] if top else "-", round(top["duration_ms"], 1) if top else 0.0))
+    return pd.DataFrame(rows, columns=columns)
+
+def trace_spans(trace_id):
+    """Every span of one request, in start order (for a waterfall / breakdown)."""
+    spans = sorted((s for s in recent_spans() if s["trace_id"] == trace_id), key=lambda s: s["start"])
+    return pd.DataFrame([{"span": s["name"], "kind": s["kind"], "offset_ms": 0.0 if not spans else round((s["start"] - spans[0]["start"]) * 1000, 1),
+                          "duration_ms": round(s["duration_ms"], 2), "status": s["status"],
+                          "detail": s["attributes"].get("db.statement") or s["attributes"].get("url.path", "")} for s in spans])
+
+def _otel(s):
+    start_ns = int(s["start"] * 1e9)
+    return {
+        "traceId": s["trace_id"], "spanId": s["span_id"], "parentSpanId": s["parent_id"] or "",
+        "name": s["name"], "kind": s["kind"],
+        "startTimeUnixNano": start_ns, "endTimeUnixNano": start_ns + int(s["duration_ms"] * 1e6),
+        "attributes": s["attributes"], "status": {"code": "ERROR" if s["status"] == "error" else "OK"},
+    }
+
+def export_jsonl(path=None):
+    """Buffered spans as JSON lines (one OTLP-style span each). Writes to `path` if given, returns the text."""
+    text = "".join(json.dumps(_otel(s), default=str) + "\n" for s in recent_spans())
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
@@ -1,7 +1,10 @@
 import streamlit as st
-from groq import Groq
 import os
 
+from logic.clients import get_groq_client
+from logic.tracing import traced
+
+@traced("llm.transcribe", "client")
 def transcribe_audio(audio_bytes):
     """
     Sends recorded audio to Groq's Whisper model for text transcription.
@@ -9,7 +12,7 @@ def transcribe_audio(audio_bytes):
     """
     try:
         # 1. Initialize Groq Client
-        client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+        client = get_groq_client(st.secrets["GROQ_API_KEY"])
         
         # 2. Save bytes to a temporary file
         temp_filename = "temp_voice_input.wav"
@@ -0,0 +1,44 @@
+### (Base URLs for every external API. Each one can be redirected - e.g. to the local
+### stand-ins in logic/mock_upstreams.py for offline load tests - through environment
+### variables, without touching the callers.)
+###
+###   SITEMATE_UPSTREAM_URL=http://127.0.0.1:8900   -> every upstream
+###   SITEMATE_GROQ_URL=http://127.0.0.1:8901       -> just one (GROQ, GEMINI, ALGOLIA, OPEN_METEO, PAYSTACK)
+
+import os
+from urllib.parse import urlparse
+
+DEFAULT_URLS = {
+    "groq": "https://api.groq.com",
+    "gemini": "https://generativelanguage.googleapis.com",
+    "algolia": "https://{app_id}-dsn.algolia.net",
+    "open_meteo": "https://api.open-meteo.com",
+    "paystack": "https://api.paystack.co",
+}
+ALL_UPSTREAMS_VAR = "SITEMATE_UPSTREAM_URL"
+
+def upstream_override(name):
+    """The configured replacement base URL for an upstream, or None when it is live."""
+    url = os.environ.get(f"SITEMATE_{name.upper()}_URL") or os.environ.get(ALL_UPSTREAMS_VAR)
+    return url.rstrip("/") if url else None
+
+def upstream_url(name, **fmt):
+    """Base URL (no trailing slash). `fmt` fills placeholders in the default, e.g. app_id for Algolia."""
+    return upstream_override(name) or DEFAULT_URLS[name].format(**fmt)
+
+# API paths are distinct, which also identifies the service behind a redirected base URL
+_PATH_PREFIXES = [("/openai/", "groq"), ("/v1beta/", "gemini"), ("/1/", "algolia"), ("/v1/forecast", "open_meteo"), ("/transaction", "paystack")]
+_HOST_SUFFIXES = [("groq.com", "groq"), ("googleapis.com", "gemini"), ("algolia.net", "algolia"), ("algolianet.com", "algolia"),
+                  ("open-meteo.com", "open_meteo"), ("paystack.co", "paystack")]
+
+def upstream_name(url):
+    """'https://XYZ-dsn.algolia.net/1/indexes/...' -> 'algolia'; unknown hosts -> the hostname."""
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    for suffix, name in _HOST_SUFFIXES:
+        if host.endswith(suffix):
+            return name
+    for prefix, name in _PATH_PREFIXES:
+        if parsed.path.startswith(prefix):
+            return name
+    return host
@@ -0,0 +1,265 @@
+### (BOQ vs. actual consumption. Stock OUT rows in inventory_logs and expense lines are matched
+### to the project's BOQ items by name (token overlap with typo tolerance, remembered in
+### item_mappings), then folded into per-day totals in variance_daily. Each sync only reads the
+### ledger and expense rows added since the last one, so the report cost doesn't grow with
+### history. Changing the BOQ resets the project's state and it is rebuilt on the next sync.)
+
+import hashlib
+from datetime import date
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+import logic.db_manager as db
+from logic.catalogue import close_matches, tokenize
+from logic.query_cache import cached_query, invalidate
+
+MATCH_CUTOFF = 0.6       # Minimum name score for a ledger/expense item to count against a BOQ line
+RATE_WINDOW_DAYS = 14    # Recent window for the daily burn rate
+UNPLANNED = ""           # boq_item for names that match nothing in the BOQ
+UNPLANNED_LABEL = "(not in BOQ)"  # How UNPLANNED is shown in reports and pickers
+MATCHER_VERSION = 2      # Part of the BOQ hash: bumping it rebuilds every project's automatic matches
+
+# Unit and packaging words say nothing about which material it is ("Sand (Tons)" is Sand)
+UNIT_WORDS = {"ton", "tons", "bag", "kg", "pc", "pcs", "trip", "litre", "liter", "bundle", "length", "unit", "qty", "load"}
+
+# ==========================================
+# 🔤 NAME MATCHING
+# ==========================================
+
+def _tokens(name):
+    return {t for t in tokenize(name) if t not in UNIT_WORDS}
+
+def _sizes(tokens):
+    return {t for t in tokens if any(ch.isdigit() for ch in t)}
+
+def match_item(raw_name, boq_items):
+    """
+    Best BOQ item for a ledger/expense name. Returns (item, score), or (UNPLANNED, score) below MATCH_CUTOFF.
+    Score: 0.7 x share of the name's words found in the BOQ line + 0.3 x share of the line's words
+    covered, so "Cement" matches "Dangote Cement 42.5R" but "Blocks (9 inch)" doesn't match "6 inch Blocks".
+    Typo matches count by their ratio, and sizes must agree: a line with other sizes is never a match.
+    """
+    raw = _tokens(raw_name)
+    if not raw:
+        return UNPLANNED, 0.0
+    lines = [(item, _tokens(item)) for item in boq_items]
+    vocabulary = sorted(set().union(*(toks for _, toks in lines))) if lines else []
+    found = {}
+    for tok in raw:
+        if tok in vocabulary:
+            found[tok] = 1.0
+        else:
+            for word, ratio in close_matches(tok, vocabulary, n=1):  # "cemnt" -> "cement"
+                found[word] = max(found.get(word, 0.0), ratio)
+    sizes = _sizes(raw)
+    best, best_score = UNPLANNED, 0.0
+    for item, toks in lines:
+        line_sizes = _sizes(toks)
+        if not toks or (sizes and line_sizes and not sizes & line_sizes):
+            continue
+        overlap = sum(found.get(tok, 0.0) for tok in toks)
+        score = 0.7 * overlap / len(raw) + 0.3 * overlap / len(toks)
+        if score > best_score:
+            best, best_score = item, score
+    return (best, round(best_score, 3)) if best_score >= MATCH_CUTOFF else (UNPLANNED, round(best_score, 3))
+
+# ==========================================
+# 🔁 INCREMENTAL SYNC
+# ==========================================
+
+def _boq_frame(boq_json):
+    """BOQ lines summed per item: Item, Qty, Unit Price, Total Cost."""
+    try:
+        boq = pd.read_json(StringIO(boq_json))
+    except (ValueError, TypeError):
+        boq = pd.DataFrame()
+    if "Item" not in boq.columns:
+        return pd.DataFrame({"Item": pd.Series(dtype=str), **{col: pd.Series(dtype=float) for col in ["Qty", "Unit Price", "Total Cost"]}})
+    for col in ["Qty", "Unit Price", "Total Cost"]:
+        boq[col] = pd.to_numeric(boq.get(col, 0.0), errors="coerce").fillna(0.0)
+    boq["Item"] = boq["Item"].astype(str)
+    grouped = boq.groupby("Item", sort=False).agg(Qty=("Qty", "sum"), Total=("Total Cost", "sum")).reset_index()
+    grouped["Unit Price"] = np.where(grouped["Qty"] > 0, grouped["Total"] / grouped["Qty"].where(grouped["Qty"] > 0), 0.0)
+    return grouped.rename(columns={"Total": "Total Cost"})[["Item", "Qty", "Unit Price", "Total Cost"]]
+
+def _mapping_for(c, project, source, names, boq_items):
+    """raw name -> BOQ item for `names`; unseen names are matched once and stored."""
+    known = {}
+    c.execute("SELECT raw_name, boq_item FROM item_mappings WHERE project_name = ? AND source = ?", (project, source))
+    for raw, item in c.fetchall():
+        known[raw] = item
+    new = [(project, source, raw, *match_item(raw, boq_items)) for raw in names if raw not in known]
+    if new:
+        c.executemany("INSERT INTO item_mappings (project_name, source, raw_name, boq_item, score) VALUES (?, ?, ?, ?, ?)", new)
+        known.update({raw: item for _, _, raw, item, _ in new})
+    return known
+
+def sync(project_name):
+    """
+    Folds ledger and expense rows added since the last sync into variance_daily.
+    Returns the number of new rows processed. Runs inside the same write locks as
+    update_inventory / log_expense, so no row can commit behind the cursor.
+    """
+    backend = db._backend()
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        backend.begin_write(conn, (f"inventory:{project_name}", f"expenses:{project_name}"))
+        c.execute("SELECT boq_json FROM projects WHERE name = ?", (project_name,))
+        row = c.fetchone()
+        if row is None:
+            conn.rollback()
+            return 0
+        boq_hash = hashlib.sha1(f"{MATCHER_VERSION}:{row[0] or ''}".encode("utf-8")).hexdigest()
+        boq_items = _boq_frame(row[0])["Item"].tolist()
+
+        c.execute("SELECT boq_hash, last_log_id, last_expense_id FROM variance_state WHERE project_name = ?", (project_name,))
+        state = c.fetchone()
+        if state is None or state[0] != boq_hash:
+            # New or re-planned BOQ: automatic matches and totals are rebuilt; manual matches to lines that still exist are kept
+            c.execute("DELETE FROM variance_daily WHERE project_name = ?", (project_name,))
+            keep = boq_items + [UNPLANNED]
+            c.execute(f"DELETE FROM item_mappings WHERE project_name = ? AND (manual = 0 OR boq_item NOT IN ({', '.join('?' * len(keep))}))",
+                      (project_name, *keep))
+            last_log_id, last_expense_id = 0, 0
+        else:
+            last_log_id, last_expense_id = state[1], state[2]
+
+        c.execute("SELECT id, item_name, change_qty, date FROM inventory_logs WHERE project_name = ? AND id > ?", (project_name, last_log_id))
+        logs = pd.DataFrame(c.fetchall(), columns=["id", "name", "change", "date"])
+        c.execute("SELECT id, item_name, amount, date FROM expenses WHERE project_name = ? AND id > ?", (project_name, last_expense_id))
+        expenses = pd.DataFrame(c.fetchall(), columns=["id", "name", "amount", "date"])
+
+        parts = []
+        if len(logs):
+            mapping = _mapping_for(c, project_name, "inventory", logs["name"].unique(), boq_items)
+            change = logs["change"].astype(float)
+            parts.append(pd.DataFrame({"boq_item": logs["name"].map(mapping), "date": logs["date"],
+                                       "used_qty": (-change).clip(lower=0), "delivered_qty": change.clip(lower=0), "spent": 0.0}))
+        if len(expenses):
+            mapping = _mapping_for(c, project_name, "expense", expenses["name"].unique(), boq_items)
+            parts.append(pd.DataFrame({"boq_item": expenses["name"].map(mapping), "date": expenses["date"],
+                                       "used_qty": 0.0, "delivered_qty": 0.0, "spent": expenses["amount"].astype(float)}))
+        if parts:
+            daily = pd.concat(parts, ignore_index=True).groupby(["boq_item", "date"], sort=False).sum().reset_index()
+            c.executemany('''INSERT INTO variance_daily (project_name, boq_item, date, used_qty, delivered_qty, spent) VALUES (?, ?, ?, ?, ?, ?)
+                             ON CONFLICT (project_name, boq_item, date) DO UPDATE SET used_qty = variance_daily.used_qty + excluded.used_qty,
+                                 delivered_qty = variance_daily.delivered_qty + excluded.delivered_qty, spent = variance_daily.spent + excluded.spent''',
+                          [(project_name, r.boq_item, r.date, float(r.used_qty), float(r.delivered_qty), float(r.spent)) for r in daily.itertuples()])
+
+        c.execute('''INSERT INTO variance_state (project_name, boq_hash, last_log_id, last_expense_id) VALUES (?, ?, ?, ?)
+                     ON CONFLICT (project_name) DO UPDATE SET boq_hash = excluded.boq_hash, last_log_id = excluded.last_log_id,
+                                                             last_expense_id = excluded.last_expense_id''',
+                  (project_name, boq_hash, int(logs["id"].max()) if len(logs) else last_log_id,
+                   int(expenses["id"].max()) if len(expenses) else last_expense_id))
+        conn.commit()
+        return len(logs) + len(expenses)
+    except Exception:
+        if conn.in_transaction: conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def set_mapping(project_name, source, raw_name, boq_item):
+    """Manual match ('inventory' or 'expense' name -> BOQ item, or UNPLANNED). Totals are rebuilt on the next sync."""
+    conn = db._connect()
+    c = conn.cursor()
+    try:
+        c.execute('''INSERT INTO item_mappings (project_name, source, raw_name, boq_item, score, manual) VALUES (?, ?, ?, ?, 1.0, 1)
+                     ON CONFLICT (project_name, source, raw_name) DO UPDATE SET boq_item = excluded.boq_item, score = 1.0, manual = 1''',
+                  (project_name, source, raw_name, boq_item))
+        c.execute("UPDATE variance_state SET boq_hash = '' WHERE project_name = ?", (project_name,))  # Forces a rebuild
+        conn.commit()
+    finally:
+        conn.close()
+    invalidate(f"project:{project_name}")
+
+def get_mappings(project_name):
+    """Every remembered match for the project, weakest first (what to review)."""
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT source, raw_name, boq_item, score, manual FROM item_mappings WHERE project_name = ? ORDER BY manual, score, raw_name", (project_name,))
+    rows = c.fetchall()
+    conn.close()
+    return pd.DataFrame(rows, columns=["Source", "Name", "BOQ Item", "Score", "Manual"])
+
+# ==========================================
+# 📊 REPORTS
+# ==========================================
+
+def _load(project_name):
+    """(BOQ frame, per-day variance rows) after folding in new ledger rows."""
+    sync(project_name)
+    conn = db._connect()
+    c = conn.cursor()
+    c.execute("SELECT boq_json FROM projects WHERE name = ?", (project_name,))
+    row = c.fetchone()
+    c.execute("SELECT boq_item, date, used_qty, delivered_qty, spent FROM variance_daily WHERE project_name = ? ORDER BY date", (project_name,))
+    daily = pd.DataFrame(c.fetchall(), columns=["boq_item", "date", "used_qty", "delivered_qty", "spent"])
+    daily = daily.astype({"used_qty": float, "delivered_qty": float, "spent": float})  # An empty fetch is object dtype
+    conn.close()
+    return _boq_frame(row[0] if row else None), daily
+
+@cached_query("project:{project_name}", "inventory:{project_name}", "expenses:{project_name}")
+def variance_report(project_name, until=None):
+    """
+    Per BOQ item: planned vs. used quantity, planned cost vs. spend, recent daily burn and the
+    projected overrun. Projection: quantity = the larger of planned and used (plus the recent burn
+    rate carried to `until`, a 'YYYY-MM-DD' end date, when given), priced at the actual unit cost
+    (spend / delivered) where known, else the BOQ rate, and never below what is already spent.
+    Names that match no BOQ line are one UNPLANNED_LABEL row.
+    """
+    boq, daily = _load(project_name)
+    totals = daily.groupby("boq_item").agg(used=("used_qty", "sum"), delivered=("delivered_qty", "sum"), spent=("spent", "sum"),
+                                           last_date=("date", "max"))
+    as_of = pd.to_datetime(daily["date"], errors="coerce").max() if len(daily) else pd.NaT
+    as_of = as_of if pd.notna(as_of) else pd.Timestamp(date.today())
+    recent = daily[pd.to_datetime(daily["date"], errors="coerce") > as_of - pd.Timedelta(days=RATE_WINDOW_DAYS)]
+    rate = recent.groupby("boq_item")["used_qty"].sum() / RATE_WINDOW_DAYS
+
+    df = boq.set_index("Item")
+    unplanned = totals.index.difference(df.index)
+    if len(unplanned):
+        df = pd.concat([df, pd.DataFrame(0.0, index=unplanned, columns=df.columns)])
+    df = df.join(totals).join(rate.rename("rate"))
+    df[["used", "delivered", "spent", "rate"]] = df[["used", "delivered", "spent", "rate"]].fillna(0.0)
+
+    days_left = max((pd.Timestamp(until) - as_of).days, 0) if until else 0
+    projected_qty = np.maximum(df["Qty"], df["used"] + df["rate"] * days_left)
+    unit_cost = np.where((df["delivered"] > 0) & (df["spent"] > 0), df["spent"] / df["delivered"].where(df["delivered"] > 0), df["Unit Price"])
+    projected_cost = np.maximum(projected_qty * unit_cost, df["spent"])  # Money already spent is never projected away
+    planned = df["Qty"].where(df["Qty"] > 0)
+
+    report = pd.DataFrame({
+        "Item": [i if i != UNPLANNED else UNPLANNED_LABEL for i in df.index],
+        "Planned Qty": df["Qty"].to_numpy(),
+        "Used Qty": df["used"].to_numpy(),
+        "Delivered Qty": df["delivered"].to_numpy(),
+        "Qty Variance": (df["used"] - df["Qty"]).to_numpy(),
+        "Used %": (df["used"] / planned * 100).to_numpy(),
+        "Planned Cost": df["Total Cost"].to_numpy(),
+        "Spent": df["spent"].to_numpy(),
+        "Cost Variance": (df["spent"] - df["Total Cost"]).to_numpy(),
+        "Daily Burn": df["rate"].to_numpy(),
+        "Projected Qty": projected_qty.to_numpy(),
+        "Projected Overrun": (projected_cost - df["Total Cost"]).to_numpy(),
+    })
+    return report.sort_values("Projected Overrun", ascending=False, ignore_index=True)
+
+@cached_query("project:{project_name}", "inventory:{project_name}", "expenses:{project_name}")
+def burn_curves(project_name):
+    """Cumulative use and spend per BOQ item by date, with the planned quantity as reference (for line charts)."""
+    boq, daily = _load(project_name)
+    daily = daily[daily["boq_item"] != UNPLANNED].sort_values(["boq_item", "date"], ignore_index=True)
+    grouped = daily.groupby("boq_item")
+    curves = pd.DataFrame({
+        "Item": daily["boq_item"],
+        "Date": pd.to_datetime(daily["date"], errors="coerce"),
+        "Cumulative Used": grouped["used_qty"].cumsum(),
+        "Cumulative Spent": grouped["spent"].cumsum(),
+    })
+    curves = curves.merge(boq[["Item", "Qty"]].rename(columns={"Qty": "Planned Qty"}), on="Item", how="left")
+    curves["Used %"] = curves["Cumulative Used"] / curves["Planned Qty"].where(curves["Planned Qty"] > 0) * 100
+    return curves
@@ -1,13 +1,16 @@
-import google.generativeai as genai
 import streamlit as st
 from PIL import Image
 import io
 import time
 import warnings
 
+from logic.clients import get_genai
+from logic.tracing import traced
+
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
+@traced("llm.site_vision", "client")
 def analyze_site_progress(image_bytes):
     """
     Sends the image to Google Gemini.
@@ -18,7 +21,7 @@ def analyze_site_progress(image_bytes):
         return "❌ Error: GOOGLE_API_KEY not found in secrets.toml."
 
     # 1. Configure API
-    genai.configure(api_key=api_key)
+    genai = get_genai(api_key)
 
     # 2. List of models to try (Priority Order)
     # We prioritize 1.5-flash because it has the highest free limits.
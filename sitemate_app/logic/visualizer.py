@@ -1,11 +1,14 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import streamlit as st
 
+# matplotlib is imported inside the renderers: it costs ~400ms and is only
+# needed when the structural agent actually draws a foundation.
+
 def render_strip_foundation(width_mm, depth_mm):
     """
     Draws a cross-section of a Strip Foundation.
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
     # Create figure
     fig, ax = plt.subplots(figsize=(6, 3))
     
@@ -44,6 +47,8 @@ def render_pad_foundation(size_str, depth_mm):
     Draws a Plan View (Top View) of a Pad Foundation.
     Expects size_str like "1000x1000"
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
     try:
         L = int(size_str.split('x')[0])
         W = int(size_str.split('x')[1])
@@ -1,5 +1,6 @@
 import requests
 from datetime import datetime
+from logic.upstreams import upstream_url
 
 # Coordinates for your specific locations
 LOCATIONS = {
@@ -19,7 +20,7 @@ def get_site_weather(location_name):
 
     try:
         # Open-Meteo API URL
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={coords['lat']}&longitude={coords['lon']}&current_weather=true&daily=precipitation_sum,rain_sum&timezone=Africa%2FLagos"
+        url = f"{upstream_url('open_meteo')}/v1/forecast?latitude={coords['lat']}&longitude={coords['lon']}&current_weather=true&daily=precipitation_sum,rain_sum&timezone=Africa%2FLagos"
         
         response = requests.get(url, timeout=5)
         data = response.json()